@@ -0,0 +1,140 @@
+# -- coding:cp936 C
+"""
+GeoTIFFѡܲ
+
+ÿƷԤͬĺϳդ񣨿ռĳNoData
+ͬѹԤͷֿ鷽ʽдȡԭʼŽfloat32
+ȽļСѹȺͶдҪGDAL
+
+    python benchmarks/bench_compression.py --size 4800
+    python benchmarks/bench_compression.py --preset MOD13_NDVI --preset MOD16_ET
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yfmodis.backend import GdalBackend, write_array  # noqa: E402
+from yfmodis.blocks import gtiff_options  # noqa: E402
+from yfmodis.mosaic import PIXEL_DTYPES  # noqa: E402
+from yfmodis.presets import PRESETS  # noqa: E402
+
+try:
+    from osgeo import gdal
+except ImportError:
+    gdal = None
+
+# (, gtiff_optionsĲ)һΪarcpyĬѹGeoTIFF
+CONFIGS = [
+    ("striped", {"tiled": False}),
+    ("tiled", {}),
+    ("LZW", {"compress": "LZW"}),
+    ("LZW+predictor", {"compress": "LZW", "predictor": True}),
+    ("DEFLATE", {"compress": "DEFLATE"}),
+    ("DEFLATE+predictor", {"compress": "DEFLATE", "predictor": True}),
+    ("ZSTD", {"compress": "ZSTD"}),
+    ("ZSTD+predictor", {"compress": "ZSTD", "predictor": True}),
+]
+
+
+def synthetic_field(size, dtype, seed=0):
+    """
+    ɿռդ񣺵ͷֱʵ˫ԷŴԼ10%Ϊֵ
+    """
+    rng = np.random.RandomState(seed)
+    info = np.iinfo(dtype)
+    coarse = rng.rand(size // 64 + 2, size // 64 + 2)
+    rows = np.linspace(0, coarse.shape[0] - 1.001, size)
+    cols = np.linspace(0, coarse.shape[1] - 1.001, size)
+    r0, c0 = rows.astype(int), cols.astype(int)
+    fr, fc = (rows - r0)[:, None], (cols - c0)[None, :]
+    field = (coarse[r0][:, c0] * (1 - fr) * (1 - fc) + coarse[r0 + 1][:, c0] * fr * (1 - fc)
+             + coarse[r0][:, c0 + 1] * (1 - fr) * fc + coarse[r0 + 1][:, c0 + 1] * fr * fc)
+    # ЧֵԼռΧ֮һ1%
+    values = (field + rng.normal(0, 0.01, field.shape)).clip(0, 1) * info.max / 3
+    array = values.astype(dtype)
+    array[rng.rand(size, size) < 0.1] = info.max
+    return array, info.max
+
+
+def template(size):
+    ds = gdal.GetDriverByName("MEM").Create("", size, size, 1, gdal.GDT_Byte)
+    ds.SetGeoTransform((0.0, 463.3127, 0.0, 0.0, 0.0, -463.3127))
+    return ds
+
+
+def read_all(path):
+    ds = gdal.Open(path)
+    ds.GetRasterBand(1).ReadAsArray()
+    ds = None
+
+
+def bench_config(tmp_dir, name, kwargs, raw, nodata, scale_factor):
+    """
+    дԭʼդŽ(ԭʼС, ŴС, д, ȡ)
+    """
+    options = gtiff_options(**kwargs)
+    raw_path = os.path.join(tmp_dir, "raw_%s.tif" % name)
+    scaled_path = os.path.join(tmp_dir, "scaled_%s.tif" % name)
+    backend = GdalBackend(creation_options=options)
+    s = time.time()
+    write_array(raw_path, raw, template(raw.shape[0]), nodata, options)
+    backend.times(raw_path, scaled_path, scale_factor)
+    write = time.time() - s
+    s = time.time()
+    read_all(raw_path)
+    read_all(scaled_path)
+    read = time.time() - s
+    return os.path.getsize(raw_path), os.path.getsize(scaled_path), write, read
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=2400, help="raster size in pixels, MOD13Q1 is 4800")
+    parser.add_argument("--preset", action="append", dest="presets", choices=[p for p in PRESETS if p != "custom"],
+                        help="only measure this preset, can be repeated")
+    args = parser.parse_args(argv)
+    if gdal is None:
+        print("GDAL is unavailable, creation options can only be measured with the gdal backend")
+        return 1
+    gdal.UseExceptions()
+    presets = [PRESETS[name] for name in args.presets or PRESETS if PRESETS[name].pixel_type]
+    header = "%-20s %10s %10s %7s %10s %10s" % ("options", "raw MB", "scaled MB", "ratio", "write MB/s",
+                                                "read MB/s")
+    tmp_dir = tempfile.mkdtemp(prefix="yfmodis_bench_")
+    try:
+        for preset in presets:
+            dtype = PIXEL_DTYPES[preset.pixel_type]
+            raw, nodata = synthetic_field(args.size, dtype)
+            # δѹ㣬ļС޹
+            mb = (raw.nbytes + raw.size * 4) / 1024.0 / 1024.0
+            print("%s: %dx%d %s, scale factor %s" % (preset.name, args.size, args.size, dtype, preset.scale_factor))
+            print(header)
+            baseline = None
+            for name, kwargs in CONFIGS:
+                try:
+                    raw_size, scaled_size, write, read = bench_config(tmp_dir, name, kwargs, raw, nodata,
+                                                                      preset.scale_factor)
+                except RuntimeError as err:
+                    print("%-20s unsupported by this GDAL build: %s" % (name, err))
+                    continue
+                total = raw_size + scaled_size
+                if baseline is None:
+                    baseline = total
+                print("%-20s %10.1f %10.1f %7.2f %10.1f %10.1f" % (
+                    name, raw_size / 1024.0 / 1024.0, scaled_size / 1024.0 / 1024.0, float(baseline) / total,
+                    mb / write, mb / read))
+            print("")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
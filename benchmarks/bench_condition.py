@@ -0,0 +1,90 @@
+# -- coding:cp936 C
+"""
+Ϊܲ
+
+ȽϱĤļSetNull_saĺʱûarcpyʱֻǰߡ
+
+    python benchmarks/bench_condition.py --size 4800 --files 10
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yfmodis.condition import compile_condition  # noqa: E402
+
+try:
+    import arcpy
+except ImportError:
+    arcpy = None
+
+CONDITIONS = ["VALUE > 32700",
+              "VALUE < 7500",
+              "VALUE IN (32761, 32762, 32763, 32764, 32765, 32766, 32767)",
+              "VALUE < -2000 OR VALUE BETWEEN 10001 AND 32767"]
+
+
+def synthetic_tile(size, seed=0):
+    # ģMOD13NDVIЧֵ-2000~10000Լ10%Ϊֵ
+    rng = np.random.RandomState(seed)
+    array = rng.randint(-2000, 10001, size=(size, size)).astype("int16")
+    array[rng.rand(size, size) < 0.1] = -3000
+    return array
+
+
+def bench_compiled(arrays, condition):
+    s = time.time()
+    mask = compile_condition(condition)
+    for array in arrays:
+        out = array.copy()
+        out[mask(array)] = -3000
+    return time.time() - s
+
+
+def bench_setnull_sa(arrays, condition, tmp_dir):
+    arcpy.CheckOutExtension("Spatial")
+    arcpy.env.overwriteOutput = True
+    rasters = []
+    for i, array in enumerate(arrays):
+        raster = os.path.join(tmp_dir, "in_%d.tif" % i)
+        arcpy.NumPyArrayToRaster(array, arcpy.Point(0, 0), 250, 250).save(raster)
+        rasters.append(raster)
+    s = time.time()
+    for i, raster in enumerate(rasters):
+        arcpy.gp.SetNull_sa(raster, raster, os.path.join(tmp_dir, "sn_%d.tif" % i), condition)
+    return time.time() - s
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=4800, help="tile size in pixels, MOD13Q1 is 4800")
+    parser.add_argument("--files", type=int, default=10, help="number of tiles")
+    args = parser.parse_args(argv)
+
+    arrays = [synthetic_tile(args.size, seed) for seed in range(args.files)]
+    mb = sum(a.nbytes for a in arrays) / 1024.0 / 1024.0
+    print("%d tiles of %dx%d int16, %.1f MB" % (args.files, args.size, args.size, mb))
+    print("%-60s %17s %17s" % ("condition", "compiled", "SetNull_sa"))
+    for condition in CONDITIONS:
+        used = bench_compiled(arrays, condition)
+        line = "%-60s %7.2fs %4.0fMB/s" % (condition, used, mb / used)
+        if arcpy is not None:
+            tmp_dir = tempfile.mkdtemp()
+            try:
+                used_sa = bench_setnull_sa(arrays, condition, tmp_dir)
+                line += " %7.2fs %4.0fMB/s" % (used_sa, mb / used_sa)
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        else:
+            line += " %17s" % "n/a"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
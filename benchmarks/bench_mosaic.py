@@ -0,0 +1,137 @@
+# -- coding:cp936 C
+"""
+Ƕܲ
+
+ȽNumPyƬƫǶMosaicToNewRaster_managementҪarcpyGDAL VRTҪGDALĺʱ
+ƬΪڵͶӰϲĺʱдarcpyGDALʱ԰дǶ
+
+    python benchmarks/bench_mosaic.py --size 2400 --tiles 4 --groups 3
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yfmodis.mosaic import grid_offsets, mosaic_arrays  # noqa: E402
+from yfmodis.tiles import TILE_SIZE, tile_bounds  # noqa: E402
+
+try:
+    import arcpy
+except ImportError:
+    arcpy = None
+
+try:
+    from osgeo import gdal, osr
+except ImportError:
+    gdal = None
+    osr = None
+
+METHODS = ["FIRST", "LAST", "MEAN", "MINIMUM", "MAXIMUM", "SUM"]
+
+# MODISͶӰ
+SINUSOIDAL = "+proj=sinu +lon_0=0 +x_0=0 +y_0=0 +R=6371007.181 +units=m +no_defs"
+
+NODATA = -3000
+
+
+def synthetic_tiles(size, count, seed=0):
+    """
+    h26v05ʼеƬ[(tile, array)]
+    """
+    rng = np.random.RandomState(seed)
+    tiles = []
+    for i in range(count):
+        array = rng.randint(-2000, 10001, size=(size, size)).astype("int16")
+        array[rng.rand(size, size) < 0.1] = NODATA
+        tiles.append(((26 + i, 5), array))
+    return tiles
+
+
+def write_tiles(tiles, size, tmp_dir, prefix):
+    # ƬΧдGeoTIFFGDALarcpyȡ
+    srs = osr.SpatialReference()
+    srs.ImportFromProj4(SINUSOIDAL)
+    cell = TILE_SIZE / size
+    paths = []
+    for (h, v), array in tiles:
+        x_min, y_min, x_max, y_max = tile_bounds(h, v)
+        path = os.path.join(tmp_dir, "%s.h%02dv%02d.tif" % (prefix, h, v))
+        ds = gdal.GetDriverByName("GTiff").Create(path, size, size, 1, gdal.GDT_Int16)
+        ds.SetGeoTransform((x_min, cell, 0.0, y_max, 0.0, -cell))
+        ds.SetProjection(srs.ExportToWkt())
+        band = ds.GetRasterBand(1)
+        band.SetNoDataValue(NODATA)
+        band.WriteArray(array)
+        ds = None
+        paths.append(path)
+    return paths
+
+
+def bench_arrays(groups, size, method):
+    cell = TILE_SIZE / size
+    s = time.time()
+    for tiles in groups:
+        extents = []
+        for (h, v), array in tiles:
+            x_min, y_min, x_max, y_max = tile_bounds(h, v)
+            extents.append((x_min, y_max, size, size))
+        offsets, shape, origin = grid_offsets(extents, (cell, cell))
+        mosaic_arrays([a for t, a in tiles], offsets, shape, method, [NODATA] * len(tiles), "int16", NODATA)
+    return time.time() - s
+
+
+def bench_backend(backend, rasters_groups, tmp_dir, method):
+    s = time.time()
+    for i, rasters in enumerate(rasters_groups):
+        backend.mosaic(rasters, os.path.join(tmp_dir, "%s_%s_%d.tif" % (backend.name, method, i)),
+                       "16_BIT_SIGNED", method, "FIRST")
+    return time.time() - s
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=2400, help="tile size in pixels, MOD13Q1 is 4800")
+    parser.add_argument("--tiles", type=int, default=4, help="tiles per date group")
+    parser.add_argument("--groups", type=int, default=3, help="number of date groups")
+    args = parser.parse_args(argv)
+
+    groups = [synthetic_tiles(args.size, args.tiles, seed) for seed in range(args.groups)]
+    mb = sum(a.nbytes for tiles in groups for t, a in tiles) / 1024.0 / 1024.0
+    print("%d groups of %d tiles of %dx%d int16, %.1f MB" % (args.groups, args.tiles, args.size, args.size, mb))
+
+    tmp_dir = tempfile.mkdtemp()
+    backends = []
+    try:
+        rasters_groups = None
+        if gdal is not None:
+            from yfmodis.backend import ArcpyBackend, GdalBackend
+            rasters_groups = [write_tiles(tiles, args.size, tmp_dir, "g%d" % i) for i, tiles in enumerate(groups)]
+            backends.append(("gdal native", GdalBackend()))
+            if arcpy is not None:
+                backends.append(("arcpy native", ArcpyBackend(native_mosaic=True)))
+                backends.append(("MosaicToNewRaster", ArcpyBackend()))
+        header = "%-10s %17s" % ("method", "arrays only")
+        for name, _ in backends:
+            header += " %20s" % name
+        print(header)
+        for method in METHODS:
+            used = bench_arrays(groups, args.size, method)
+            line = "%-10s %7.2fs %4.0fMB/s" % (method, used, mb / used)
+            for name, backend in backends:
+                used = bench_backend(backend, rasters_groups, tmp_dir, method)
+                line += " %10.2fs %4.0fMB/s" % (used, mb / used)
+            print(line)
+        if not backends:
+            print("GDAL is unavailable, file based mosaics were not measured")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# -- coding:cp936 C
+"""
+ߺԤ̵
+
+ͶӰģƬļMOD13Q1.A2004001.h26v05.006.2015.hdf;γȱ߽磬
+ûNumPyβbatch_extract_sdsbatch_mosaicbatch_project_rasterbatch_clip_raster
+batch_multiplybatch_setnullԼmod13preprocess/mod16preprocessķֲںϺʽ
+ÿ봦ļͶȡMBҪarcpyGDAL磬ڲǰLinuxз˻
+
+ģݼyfmodis/testing.pyhdf͡tifNumPy.npzļֻڲ߱ĵȡ
+NumPyĿarcpyGDALĶдٶȡ
+
+    python benchmarks/bench_pipeline.py --size 1200 --tiles 2x2 --dates 4 --masks 3 --workers 2
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yfMODISTool  # noqa: E402
+from yfmodis.options import EngineOptions  # noqa: E402
+from yfmodis.report import RunReport  # noqa: E402
+from yfmodis.testing import PRODUCTS, WGS84, NumpyBackend, make_fixtures  # noqa: E402
+
+
+def throughput(report, stage, wall):
+    files = [f for f in report.files if f["stage"] == stage and f["status"] == "completed"]
+    mb = sum(f["bytes_read"] for f in files) / 1024.0 / 1024.0
+    return len(files), mb, len(files) / wall if wall else 0.0, mb / wall if wall else 0.0
+
+
+def bench_stages(root, hdfs, masks, product, workers, backend):
+    """
+    βԸߣÿһΪһ
+    """
+    info = PRODUCTS[product]
+    pixel_type = "16_BIT_SIGNED" if info["dtype"] == "int16" else "16_BIT_UNSIGNED"
+    dirs = [os.path.join(root, name) for name in ["1_extract", "2_mosaic", "3_reproject", "4_clip", "5_setn",
+                                                  "6_scale"]]
+    for d in dirs:
+        os.mkdir(d)
+    report = RunReport()
+    find_tifs = yfMODISTool.find_tifs
+    stages = [
+        ("extract", lambda: yfMODISTool.batch_extract_sds(hdfs, dirs[0], 0, info["sds"][0], workers=workers,
+                                                          backend=backend, report=report)),
+        ("mosaic", lambda: yfMODISTool.batch_mosaic(dirs[0], dirs[1], pixel_type=pixel_type,
+                                                    mosaic_method="LAST", workers=workers, backend=backend,
+                                                    report=report)),
+        ("reproject", lambda: yfMODISTool.batch_project_raster(find_tifs(dirs[1]), dirs[2], prefix="pr_",
+                                                               out_coor_system=WGS84, workers=workers,
+                                                               backend=backend, report=report)),
+        ("clip", lambda: yfMODISTool.batch_clip_raster(find_tifs(dirs[2]), dirs[3], masks, workers=workers,
+                                                       backend=backend, report=report)),
+        ("setnull", lambda: yfMODISTool.batch_setnull(find_tifs(dirs[3]), dirs[4], condition="VALUE > 10000",
+                                                      prefix="sn_", workers=workers, backend=backend,
+                                                      report=report)),
+        ("scale", lambda: yfMODISTool.batch_multiply(find_tifs(dirs[4]), dirs[5], scale_factor=0.0001,
+                                                     workers=workers, backend=backend, report=report)),
+        ("composite", lambda: yfMODISTool.batch_composite(find_tifs(dirs[5]), os.path.join(root, "8_composite"),
+                                                          reducers="MAX;MEAN;MEDIAN;COUNT", period="year",
+                                                          workers=workers, backend=backend, report=report)),
+        ("cube", lambda: yfMODISTool.batch_cube(find_tifs(dirs[5]), os.path.join(root, "7_cube"), masks,
+                                                workers=workers, backend=backend, report=report)),
+        ("zonal", lambda: yfMODISTool.batch_zonal_stats(find_tifs(dirs[2]), os.path.join(root, "9_zonal"), masks,
+                                                        layers=[(0, info["sds"][0], 0.0001, "VALUE > 10000")],
+                                                        workers=workers, backend=backend, report=report)),
+    ]
+    for name, func in stages:
+        s = time.time()
+        func()
+        used = time.time() - s
+        report.add_stage(name, used)
+        yield ("batch_" + name,) + (used,) + throughput(report, name, used)
+
+
+def bench_flows(root, hdfs, masks, product, workers, backend):
+    """
+    Ԥ̣ļMBhdf
+    """
+    preprocess = yfMODISTool.mod13preprocess if product == "MOD13Q1" else yfMODISTool.mod16preprocess
+    mb = sum(os.path.getsize(hdf) for hdf in hdfs) / 1024.0 / 1024.0
+    for mode in ("staged", "fused", "streaming"):
+        workspace = os.path.join(root, "ws_" + mode)
+        s = time.time()
+        engine = EngineOptions(backend=backend, workers=workers, fused=mode == "fused", streaming=mode == "streaming")
+        preprocess(workspace, hdfs, masks, WGS84, tile_filter=True, engine=engine)
+        used = time.time() - s
+        yield "%s %s" % (preprocess.__name__, mode), used, len(hdfs), mb, len(hdfs) / used, mb / used
+
+
+def parse_tiles(text):
+    cols, rows = text.lower().split("x")
+    return int(cols), int(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=1200, help="tile size in pixels, MOD13Q1 is 4800")
+    parser.add_argument("--tiles", type=parse_tiles, default=(2, 2), help="tile columns x rows, e.g. 3x2")
+    parser.add_argument("--dates", type=int, default=4, help="number of dates")
+    parser.add_argument("--masks", type=int, default=3, help="number of clip masks")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes")
+    parser.add_argument("--product", choices=sorted(PRODUCTS), default=None,
+                        help="only run one product, both by default")
+    parser.add_argument("--verbose", action="store_true", help="show the progress messages of every tool")
+    args = parser.parse_args(argv)
+    if not args.verbose:
+        yfMODISTool.add_message = lambda msg: None
+
+    backend = NumpyBackend()
+    print("%dx%d tiles of %dx%d pixels, %d dates, %d masks, %d workers" % (
+        args.tiles[0], args.tiles[1], args.size, args.size, args.dates, args.masks, args.workers))
+    print("%-32s %8s %6s %8s %9s %8s" % ("stage", "time", "files", "MB", "files/s", "MB/s"))
+    for product in [args.product] if args.product else sorted(PRODUCTS):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            hdfs, masks = make_fixtures(tmp_dir, product, args.tiles, args.dates, args.size, args.masks)
+            results = list(bench_stages(tmp_dir, hdfs, masks, product, args.workers, backend))
+            results.extend(bench_flows(tmp_dir, hdfs, masks, product, args.workers, backend))
+            print(product)
+            for name, used, files, mb, files_rate, mb_rate in results:
+                print("  %-30s %7.2fs %6d %8.1f %9.1f %8.1f" % (name, used, files, mb, files_rate, mb_rate))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# -- coding:cp936 C
+"""
+ڵ㹤еı
+
+һ̨Linuxɸ"python -m yfmodis --worker"ӽ̴ڵ㣬
+Զзʽִmod16preprocessڵɵķܺʱ
+--killǿƽһ⵽Ľڵ㹤̣൱ڽڵеķԼںԡ
+
+    python benchmarks/bench_queue.py --nodes 3 --dates 12 --delay 0.5
+    python benchmarks/bench_queue.py --nodes 3 --kill --lease 3
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+import yfMODISTool  # noqa: E402
+from yfmodis.options import EngineOptions  # noqa: E402
+from yfmodis.testing import WGS84, NumpyBackend, make_fixtures  # noqa: E402
+
+
+class SlowBackend(NumpyBackend):
+    """
+    ÿǶǰȴdelay棬ʹĺʱԹ۲Լ
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def mosaic(self, *args):
+        time.sleep(self.delay)
+        NumpyBackend.mosaic(self, *args)
+
+
+def start_node(queue_path, lease):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([ROOT, BENCH_DIR] + [p for p in [env.get("PYTHONPATH")] if p])
+    return subprocess.Popen([sys.executable, "-m", "yfmodis", "--worker", queue_path, "--workers", "1",
+                             "--lease", str(lease), "--wait"], cwd=ROOT, env=env)
+
+
+def kill_on_lease(queue_path, timeout=60):
+    # ǿƽһԼĽڵ㹤̣ͷԼ̵ıعʹĬϵԼʱ
+    local = set(p.pid for p in multiprocessing.active_children())
+    end = time.time() + timeout
+    while time.time() < end:
+        try:
+            conn = sqlite3.connect(queue_path, timeout=60)
+            owners = [row[0] for row in conn.execute("SELECT owner FROM items WHERE status = 'leased'")]
+            conn.close()
+        except sqlite3.Error:
+            owners = []
+        local.update(p.pid for p in multiprocessing.active_children())
+        for owner in owners:
+            pid = int(owner.rsplit(":", 1)[1])
+            if pid not in local:
+                os.kill(pid, signal.SIGKILL)
+                yfMODISTool.add_message("killed worker %s while it held a lease" % owner)
+                return
+        time.sleep(0.05)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=3, help="worker processes standing in for other hosts")
+    parser.add_argument("--workers", type=int, default=1, help="local workers of the publishing process")
+    parser.add_argument("--size", type=int, default=200, help="tile size in pixels")
+    parser.add_argument("--dates", type=int, default=8, help="date groups to publish")
+    parser.add_argument("--delay", type=float, default=0.5, help="seconds each group sleeps before mosaicking")
+    parser.add_argument("--lease", type=float, default=3.0, help="lease duration of the nodes in seconds")
+    parser.add_argument("--kill", action="store_true", help="kill the first node worker that holds a lease")
+    args = parser.parse_args(argv)
+    if not hasattr(signal, "SIGKILL"):
+        args.kill = False
+
+    # ģ룬ʹڵԷлеSlowBackend
+    import bench_queue
+
+    root = tempfile.mkdtemp(prefix="yfmodis_queue_")
+    try:
+        hdfs, masks = make_fixtures(root, "MOD16A2", (2, 2), args.dates, args.size, 1)
+        queue_path = os.path.join(root, "shared", "queue.sqlite")
+        workspace = os.path.join(root, "ws")
+        s = time.time()
+        nodes = [start_node(queue_path, args.lease) for _ in range(args.nodes)]
+        killer = None
+        if args.kill:
+            killer = threading.Thread(target=kill_on_lease, args=(queue_path,))
+            killer.start()
+        try:
+            engine = EngineOptions(backend=bench_queue.SlowBackend(args.delay), workers=args.workers, queue=queue_path)
+            yfMODISTool.mod16preprocess(workspace, hdfs, masks, WGS84, engine=engine)
+        finally:
+            if killer is not None:
+                killer.join()
+            for node in nodes:
+                if node.poll() is None:
+                    node.terminate()
+                node.wait()
+        used = time.time() - s
+        conn = sqlite3.connect(queue_path)
+        owners = conn.execute("SELECT owner, COUNT(*) FROM items WHERE status = 'done' GROUP BY owner").fetchall()
+        retried = conn.execute("SELECT COUNT(*) FROM items WHERE attempts > 1").fetchone()[0]
+        failed = conn.execute("SELECT COUNT(*) FROM items WHERE status != 'done' OR error IS NOT NULL").fetchone()[0]
+        conn.close()
+        outputs = os.listdir(os.path.join(workspace, "5_scale"))
+        print("")
+        print("%d date groups, %d outputs in %.2fs, %d retried after an expired lease, %d failed" % (
+            args.dates, len(outputs), used, retried, failed))
+        for owner, count in sorted(owners):
+            print("%-30s %d groups" % (owner, count))
+        return 1 if failed or len(outputs) != args.dates else 0
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+# -- coding:cp936 C
+import pytest
+
+import yfMODISTool
+from yfmodis.testing import NumpyBackend, make_fixtures
+
+
+@pytest.fixture(autouse=True)
+def messages(monkeypatch):
+    # ռϢ̨
+    collected = []
+    monkeypatch.setattr(yfMODISTool, "add_message", collected.append)
+    return collected
+
+
+@pytest.fixture
+def backend():
+    return NumpyBackend()
+
+
+@pytest.fixture
+def granules(tmpdir):
+    """
+    2x1Ƭ2ڵģMOD13Q12߽磬(Ŀ¼, hdfs, masks)
+    """
+    root = str(tmpdir)
+    hdfs, masks = make_fixtures(root, "MOD13Q1", (2, 1), 2, 40, 2)
+    return root, hdfs, masks
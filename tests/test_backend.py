@@ -0,0 +1,40 @@
+# -- coding:cp936 C
+import pytest
+
+from yfmodis import backend as backend_module
+from yfmodis.backend import GdalBackend, get_backend
+from yfmodis.testing import NumpyBackend
+
+
+def test_backend_object_is_used_as_is():
+    engine = NumpyBackend()
+    assert get_backend(engine) is engine
+
+
+def test_creation_options_copy_the_backend_object():
+    engine = NumpyBackend()
+    copied = get_backend(engine, creation_options="COMPRESS=DEFLATE;PREDICTOR=YES")
+    assert copied is not engine
+    assert engine.creation_options is None
+    assert "COMPRESS=DEFLATE" in copied.creation_options
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_backend("mrt")
+
+
+@pytest.mark.skipif(backend_module.arcpy is not None, reason="arcpy is installed")
+def test_default_backend_requires_arcpy():
+    with pytest.raises(RuntimeError):
+        get_backend()
+
+
+def test_gdal_backend():
+    if backend_module.gdal is None:
+        with pytest.raises(RuntimeError):
+            get_backend("gdal")
+    else:
+        engine = get_backend("gdal", block_size=256)
+        assert isinstance(engine, GdalBackend)
+        assert engine.block_size == 256
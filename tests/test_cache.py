@@ -0,0 +1,81 @@
+# -- coding:cp936 C
+import os
+
+import numpy as np
+import pytest
+
+import yfMODISTool
+from yfmodis.backend import TMP_PREFIX, call_backend
+from yfmodis.cache import StageCache
+from yfmodis.options import CacheOptions, EngineOptions, QAOptions
+from yfmodis.testing import WGS84, NumpyBackend, read_raster, write_raster
+
+
+def write_bytes(path, size):
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+
+
+class BrokenBackend(NumpyBackend):
+    # дһֽ
+    def times(self, raster, out_raster, scale_factor):
+        write_raster(out_raster, np.zeros((2, 2)), 0, 0, 1, None)
+        raise RuntimeError("disk full")
+
+
+def test_evict_keeps_protected_and_final_stages(tmpdir):
+    cache = StageCache(str(tmpdir.join(".yfcache")), max_bytes=150)
+    for name, stage in [("a", "extract"), ("b", "mosaic"), ("c", "reproject"), ("d", "scale")]:
+        path = str(tmpdir.join(name + ".tif"))
+        write_bytes(path, 100)
+        cache.record(path, name, stage)
+    removed = cache.evict(protect_stages=("mosaic", "reproject"))
+    assert removed == [str(tmpdir.join("a.tif"))]
+    assert not os.path.exists(removed[0])
+    assert cache.evict() == [str(tmpdir.join("b.tif"))]
+
+
+def test_eviction_waits_for_the_whole_stage(granules, backend):
+    # QAݼͬһзֱǶͶӰм֮䱻ɾ
+    root, hdfs, masks = granules
+    workspace = os.path.join(root, "ws")
+    yfMODISTool.preprocess(workspace, hdfs, masks, WGS84, sds_index=0, sds_name="NDVI", pixel_type="16_BIT_SIGNED",
+                           condition="VALUE < -2000", engine=EngineOptions(backend=backend),
+                           caching=CacheOptions(cache=True, size=0.001),
+                           qa=QAOptions(sds_index=2, rule="0-1:0,1", pixel_type="16_BIT_SIGNED"))
+    assert len(os.listdir(os.path.join(workspace, "5_scale"))) == 2 * len(masks)
+    for name in ("1_extract", "2_mosaic", "3_reproject", "4_clip"):
+        assert yfMODISTool.find_tifs(os.path.join(workspace, name)) == []
+
+
+def test_call_backend_renames_complete_outputs(tmpdir):
+    src, out = str(tmpdir.join("a.tif")), str(tmpdir.join("b.tif"))
+    write_raster(src, np.arange(4, dtype="int16").reshape(2, 2), 0, 2, 1, None)
+    call_backend(NumpyBackend(), "times", (src, out, 2))
+    assert read_raster(out)["data"].tolist() == [[0, 2], [4, 6]]
+    assert sorted(os.listdir(str(tmpdir))) == ["a.tif", "b.tif"]
+
+
+def test_call_backend_leaves_no_partial_output(tmpdir):
+    src, out = str(tmpdir.join("a.tif")), str(tmpdir.join("b.tif"))
+    write_raster(src, np.ones((2, 2)), 0, 2, 1, None)
+    with pytest.raises(RuntimeError):
+        call_backend(BrokenBackend(), "times", (src, out, 2))
+    assert os.listdir(str(tmpdir)) == ["a.tif"]
+
+
+def test_find_tifs_ignores_temporary_files(tmpdir):
+    for name in ["a.tif", TMP_PREFIX + "1_b.tif", "c.txt"]:
+        write_bytes(str(tmpdir.join(name)), 0)
+    assert yfMODISTool.find_tifs(str(tmpdir)) == [str(tmpdir.join("a.tif"))]
+
+
+def test_cache_recomputes_when_parameters_change(tmpdir, backend):
+    src = str(tmpdir.join("a.tif"))
+    write_raster(src, np.ones((2, 2), dtype="int16"), 0, 2, 1, None)
+    out_dir = str(tmpdir.mkdir("out"))
+    cache = StageCache(str(tmpdir.join(".yfcache")))
+    assert yfMODISTool.batch_multiply([src], out_dir, 0.5, backend=backend, cache=cache) == (1, 0, 0)
+    assert yfMODISTool.batch_multiply([src], out_dir, 0.5, backend=backend, cache=cache) == (0, 1, 0)
+    assert yfMODISTool.batch_multiply([src], out_dir, 0.25, backend=backend, cache=cache) == (1, 0, 0)
+    assert read_raster(os.path.join(out_dir, "a.tif"))["data"].tolist() == [[0.25, 0.25], [0.25, 0.25]]
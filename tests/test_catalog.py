@@ -0,0 +1,57 @@
+# -- coding:cp936 C
+import os
+import time
+
+from yfmodis.catalog import Catalog
+
+
+def age(path, seconds):
+    # ļе޸ʱĵseconds֮ǰʹ¼бʹ
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+    return old
+
+
+def test_list_dir_reuses_the_listing_until_the_folder_changes(tmpdir):
+    folder = tmpdir.mkdir("hdf")
+    folder.join("a.hdf").write("")
+    mtime = age(str(folder), 60)
+    db = str(tmpdir.join(".yfcache", "catalog.sqlite"))
+    catalog = Catalog(db)
+    assert catalog.list_dir(str(folder)) == ["a.hdf"]
+    catalog.close()
+    # ޸ʱ䲻ʱµĿ¼Ҳʹݿебгļ
+    folder.join("b.hdf").write("")
+    os.utime(str(folder), (mtime, mtime))
+    catalog = Catalog(db)
+    assert catalog.list_dir(str(folder)) == ["a.hdf"]
+    assert not catalog.exists(str(folder.join("b.hdf")))
+    # ޸ʱ仯г
+    age(str(folder), 30)
+    assert catalog.list_dir(str(folder)) == ["a.hdf", "b.hdf"]
+    catalog.close()
+
+
+def test_list_dir_rescans_folders_modified_within_the_resolution(tmpdir):
+    folder = tmpdir.mkdir("hdf")
+    catalog = Catalog(str(tmpdir.join("catalog.sqlite")))
+    assert catalog.list_dir(str(folder)) == []
+    # ɨ޸ͬһʱ侫ڣ֮дļûиı޸ʱ
+    folder.join("a.hdf").write("")
+    assert catalog.list_dir(str(folder)) == ["a.hdf"]
+    assert catalog.list_dir(str(tmpdir.join("missing"))) == []
+    catalog.close()
+
+
+def test_record_updates_the_listing(tmpdir):
+    folder = tmpdir.mkdir("5_scale")
+    age(str(folder), 60)
+    catalog = Catalog(str(tmpdir.join("catalog.sqlite")))
+    out = str(folder.join("a.tif"))
+    assert not catalog.exists(out)
+    catalog.record([out], "scale", "completed")
+    assert catalog.exists(out)
+    catalog.record([out], "scale", "errored")
+    assert not catalog.exists(out)
+    assert catalog.status() == {"errored": 1} and catalog.status("mosaic") == {}
+    catalog.close()
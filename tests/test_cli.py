@@ -0,0 +1,87 @@
+# -- coding:cp936 C
+import json
+import os
+
+import pytest
+
+from yfmodis import cli
+from yfmodis.presets import VI_QUALITY
+from yfmodis.testing import WGS84, NumpyBackend, write_mask
+
+
+def write_manifest(root, jobs, defaults=None, name="manifest.json"):
+    path = os.path.join(root, name)
+    with open(path, "w") as f:
+        json.dump({"defaults": defaults or {}, "jobs": jobs}, f)
+    return path
+
+
+@pytest.fixture
+def manifest(granules):
+    root, hdfs, masks = granules
+    defaults = {"out_coor_system": WGS84, "masks": ["masks/*.shp"], "hdfs": ["hdf/MOD13Q1.*.hdf"]}
+    jobs = [{"name": "ndvi", "preset": "MOD13_NDVI", "workspace": "out/ndvi", "workers": 2},
+            {"name": "evi", "preset": "MOD13_EVI", "workspace": "out/evi", "qa": True, "report": "evi.json"}]
+    return root, write_manifest(root, jobs, defaults)
+
+
+def test_load_manifest_merges_defaults_and_presets(manifest):
+    root, path = manifest
+    ndvi, evi = cli.load_manifest(path)
+    assert (ndvi["name"], ndvi["preset"], evi["name"]) == ("ndvi", "MOD13_NDVI", "evi")
+    params = ndvi["params"]
+    # ͨ·嵥ڵļ
+    assert params["workspace"] == os.path.join(root, "out/ndvi")
+    assert len(params["hdfs"]) == 4 and all(os.path.isabs(p) for p in params["hdfs"])
+    assert params["masks"] == sorted(params["masks"]) and len(params["masks"]) == 2
+    assert (params["sds_index"], params["sds_name"], params["workers"]) == (0, "NDVI", 2)
+    assert "qa_rule" not in params
+    # "qa": trueʹԤQA
+    assert (evi["params"]["sds_name"], evi["params"]["qa_rule"]) == ("EVI", VI_QUALITY)
+    assert "qa" not in evi["params"] and evi["params"]["report"] == os.path.join(root, "evi.json")
+
+
+@pytest.mark.parametrize("job, message", [
+    ({"preset": "MOD99"}, "unknown preset MOD99"),
+    ({"worker": 2}, "unknown keys worker"),
+    ({"hdfs": ["hdf/MYD13Q1.*.hdf"]}, "does not match any file"),
+    ({"workspace": ""}, "missing workspace"),
+    ({"preset": "custom", "qa": True}, "has no QA rule"),
+])
+def test_resolve_job_rejects_invalid_jobs(granules, job, message):
+    root, hdfs, masks = granules
+    entry = {"name": "bad", "preset": "MOD13_NDVI", "workspace": "out", "hdfs": ["hdf/*.hdf"],
+             "masks": ["masks/*.shp"], "out_coor_system": WGS84}
+    entry.update(job)
+    with pytest.raises(cli.ManifestError) as err:
+        cli.resolve_job(entry, root)
+    assert message in str(err.value)
+
+
+def test_main_exit_codes(manifest, monkeypatch, messages):
+    root, path = manifest
+    run_job = cli.run_job
+    monkeypatch.setattr(cli, "run_job", lambda job, workers=None, backend=None: run_job(job, workers, NumpyBackend()))
+    assert cli.main([path, "--dry-run"]) == 0
+    assert not os.path.exists(os.path.join(root, "out"))
+    assert cli.main([path, "--job", "ndvi"]) == 0
+    assert len(os.listdir(os.path.join(root, "out", "ndvi", "5_scale"))) == 4
+    # 嵥ʱΪ2
+    assert cli.main([path, "--job", "ndwi"]) == 2
+    assert cli.main([os.path.join(root, "missing.json")]) == 2
+
+
+def test_main_fails_when_files_error(manifest, monkeypatch, messages):
+    root, path = manifest
+    write_mask(os.path.join(root, "masks", "far.shp"), (0.0, 0.0, 1.0, 1.0))
+    run_job = cli.run_job
+    monkeypatch.setattr(cli, "run_job", lambda job, workers=None, backend=None: run_job(job, workers, NumpyBackend()))
+    # Ƭཻı߽ʹҵм¼ļ
+    assert cli.main([path, "--job", "evi"]) == 1
+    with open(os.path.join(root, "evi.json")) as f:
+        assert any(f["status"] == "errored" for f in json.load(f)["files"])
+    assert "1 of 1 jobs failed: evi" in messages
+    # ҵ׳쳣ʱrun_jobNone
+    job = cli.load_manifest(path)[0]
+    job["params"]["backend"] = "unknown"
+    assert run_job(job) is None
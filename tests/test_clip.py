@@ -0,0 +1,50 @@
+# -- coding:cp936 C
+import os
+
+import pytest
+
+import yfMODISTool
+from yfmodis.options import EngineOptions
+from yfmodis.testing import WGS84, write_mask
+
+
+@pytest.fixture
+def far_masks(granules):
+    # б߽֮һƬཻı߽
+    root, hdfs, masks = granules
+    far = os.path.join(root, "masks", "far.shp")
+    write_mask(far, (0.0, 0.0, 1.0, 1.0))
+    return root, hdfs, masks + [far]
+
+
+def test_clip_skips_only_the_mask_that_does_not_overlap(far_masks, backend, messages):
+    root, hdfs, masks = far_masks
+    workspace = os.path.join(root, "ws")
+    yfMODISTool.preprocess(workspace, hdfs, masks[:-1], WGS84, sds_index=0, sds_name="NDVI",
+                           pixel_type="16_BIT_SIGNED", scale_factor=0.0001, engine=EngineOptions(backend=backend))
+    projected = yfMODISTool.find_tifs(os.path.join(workspace, "3_reproject"))
+    out_dir = os.path.join(root, "clip")
+    os.mkdir(out_dir)
+    del messages[:]
+    completed, skipped, errored = yfMODISTool.batch_clip_raster(projected, out_dir, masks, backend=backend)
+    assert (completed, skipped, errored) == (len(projected), 0, len(projected))
+    expected = ["mask%d_%s" % (i, os.path.basename(r)[len("pr_"):]) for r in projected for i in range(len(masks) - 1)]
+    assert sorted(os.listdir(out_dir)) == sorted(expected)
+    assert len([m for m in messages if "| far_" in m and "errored" in m]) == len(projected)
+
+    # ٴʱеཻı߽Ȼ
+    assert yfMODISTool.batch_clip_raster(projected, out_dir, masks, backend=backend) == (len(projected), 0,
+                                                                                        len(projected))
+
+
+@pytest.mark.parametrize("fused", [False, True])
+def test_preprocess_keeps_outputs_of_overlapping_masks(far_masks, backend, messages, fused):
+    root, hdfs, masks = far_masks
+    workspace = os.path.join(root, "ws")
+    yfMODISTool.preprocess(workspace, hdfs, masks, WGS84, sds_index=0, sds_name="NDVI", pixel_type="16_BIT_SIGNED",
+                           condition="VALUE < -2000", scale_factor=0.0001,
+                           engine=EngineOptions(backend=backend, fused=fused))
+    names = os.listdir(os.path.join(workspace, "5_scale"))
+    assert len(names) == 2 * (len(masks) - 1)
+    assert not [n for n in names if "far" in n]
+    assert len([m for m in messages if "far_" in m and "errored" in m]) == 2
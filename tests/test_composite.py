@@ -0,0 +1,65 @@
+# -- coding:cp936 C
+import datetime
+
+import numpy as np
+import pytest
+
+from yfmodis.blocks import FLOAT_NODATA
+from yfmodis.composite import composite_groups, parse_reducers, period_label, reduce_blocks
+from yfmodis.condition import compile_condition
+
+
+@pytest.mark.parametrize("date, period, label", [
+    (datetime.date(2004, 1, 17), "month", "M200401"),
+    (datetime.date(2004, 4, 6), "season", "S2004MAM"),
+    (datetime.date(2004, 2, 18), "season", "S2004DJF"),
+    # 12¼һĶ
+    (datetime.date(2003, 12, 19), "season", "S2004DJF"),
+    (datetime.date(2004, 12, 18), "year", "Y2004"),
+])
+def test_period_label(date, period, label):
+    assert period_label(date, period) == label
+
+
+def test_period_label_and_reducers_reject_unknown_values():
+    with pytest.raises(ValueError):
+        period_label(datetime.date(2004, 1, 1), "week")
+    assert parse_reducers("max; Mean,max") == ["MAX", "MEAN"]
+    assert parse_reducers(None) == []
+    with pytest.raises(ValueError):
+        parse_reducers(["MIN"])
+
+
+def test_composite_groups_put_december_into_next_winter():
+    rasters = ["h_MOD13Q1.A2003353.NDVI.tif", "h_MOD13Q1.A2004001.NDVI.tif", "h_MOD13Q1.A2004001.EVI.tif",
+               "h_MOD13Q1.A2004353.NDVI.tif", "h_NDVI.tif"]
+    groups = composite_groups(rasters, "season")
+    assert groups == {("h_MOD13Q1", "S2004DJF", "NDVI"): rasters[:2],
+                      ("h_MOD13Q1", "S2004DJF", "EVI"): [rasters[2]],
+                      ("h_MOD13Q1", "S2005DJF", "NDVI"): [rasters[3]]}
+
+
+def blocks():
+    # ڵ1x4ڣ-1ΪNoData4ԪûЧֵ
+    return iter([(np.array([[1, 5, -1, -1]], dtype="int16"), -1),
+                 (np.array([[3, -1, 2, -1]], dtype="int16"), -1),
+                 (np.array([[8, 4, 6, -1]], dtype="int16"), -1)])
+
+
+@pytest.mark.parametrize("reducer, expected", [
+    ("MAX", [8, 5, 6, FLOAT_NODATA]),
+    ("MEAN", [4, 4.5, 4, FLOAT_NODATA]),
+    ("MEDIAN", [3, 4.5, 4, FLOAT_NODATA]),
+])
+def test_reduce_blocks_ignores_nodata(reducer, expected):
+    out = reduce_blocks(blocks(), reducer)
+    assert out.dtype == np.float32
+    assert out.tolist() == [expected]
+
+
+def test_reduce_blocks_count_and_condition():
+    count = reduce_blocks(blocks(), "COUNT")
+    assert count.dtype == np.uint16 and count.tolist() == [[3, 2, 2, 0]]
+    # ԪNoDataһϳ
+    out = reduce_blocks(blocks(), "MAX", compile_condition("VALUE > 5"))
+    assert out.tolist() == [[3, 5, 2, FLOAT_NODATA]]
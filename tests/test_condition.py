@@ -0,0 +1,38 @@
+# -- coding:cp936 C
+import numpy as np
+import pytest
+
+from yfmodis.condition import compile_condition
+
+VALUES = np.array([-3000, 0, 5000, 10000, 32761, 32766, 32767])
+
+
+@pytest.mark.parametrize("condition, expected", [
+    ("VALUE > 32700", [0, 0, 0, 0, 1, 1, 1]),
+    ("32700 < VALUE", [0, 0, 0, 0, 1, 1, 1]),
+    ("value <= 0", [1, 1, 0, 0, 0, 0, 0]),
+    ("VALUE = 5000", [0, 0, 1, 0, 0, 0, 0]),
+    ("VALUE <> 5000", [1, 1, 0, 1, 1, 1, 1]),
+    ("VALUE IN (32761, 32767)", [0, 0, 0, 0, 1, 0, 1]),
+    ("VALUE NOT IN (32761, 32767)", [1, 1, 1, 1, 0, 1, 0]),
+    ("VALUE BETWEEN 0 AND 10000", [0, 1, 1, 1, 0, 0, 0]),
+    ("VALUE NOT BETWEEN 0 AND 10000", [1, 0, 0, 0, 1, 1, 1]),
+    ("VALUE < 0 OR VALUE > 10000", [1, 0, 0, 0, 1, 1, 1]),
+    ("VALUE >= 0 & VALUE < 10000", [0, 1, 1, 0, 0, 0, 0]),
+    ("NOT (VALUE < 0 | VALUE > 10000)", [0, 1, 1, 1, 0, 0, 0]),
+    ("VALUE > 1e4", [0, 0, 0, 0, 1, 1, 1]),
+])
+def test_condition(condition, expected):
+    assert compile_condition(condition)(VALUES).tolist() == [bool(v) for v in expected]
+
+
+def test_condition_is_cached():
+    assert compile_condition("VALUE > 1") is compile_condition("VALUE > 1")
+
+
+@pytest.mark.parametrize("condition", [
+    "VALUE >", "VALUE > 1 AND", "(VALUE > 1", "VALUE ! 1", "BAND > 1", "VALUE NOT > 1", "VALUE IN 1, 2",
+])
+def test_invalid_condition(condition):
+    with pytest.raises(ValueError):
+        compile_condition(condition)
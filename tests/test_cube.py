@@ -0,0 +1,74 @@
+# -- coding:cp936 C
+import datetime
+import os
+
+import numpy as np
+import pytest
+
+import yfMODISTool
+from yfmodis.cube import TimeCube, _Array, append_rasters, parse_date
+from yfmodis.testing import write_raster
+
+
+def day(doy):
+    return datetime.date(2004, 1, 1) + datetime.timedelta(doy - 1)
+
+
+def test_cube_round_trip_with_edge_chunks(tmpdir):
+    path = str(tmpdir.join("henan_MOD13Q1_NDVI.zarr"))
+    arrays = [np.arange(35, dtype="int16").reshape(5, 7) + 100 * i for i in range(5)]
+    cube = TimeCube(path)
+    # 5x7դ(2, 3, 4)ֿ飬ʱ䡢СвıԵ
+    cube.create((5, 7), np.dtype("int16"), -3000, (100.0, 0.5, 0.0, 40.0, 0.0, -0.5), "WKT", chunks=(2, 3, 4))
+    # ڰ򣬲Ƚ
+    assert cube.append([(day(17), arrays[1]), (day(1), arrays[0]), (day(33), arrays[2])]) == 3
+    assert cube.append([(day(49), arrays[3]), (day(65), arrays[4]), (day(33), arrays[2])]) == 2
+    reopened = TimeCube(path)
+    assert reopened.dates() == [day(doy) for doy in (1, 17, 33, 49, 65)]
+    data = _Array(os.path.join(path, "data"))
+    assert data.shape == [5, 5, 7] and data.chunks == [2, 3, 4] and data.fill_value == -3000
+    assert (data.read() == np.stack(arrays)).all()
+    assert _Array(os.path.join(path, "x")).read().tolist() == [100.25 + 0.5 * i for i in range(7)]
+
+
+def test_cube_append_rejects_duplicate_and_earlier_dates(tmpdir):
+    cube = TimeCube(str(tmpdir.join("cube.zarr")))
+    cube.create((2, 2), np.dtype("float32"), None, (0.0, 1.0, 0.0, 2.0, 0.0, -1.0), "WKT")
+    ones = np.ones((2, 2), dtype="float32")
+    with pytest.raises(ValueError):
+        cube.append([(day(1), ones), (day(1), ones * 2)])
+    assert cube.dates() == []
+    cube.append([(day(17), ones)])
+    with pytest.raises(ValueError):
+        cube.append([(day(1), ones)])
+
+
+def test_append_rasters_rejects_undated_and_duplicate_rasters(tmpdir, backend):
+    rasters = []
+    for name in ("mask0_MOD13Q1.A2004001.NDVI.tif", "old_mask0_MOD13Q1.A2004001.NDVI.tif", "mask0_NDVI.tif"):
+        rasters.append(str(tmpdir.join(name)))
+        write_raster(rasters[-1], np.ones((2, 2), dtype="int16"), 0, 2, 1, -3000)
+    assert parse_date(rasters[2]) is None
+    cube_path = str(tmpdir.join("cube.zarr"))
+    with pytest.raises(ValueError) as err:
+        append_rasters(backend, cube_path, rasters)
+    assert "mask0_NDVI.tif" in str(err.value)
+    with pytest.raises(ValueError):
+        append_rasters(backend, cube_path, rasters[:2])
+    # ʱ
+    assert not os.path.exists(cube_path)
+
+
+def test_batch_cube_writes_one_cube_per_product(tmpdir, backend):
+    rasters = []
+    for product, value in (("MOD13Q1", 1), ("MYD13Q1", 2)):
+        for doy in ("001", "017"):
+            rasters.append(str(tmpdir.join("mask0_%s.A2004%s.NDVI.tif" % (product, doy))))
+            write_raster(rasters[-1], np.full((3, 3), value, dtype="int16"), 0, 3, 1, -3000)
+    out_dir = str(tmpdir.join("6_cube"))
+    yfMODISTool.batch_cube(rasters, out_dir, ["masks/mask0.shp"], backend=backend)
+    assert sorted(os.listdir(out_dir)) == ["mask0_MOD13Q1_NDVI.zarr", "mask0_MYD13Q1_NDVI.zarr"]
+    for product, value in (("MOD13Q1", 1), ("MYD13Q1", 2)):
+        path = os.path.join(out_dir, "mask0_%s_NDVI.zarr" % product)
+        assert TimeCube(path).dates() == [day(1), day(17)]
+        assert (_Array(os.path.join(path, "data")).read() == value).all()
@@ -0,0 +1,31 @@
+# -- coding:cp936 C
+from yfmodis.catalog import dedup_granules, parse_granule
+
+V6 = "MOD13Q1.A2004001.h26v05.006.2015154153423.hdf"
+V6_REPROCESSED = "MOD13Q1.A2004001.h26v05.006.2016001000000.hdf"
+V61 = "MOD13Q1.A2004001.h26v05.061.2020001000000.hdf"
+OTHER_TILE = "MOD13Q1.A2004001.h27v05.006.2015154153423.hdf"
+
+
+def test_parse_granule():
+    info = parse_granule("/data/" + V61)
+    assert info == {"product": "MOD13Q1", "date": "A2004001", "tile": "h26v05", "collection": "061",
+                    "production": "2020001000000"}
+    assert parse_granule("ndvi.hdf") is None
+
+
+def test_newest_collection_and_production_win():
+    kept, dropped = dedup_granules([V6, V61, OTHER_TILE, V6_REPROCESSED])
+    assert kept == [V61, OTHER_TILE]
+    assert sorted(dropped) == sorted([(V6, V61), (V6_REPROCESSED, V61)])
+
+
+def test_preferred_collection():
+    kept, dropped = dedup_granules([V6, V61, V6_REPROCESSED], collections="006")
+    assert kept == [V6_REPROCESSED]
+
+
+def test_unparsed_and_repeated_files():
+    kept, dropped = dedup_granules(["ndvi.hdf", V6, V6])
+    assert kept == ["ndvi.hdf", V6]
+    assert dropped == [(V6, V6)]
@@ -0,0 +1,63 @@
+# -- coding:cp936 C
+import os
+
+import numpy as np
+import pytest
+
+import yfMODISTool
+from yfmodis.options import CacheOptions, EngineOptions, OutputOptions, QAOptions, split_options
+from yfmodis.testing import WGS84, read_raster
+
+
+def run(root, hdfs, masks, name, **engine):
+    workspace = os.path.join(root, name)
+    yfMODISTool.preprocess(workspace, hdfs, masks, WGS84, sds_index=0, sds_name="NDVI", pixel_type="16_BIT_SIGNED",
+                           condition="VALUE < -2000", scale_factor=0.0001, layers="0:NDVI;1:EVI",
+                           engine=EngineOptions(**engine))
+    out_dir = os.path.join(workspace, "5_scale")
+    return dict((name, read_raster(os.path.join(out_dir, name))) for name in sorted(os.listdir(out_dir)))
+
+
+@pytest.mark.parametrize("mode", ["fused", "streaming"])
+def test_grouped_flows_match_staged_outputs(granules, backend, mode):
+    root, hdfs, masks = granules
+    staged = run(root, hdfs, masks, "staged", backend=backend)
+    grouped = run(root, hdfs, masks, mode, backend=backend, **{mode: True})
+    # 2 x 2߽ x 2ݼļֲͬ
+    assert len(staged) == 8
+    assert sorted(grouped) == sorted(staged)
+    for name in staged:
+        np.testing.assert_allclose(grouped[name]["data"], staged[name]["data"])
+        assert grouped[name]["x_min"] == staged[name]["x_min"]
+        assert grouped[name]["y_max"] == staged[name]["y_max"]
+
+
+def test_fused_flow_writes_only_the_final_stage(granules, backend):
+    root, hdfs, masks = granules
+    run(root, hdfs, masks, "fused", backend=backend, fused=True)
+    assert os.listdir(os.path.join(root, "fused")) == ["5_scale"]
+    run(root, hdfs, masks, "kept", backend=backend, fused=True, keep_intermediate=True)
+    assert sorted(os.listdir(os.path.join(root, "kept"))) == ["1_extract", "2_mosaic", "3_reproject", "4_clip",
+                                                              "5_scale"]
+
+
+def test_split_options_groups_flat_parameters():
+    kwargs = split_options({"workspace": "out", "sds_index": 0, "workers": 4, "fused": True, "cache_size": 2048,
+                            "composite": "max;mean", "composite_period": "season", "qa_sds_index": 2,
+                            "qa_rule": "0-1:0,1"})
+    assert kwargs["workspace"] == "out" and kwargs["sds_index"] == 0
+    assert kwargs["engine"].workers == 4 and kwargs["engine"].fused and kwargs["engine"].by_group
+    assert kwargs["caching"].size == 2048 and kwargs["caching"].cache is None
+    assert kwargs["output"].composite == ["MAX", "MEAN"] and kwargs["output"].period == "season"
+    assert kwargs["qa"].sds_index == 2 and kwargs["qa"].pixel_type == "16_BIT_UNSIGNED"
+    assert not set(kwargs) & {"workers", "fused", "cache_size", "composite", "qa_rule"}
+
+
+def test_options_are_checked_before_processing():
+    with pytest.raises(ValueError):
+        OutputOptions(composite="MAX", period="week")
+    with pytest.raises(ValueError):
+        OutputOptions(zonal=True, cube=True)
+    with pytest.raises(ValueError):
+        QAOptions(rule="0-1:0,1")
+    assert not CacheOptions().catalog
@@ -0,0 +1,38 @@
+# -- coding:cp936 C
+import yfMODISTool
+
+HDFS = ["MOD16A2.A2004001.h26v05.006.2015.hdf", "MOD16A2.A2004001.h27v05.006.2015.hdf"]
+
+
+def test_metadata_replaces_scale_and_condition():
+    metadata = {"MOD16A2:0": {"scale_factor": 0.1, "valid_range": [-32767, 32700], "fill_value": 32767}}
+    layers = yfMODISTool.metadata_layers([(0, "ET", 1, None)], HDFS, metadata)
+    assert layers == [(0, "ET", 0.1, "VALUE < -32767 OR VALUE > 32700")]
+
+
+def test_metadata_without_scale_factor_keeps_the_layer_scale():
+    metadata = {"MOD16A2:0": {"scale_factor": None, "valid_range": None, "fill_value": 32767}}
+    layers = yfMODISTool.metadata_layers([(0, "ET", 0.1, "VALUE > 32700")], HDFS, metadata)
+    assert layers == [(0, "ET", 0.1, "VALUE = 32767")]
+
+
+def test_missing_metadata_keeps_the_layer():
+    layers = yfMODISTool.metadata_layers([(2, "PET", 0.1, "VALUE > 32700")], HDFS, {})
+    assert layers == [(2, "PET", 0.1, "VALUE > 32700")]
+
+
+def test_metadata_with_add_offset_keeps_the_layer(messages):
+    metadata = {"MOD16A2:0": {"scale_factor": 0.1, "valid_range": [0, 32700], "fill_value": 32767,
+                              "add_offset": 5.0}}
+    layers = yfMODISTool.metadata_layers([(0, "ET", 0.1, "VALUE > 32700")], HDFS, metadata)
+    assert layers == [(0, "ET", 0.1, "VALUE > 32700")]
+    assert "add_offset 5.0" in messages[0]
+
+
+def test_scale_factor_interpretation_is_logged_for_each_subdataset(messages):
+    metadata = {"MOD16A2:0": {"scale_factor": 10000, "valid_range": None, "fill_value": None, "add_offset": 0.0},
+                "MOD16A2:1": {"scale_factor": 0.02, "valid_range": None, "fill_value": None, "add_offset": 0.0}}
+    layers = yfMODISTool.metadata_layers([(0, "NDVI", 1, None), (1, "LST", 1, None)], HDFS, metadata)
+    assert layers == [(0, "NDVI", 0.0001, None), (1, "LST", 0.02, None)]
+    assert "scale_factor 10000 read as a divisor" in messages[0]
+    assert "scale_factor 0.02 read as a multiplier" in messages[1]
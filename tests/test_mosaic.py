@@ -0,0 +1,40 @@
+# -- coding:cp936 C
+import numpy as np
+import pytest
+
+from yfmodis.mosaic import grid_offsets, mosaic_arrays
+
+
+def test_grid_offsets_place_tiles_on_one_grid():
+    # 2x14x3ԪƬҲƬ´һ
+    offsets, shape, origin = grid_offsets([(100.0, 50.0, 4, 3), (140.0, 40.0, 4, 3)], (10.0, 10.0))
+    assert offsets == [(0, 0), (4, 1)]
+    assert shape == (8, 4)
+    assert origin == (100.0, 50.0)
+
+
+def test_grid_offsets_reject_unaligned_tiles():
+    with pytest.raises(ValueError):
+        grid_offsets([(100.0, 50.0, 4, 3), (145.0, 50.0, 4, 3)], (10.0, 10.0))
+
+
+def test_mosaic_arrays_overlap_methods():
+    a = np.array([[1, 2], [3, -1]], dtype="int16")
+    b = np.array([[5, 0], [-1, 7]], dtype="int16")
+    offsets = [(0, 0), (1, 0)]
+    # 3x22ص-1ΪNoData
+    kwargs = {"nodatas": [-1, -1], "out_nodata": -1}
+    assert mosaic_arrays([a, b], offsets, (3, 2), "FIRST", **kwargs).tolist() == [[1, 2, 0], [3, -1, 7]]
+    assert mosaic_arrays([a, b], offsets, (3, 2), "LAST", **kwargs).tolist() == [[1, 5, 0], [3, -1, 7]]
+    assert mosaic_arrays([a, b], offsets, (3, 2), "MINIMUM", **kwargs).tolist() == [[1, 2, 0], [3, -1, 7]]
+    assert mosaic_arrays([a, b], offsets, (3, 2), "MAXIMUM", **kwargs).tolist() == [[1, 5, 0], [3, -1, 7]]
+    assert mosaic_arrays([a, b], offsets, (3, 2), "SUM", **kwargs).tolist() == [[1, 7, 0], [3, -1, 7]]
+    mean = mosaic_arrays([a, b], offsets, (3, 2), "BLEND", out_dtype="float32", **kwargs)
+    assert mean.dtype == np.float32 and mean.tolist() == [[1, 3.5, 0], [3, -1, 7]]
+
+
+def test_mosaic_arrays_sum_does_not_overflow_and_rejects_unknown_methods():
+    a = np.full((1, 1), 200, dtype="uint8")
+    assert mosaic_arrays([a, a], [(0, 0), (0, 0)], (1, 1), "SUM", out_dtype="uint16").tolist() == [[400]]
+    with pytest.raises(ValueError):
+        mosaic_arrays([a], [(0, 0)], (1, 1), "MEDIAN")
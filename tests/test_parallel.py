@@ -0,0 +1,34 @@
+# -- coding:cp936 C
+import os
+import signal
+
+import pytest
+
+from yfmodis.parallel import stream_groups
+
+
+def write_text(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def kill_self():
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="requires SIGKILL")
+def test_stream_groups_reports_lost_tasks(tmpdir):
+    # ˳Ͳpickle񶼷شϢһֱȴ
+    out = str(tmpdir.join("a.txt"))
+    tasks = [("a", write_text, (out, "a")), ("killed", kill_self, ()), ("unpicklable", write_text, (lambda: 0, ""))]
+    groups = [("ga", ["a"]), ("gk", ["killed"])]
+    downstream = {"ga": (write_text, (str(tmpdir.join("ga.txt")), "ga")), "gk": (write_text, (out, "gk"))}
+    results = dict(((kind, name), err) for kind, name, used, err, cpu, peak in
+                   stream_groups(tasks, groups, downstream, workers=2))
+    assert sorted(results) == [("group", "ga"), ("group", "gk"), ("task", "a"), ("task", "killed"),
+                               ("task", "unpicklable")]
+    assert results[("task", "a")] is None and results[("group", "ga")] is None
+    assert "exited unexpectedly" in results[("task", "killed")]
+    assert results[("task", "unpicklable")]
+    assert results[("group", "gk")] == "skipped because an input task errored"
+    assert tmpdir.join("ga.txt").read() == "ga"
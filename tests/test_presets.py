@@ -0,0 +1,64 @@
+# -- coding:cp936 C
+import os
+
+import pytest
+
+import yfMODISTool
+from yfmodis.options import EngineOptions
+from yfmodis.presets import PRESETS, STAGES, Preset, get_preset
+from yfmodis.qa import parse_qa_rule
+from yfmodis.testing import WGS84
+
+
+class Parameter(object):
+    value = None
+
+
+@pytest.mark.parametrize("name", [name for name in PRESETS if name != "custom"])
+def test_presets_are_complete(name):
+    preset = get_preset(name)
+    assert set(preset.defaults()) >= {"sds_index", "sds_name", "pixel_type", "scale_factor"}
+    # ûֵĲƷִΪ
+    assert ("setnull" in preset.stages) == (preset.condition is not None)
+    if preset.qa_rule:
+        parse_qa_rule(preset.qa_rule)
+        assert set(preset.qa_defaults()) == {"qa_sds_index", "qa_rule", "qa_pixel_type"}
+
+
+def test_custom_preset_leaves_every_parameter_to_the_user():
+    assert get_preset(None) is PRESETS["custom"]
+    assert get_preset("custom").defaults() == {} and get_preset("custom").qa_defaults() == {}
+    assert get_preset("custom").stages == list(STAGES)
+    with pytest.raises(ValueError):
+        get_preset("MOD99")
+
+
+def test_only_optional_stages_can_be_skipped():
+    assert Preset("MOD09", skip=("mosaic", "reproject")).stages == ["extract", "clip", "setnull", "scale"]
+    with pytest.raises(ValueError):
+        Preset("MOD09", skip=("clip",))
+
+
+def test_apply_preset_fills_toolbox_parameters():
+    parameters = [Parameter() for _ in range(46)]
+    yfMODISTool.apply_preset(parameters, get_preset("MOD16_ET"))
+    assert [parameters[i].value for i in (6, 7, 8, 9, 16, 43)] == [0, "ET", "16_BIT_UNSIGNED", 0.1, "VALUE > 32700",
+                                                                   4]
+    # ԤΪNoneĲû
+    assert parameters[5].value is None
+
+
+@pytest.mark.parametrize("mode", ["fused", "streaming"])
+def test_every_flow_honours_preset_stages(granules, backend, mode):
+    root, hdfs, masks = granules
+    preset = get_preset("MOD13_NDVI")
+    outputs = []
+    for name, engine in [("staged", EngineOptions(backend=backend)),
+                         (mode, EngineOptions(backend=backend, **{mode: True}))]:
+        workspace = os.path.join(root, name)
+        yfMODISTool.preprocess(workspace, hdfs, masks, WGS84, stages=preset.stages, engine=engine,
+                               **preset.defaults())
+        outputs.append(sorted(os.listdir(os.path.join(workspace, "5_scale"))))
+    # MOD13Ϊգļsn_ǰ׺
+    assert outputs[0] == outputs[1] and len(outputs[0]) == 2 * len(masks)
+    assert not any("sn_" in name for name in outputs[0])
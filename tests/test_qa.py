@@ -0,0 +1,92 @@
+# -- coding:cp936 C
+import os
+
+import numpy as np
+import pytest
+
+import yfMODISTool
+from yfmodis.blocks import FLOAT_NODATA
+from yfmodis.options import EngineOptions, QAOptions
+from yfmodis.qa import parse_qa_rule, qa_invalid, qa_raster_of, qa_valid
+from yfmodis.testing import WGS84, read_raster
+
+RULE = "0-1:0,1;2-5:0-11"
+
+
+def test_parse_qa_rule():
+    assert parse_qa_rule(RULE) == [(0, 2, frozenset([0, 1])), (2, 4, frozenset(range(12)))]
+    assert parse_qa_rule("10:0") == [(10, 1, frozenset([0]))]
+
+
+@pytest.mark.parametrize("rule", ["", "0-1", "0-1:", "a:0", "0-1:4", "30-33:0", "0-1:0,x"])
+def test_invalid_qa_rule(rule):
+    with pytest.raises(ValueError):
+        parse_qa_rule(rule)
+    # еĲǰ
+    if rule:
+        with pytest.raises(ValueError):
+            QAOptions(sds_index=2, rule=rule)
+
+
+@pytest.mark.parametrize("dtype", ["uint8", "uint16", "int16", "int32"])
+def test_lookup_table_matches_bit_fields(dtype):
+    rng = np.random.RandomState(0)
+    info = np.iinfo(dtype)
+    qa = rng.randint(max(info.min, -2 ** 31), min(info.max, 2 ** 31 - 1), size=1000).astype(dtype)
+    # зͰͬȵ޷ͽ
+    unsigned = qa.astype("uint%d" % (8 * qa.dtype.itemsize))
+    expected = ~qa_valid(unsigned, parse_qa_rule(RULE))
+    assert (qa_invalid(qa, RULE) == expected).all()
+
+
+def test_qa_nodata_is_invalid():
+    qa = np.array([0, 1, 65535], dtype="uint16")
+    assert qa_invalid(qa, "0-1:0,1,2,3", 65535).tolist() == [False, False, True]
+
+
+def test_qa_raster_of():
+    assert qa_raster_of(os.path.join("4_clip", "mask0_MOD13Q1.A2004001.NDVI.tif")) == \
+        os.path.join("4_clip", "mask0_MOD13Q1.A2004001.QA.tif")
+
+
+def run(root, hdfs, masks, backend, name, **engine):
+    workspace = os.path.join(root, name)
+    yfMODISTool.preprocess(workspace, hdfs, masks, WGS84, sds_index=0, sds_name="NDVI", pixel_type="16_BIT_SIGNED",
+                           condition="VALUE < -2000 OR VALUE > 10000", scale_factor=0.0001,
+                           engine=EngineOptions(backend=backend, **engine),
+                           qa=QAOptions(sds_index=2, rule="0-1:0,1", pixel_type="16_BIT_SIGNED"))
+    return workspace
+
+
+def test_qa_mask_in_staged_and_fused_flows(granules, backend):
+    root, hdfs, masks = granules
+    staged = run(root, hdfs, masks, backend, "staged")
+    fused = run(root, hdfs, masks, backend, "fused", fused=True)
+    names = sorted(os.listdir(os.path.join(staged, "5_scale")))
+    assert len(names) == 2 * len(masks)
+    assert names == sorted(os.listdir(os.path.join(fused, "5_scale")))
+    for name in names:
+        out = read_raster(os.path.join(staged, "5_scale", name))["data"]
+        assert (out == read_raster(os.path.join(fused, "5_scale", name))["data"]).all()
+        clip_name = name[len("sn_"):]
+        data = read_raster(os.path.join(staged, "4_clip", clip_name))["data"]
+        qa = read_raster(qa_raster_of(os.path.join(staged, "4_clip", clip_name)))
+        invalid = qa_invalid(qa["data"], "0-1:0,1", qa["nodata"]) | (data < -2000) | (data > 10000)
+        assert invalid.any() and (~invalid).any()
+        assert (out[invalid] == FLOAT_NODATA).all()
+        assert np.allclose(out[~invalid], data[~invalid] * 0.0001)
+
+
+def test_qa_layer_shares_each_staged_batch(granules, backend, messages):
+    root, hdfs, masks = granules
+    workspace = os.path.join(root, "ws")
+    yfMODISTool.preprocess(workspace, hdfs, masks, WGS84, sds_index=0, sds_name="NDVI", pixel_type="16_BIT_SIGNED",
+                           scale_factor=0.0001, engine=EngineOptions(backend=backend),
+                           qa=QAOptions(sds_index=2, rule="0-1:0,1", pixel_type="32_BIT_SIGNED"))
+    # ÿһִֻһQAݼͬһ
+    summaries = [m for m in messages if m.endswith(" errored") and " | " not in m]
+    assert summaries == ["4 completed, 0 skipped, 0 errored"] * 5
+    mosaic = os.path.join(workspace, "2_mosaic")
+    dtypes = dict((yfMODISTool.layer_of(n), read_raster(os.path.join(mosaic, n))["data"].dtype.name)
+                  for n in os.listdir(mosaic))
+    assert dtypes == {"NDVI": "int16", "QA": "int32"}
@@ -0,0 +1,74 @@
+# -- coding:cp936 C
+import csv
+import json
+import os
+
+import numpy as np
+import pytest
+
+import yfMODISTool
+from yfmodis.report import RunReport, instrumented
+from yfmodis.testing import write_raster
+
+
+def make_report():
+    report = RunReport()
+    report.add_file("extract", "a.hdf", "completed", 1.5, 1.0, 100, 10, 20)
+    report.add_file("extract", "b.hdf", "errored", 0.5, 0.25, 300, 5, 0)
+    report.add_file("mosaic", "a.tif", "skipped")
+    report.add_stage("extract", 2.0)
+    report.add_stage("mosaic", 0.1)
+    return report
+
+
+def test_report_json_summarizes_stages(tmpdir):
+    path = str(tmpdir.join("report.json"))
+    make_report().save(path)
+    with open(path) as f:
+        data = json.load(f)
+    assert [f["label"] for f in data["files"]] == ["a.hdf", "b.hdf", "a.tif"]
+    extract, mosaic = data["stages"]
+    assert extract == {"stage": "extract", "wall": 2.0, "cpu": 1.25, "files": 2, "completed": 1, "skipped": 0,
+                       "errored": 1, "peak_rss": 300, "bytes_read": 15, "bytes_written": 20}
+    assert mosaic["skipped"] == 1 and mosaic["peak_rss"] is None
+
+
+def test_report_csv_writes_files_and_stages(tmpdir):
+    path = str(tmpdir.join("report.csv"))
+    make_report().save(path)
+    with open(path) as f:
+        files = list(csv.DictReader(f))
+    with open(str(tmpdir.join("report_stages.csv"))) as f:
+        stages = list(csv.DictReader(f))
+    assert [(f["stage"], f["status"]) for f in files] == [("extract", "completed"), ("extract", "errored"),
+                                                         ("mosaic", "skipped")]
+    assert [(s["stage"], s["files"], s["errored"]) for s in stages] == [("extract", "2", "1"), ("mosaic", "1", "0")]
+
+
+def test_batch_tools_record_each_file(tmpdir, backend):
+    src = str(tmpdir.join("a.tif"))
+    write_raster(src, np.ones((2, 2), dtype="int16"), 0, 2, 1, None)
+    out_dir = str(tmpdir.mkdir("out"))
+    report = RunReport()
+    yfMODISTool.batch_multiply([src], out_dir, 0.5, backend=backend, report=report)
+    yfMODISTool.batch_multiply([src], out_dir, 0.5, backend=backend, report=report)
+    out = os.path.join(out_dir, "a.tif")
+    assert [(f["stage"], f["label"], f["status"]) for f in report.files] == [("scale", out, "completed"),
+                                                                            ("scale", out, "skipped")]
+    assert report.files[0]["bytes_read"] == os.path.getsize(src)
+    assert report.files[0]["bytes_written"] == os.path.getsize(out)
+
+
+def test_instrumented_saves_the_report_when_the_run_fails(tmpdir):
+    @instrumented
+    def run(report=None):
+        report.add_stage("extract", 1.0)
+        raise RuntimeError("broken")
+
+    path = str(tmpdir.join("report.json"))
+    profile = str(tmpdir.join("run.prof"))
+    with pytest.raises(RuntimeError):
+        run(report=path, profile=profile)
+    with open(path) as f:
+        assert json.load(f)["stages"][0]["stage"] == "extract"
+    assert os.path.exists(profile)
@@ -0,0 +1,42 @@
+# -- coding:cp936 C
+import os
+
+import yfMODISTool
+
+
+def write_text(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def fail(path):
+    raise ValueError("broken %s" % os.path.basename(path))
+
+
+def test_run_batch_skips_existing_outputs(tmpdir, messages):
+    a, b = str(tmpdir.join("a.txt")), str(tmpdir.join("b.txt"))
+    jobs = [("a", a, write_text, (a, "1")), ("b", b, fail, (b,))]
+    assert yfMODISTool.run_batch(jobs) == (1, 0, 1)
+    assert "2/2 | b errored, broken b.txt" in messages
+    # Ӱʱִֻû
+    assert yfMODISTool.run_batch(jobs) == (0, 1, 1)
+    assert "1/2 | a already exists" in messages
+
+
+def test_run_batch_list_outputs_are_skipped_only_when_all_exist(tmpdir):
+    a, b = str(tmpdir.join("a.txt")), str(tmpdir.join("b.txt"))
+    write_text(a, "old")
+    jobs = [("ab", [a, b], write_text, (b, "1"))]
+    assert yfMODISTool.run_batch(jobs) == (1, 0, 0)
+    assert yfMODISTool.run_batch(jobs) == (0, 1, 0)
+
+
+def test_process_pool_reports_in_submission_order(tmpdir, messages):
+    paths = [str(tmpdir.join("%d.txt" % i)) for i in range(6)]
+    jobs = [(os.path.basename(p), p, fail if i == 2 else write_text, (p,) if i == 2 else (p, str(i)))
+            for i, p in enumerate(paths)]
+    assert yfMODISTool.run_batch(jobs, workers=3) == (5, 0, 1)
+    progress = [m.split(" | ")[0] for m in messages if " | " in m]
+    assert progress == ["%d/6" % i for i in range(1, 7)]
+    assert [tmpdir.join("%d.txt" % i).check() for i in range(6)] == [True, True, False, True, True, True]
+    assert tmpdir.join("5.txt").read() == "5"
@@ -0,0 +1,35 @@
+# -- coding:cp936 C
+import os
+
+from yfmodis.testing import write_mask
+from yfmodis.tiles import filter_hdfs, intersects, parse_tile
+
+
+def test_parse_tile():
+    assert parse_tile("MOD13Q1.A2004001.h26v05.006.2015.hdf") == (26, 5)
+    assert parse_tile("MOD17A3.A2004001.global.hdf") is None
+
+
+def test_intersects():
+    # h26v05Ϊγ30~40ȣγ33ȴԼΪ95~107
+    assert intersects((26, 5), (100.0, 33.0, 101.0, 34.0))
+    assert not intersects((26, 5), (113.0, 33.0, 114.0, 34.0))
+    assert not intersects((26, 5), (100.0, 10.0, 101.0, 11.0))
+
+
+def test_filter_hdfs(tmpdir):
+    mask = str(tmpdir.join("qinghai.shp"))
+    write_mask(mask, (100.0, 33.0, 101.0, 34.0))
+    hdfs = ["MOD13Q1.A2004001.h26v05.006.2015.hdf", "MOD13Q1.A2004001.h10v05.006.2015.hdf",
+            "MOD17A3.A2004001.global.hdf"]
+    kept, skipped = filter_hdfs(hdfs, [mask])
+    assert kept == [hdfs[0], hdfs[2]]
+    assert skipped == [hdfs[1]]
+
+
+def test_filter_hdfs_keeps_all_without_prj(tmpdir):
+    mask = str(tmpdir.join("qinghai.shp"))
+    write_mask(mask, (100.0, 33.0, 101.0, 34.0))
+    os.remove(str(tmpdir.join("qinghai.prj")))
+    hdfs = ["MOD13Q1.A2004001.h10v05.006.2015.hdf"]
+    assert filter_hdfs(hdfs, [mask]) == (hdfs, [])
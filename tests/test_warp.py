@@ -0,0 +1,55 @@
+# -- coding:cp936 C
+import os
+import time
+
+import numpy as np
+import pytest
+
+from yfmodis.cache import prune_dir
+
+
+def write_entry(path, key, size, used):
+    for ext in (".npy", ".json"):
+        name = os.path.join(path, key + ext)
+        with open(name, "wb") as f:
+            f.write(b"\0" * (size // 2))
+        os.utime(name, (used, used))
+
+
+def test_prune_dir_removes_least_recently_used_entries(tmpdir):
+    now = time.time()
+    for i, key in enumerate(["a", "b", "c"]):
+        write_entry(str(tmpdir), key, 100, now - 100 + i)
+    # деʱļҲɾ
+    tmpdir.join("a.123.npy").write("x" * 1000)
+    assert prune_dir(str(tmpdir), 150, keep=("a",)) == ["b", "c"]
+    assert sorted(os.listdir(str(tmpdir))) == ["a.123.npy", "a.json", "a.npy"]
+    assert prune_dir(str(tmpdir), None) == []
+
+
+def test_warp_plan_is_reused_and_capped(tmpdir):
+    gdal = pytest.importorskip("osgeo.gdal")
+    osr = pytest.importorskip("osgeo.osr")
+    from yfmodis.warp import load_plan
+
+    sinusoidal = osr.SpatialReference()
+    sinusoidal.ImportFromProj4("+proj=sinu +lon_0=0 +x_0=0 +y_0=0 +R=6371007.181 +units=m +no_defs")
+    wgs84 = osr.SpatialReference()
+    wgs84.ImportFromEPSG(4326)
+
+    def grid(x_min):
+        ds = gdal.GetDriverByName("MEM").Create("", 20, 20, 1, gdal.GDT_Int16)
+        ds.SetGeoTransform((x_min, 463.3, 0, 3700000.0, 0, -463.3))
+        ds.SetProjection(sinusoidal.ExportToWkt())
+        return ds
+
+    plan_dir = str(tmpdir.join("warp"))
+    index, meta = load_plan(plan_dir, grid(10000000.0), wgs84.ExportToWkt(), None)
+    assert index.dtype == np.int32 and (index >= -1).all()
+    entries = sorted(os.listdir(plan_dir))
+    # ͬһڶζȡļƻ
+    load_plan(plan_dir, grid(10000000.0), wgs84.ExportToWkt(), None)
+    assert sorted(os.listdir(plan_dir)) == entries
+    # Сһƻʱֻдļƻ
+    load_plan(plan_dir, grid(10100000.0), wgs84.ExportToWkt(), None, max_bytes=1)
+    assert len(os.listdir(plan_dir)) == 2 and sorted(os.listdir(plan_dir)) != entries
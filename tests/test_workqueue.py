@@ -0,0 +1,81 @@
+# -- coding:cp936 C
+import os
+import signal
+import sqlite3
+import time
+
+import pytest
+
+from yfmodis.parallel import call_task
+from yfmodis.workqueue import QueueExecutor, WorkQueue, work_processes
+
+pytestmark = pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="requires SIGKILL")
+
+
+def slow_write(path, text, seconds):
+    time.sleep(seconds)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def kill_self():
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+def leased_owner(path, timeout=30):
+    # ȴãسԼĽ̺
+    end = time.time() + timeout
+    while time.time() < end:
+        conn = sqlite3.connect(path, timeout=60)
+        row = conn.execute("SELECT owner FROM items WHERE status = 'leased'").fetchone()
+        conn.close()
+        if row is not None:
+            return int(row[0].rsplit(":", 1)[1])
+        time.sleep(0.05)
+    raise AssertionError("no task was leased")
+
+
+def test_task_of_killed_worker_is_retried(tmpdir):
+    path = str(tmpdir.join("queue.sqlite"))
+    out = str(tmpdir.join("out.txt"))
+    queue = WorkQueue(path, lease_seconds=1)
+    item_id, = queue.publish([(slow_write, (out, "done", 1.0))])
+    queue.close()
+    processes = work_processes(path, 2, lease_seconds=1)
+    os.kill(leased_owner(path), signal.SIGKILL)
+    for process in processes:
+        process.join(60)
+    assert sorted(p.exitcode for p in processes) == [-signal.SIGKILL, 0]
+
+    queue = WorkQueue(path)
+    assert queue.result(item_id) == (None, None)
+    assert queue.conn.execute("SELECT attempts FROM items WHERE id = ?", (item_id,)).fetchone()[0] == 2
+    queue.close()
+    assert tmpdir.join("out.txt").read() == "done"
+
+
+def test_task_that_keeps_killing_workers_fails(tmpdir):
+    path = str(tmpdir.join("queue.sqlite"))
+    out = str(tmpdir.join("out.txt"))
+    executor = QueueExecutor(path, workers=2, lease_seconds=0.5, max_attempts=2, poll=0.1, timeout=60)
+    try:
+        results = list(executor.map(call_task, [(kill_self, ()), (slow_write, (out, "done", 0.0))]))
+    finally:
+        executor.close()
+    assert "lease expired 2 times" in results[0][1]
+    assert results[1][1] is None
+    queue = WorkQueue(path)
+    assert queue.counts() == {"done": 1, "failed": 1}
+    queue.close()
+
+
+def test_map_timeout(tmpdir):
+    path = str(tmpdir.join("queue.sqlite"))
+    out = str(tmpdir.join("out.txt"))
+    executor = QueueExecutor(path, workers=1, poll=0.1, timeout=0.5)
+    s = time.time()
+    results = list(executor.map(call_task, [(slow_write, (out, "done", 30.0))]))
+    executor.close()
+    assert time.time() - s < 20
+    assert results[0][1] == "no result within 0.5s"
+    assert not tmpdir.join("out.txt").check()
@@ -0,0 +1,62 @@
+# -- coding:cp936 C
+import csv
+import datetime
+import os
+
+import numpy as np
+
+import yfMODISTool
+from yfmodis.options import EngineOptions, OutputOptions
+from yfmodis.testing import WGS84, read_raster
+from yfmodis.zonal import ZoneIndex
+
+
+def test_zonal_stats_match_clipped_rasters(granules, backend):
+    root, hdfs, masks = granules
+    workspace = os.path.join(root, "ws")
+    condition = "VALUE < -2000 OR VALUE > 10000"
+    yfMODISTool.preprocess(workspace, hdfs, masks, WGS84, sds_index=0, sds_name="NDVI", pixel_type="16_BIT_SIGNED",
+                           condition=condition, scale_factor=0.0001, engine=EngineOptions(backend=backend),
+                           output=OutputOptions(zonal=True))
+    assert not os.path.exists(os.path.join(workspace, "4_clip"))
+    with open(os.path.join(workspace, "8_zonal", "zonal_stats.csv")) as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 2 * len(masks)
+
+    # սͬı߽üͶӰNumPyͳ
+    projected = yfMODISTool.find_tifs(os.path.join(workspace, "3_reproject"))
+    clip_dir = os.path.join(root, "clip")
+    os.mkdir(clip_dir)
+    yfMODISTool.batch_clip_raster(projected, clip_dir, masks, backend=backend)
+    for row in rows:
+        date = row["date"].replace("-", "")
+        names = [n for n in os.listdir(clip_dir) if n.startswith(row["zone"] + "_")]
+        src = [read_raster(os.path.join(clip_dir, n)) for n in names if yfMODISTool.layer_of(n) == "NDVI"
+               and parse_day(n) == date]
+        assert len(src) == 1
+        data = src[0]["data"]
+        values = data[(data != src[0]["nodata"]) & (data >= -2000) & (data <= 10000)] * 0.0001
+        assert int(row["count"]) == values.size
+        assert np.isclose(float(row["mean"]), values.mean())
+        assert np.isclose(float(row["min"]), values.min())
+        assert np.isclose(float(row["max"]), values.max())
+        assert np.isclose(float(row["std"]), values.std())
+
+
+def parse_day(name):
+    # "mask0_MOD13Q1.A2004009.NDVI.tif"Ϊ20040109
+    doy = name.split(".")[1]
+    return (datetime.date(int(doy[1:5]), 1, 1) + datetime.timedelta(int(doy[5:]) - 1)).strftime("%Y%m%d")
+
+
+def test_zones_without_pixels_have_no_values():
+    array = np.arange(16, dtype="float32").reshape(4, 4)
+    valid = np.ones((4, 4), dtype=bool)
+    empty = np.zeros((2, 2), dtype=bool)
+    # һ߽ĴཻûԪڱ߽ڣཻ߽
+    index = ZoneIndex((4, 4), [((0, 0, 2, 2), empty), ((2, 2, 2, 2), np.ones((2, 2), dtype=bool)), (None, None)])
+    first, second, third = index.reduce(array, valid, scale_factor=0.5)
+    assert first == third == {"count": 0, "mean": None, "min": None, "max": None, "std": None}
+    assert second["count"] == 4 and (second["min"], second["max"], second["mean"]) == (5.0, 7.5, 6.25)
+    # ȫ߽綼ûԪʱҲ
+    assert ZoneIndex((4, 4), [((0, 0, 2, 2), empty)]).reduce(array, valid) == [first]
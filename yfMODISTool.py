@@ -1,8 +1,32 @@
 # -- coding:cp936 C
-import arcpy
 import time
 import os
 
+from yfmodis.backend import TMP_PREFIX, call_backend, call_inplace, get_backend
+from yfmodis.blocks import BIGTIFF_MODES, COMPRESSIONS, gtiff_options, is_unit_scale
+from yfmodis.cache import StageCache
+from yfmodis.catalog import Catalog, dedup_granules
+from yfmodis.condition import compile_condition
+from yfmodis.composite import PERIODS, REDUCERS, composite_groups, composite_name, parse_reducers
+from yfmodis.cube import append_rasters
+from yfmodis.fused import process_extracted, process_group
+from yfmodis.hdfmeta import (METADATA_FILE, effective_scale, load_metadata, metadata_condition, scale_rule,
+                             sds_metadata)
+from yfmodis.options import CacheOptions, EngineOptions, OutputOptions, QAOptions
+from yfmodis.parallel import run_tasks, stream_groups
+from yfmodis.presets import OPTIONAL_STAGES, PRESETS, STAGES, get_preset
+from yfmodis.qa import QA_NAME, parse_qa_rule, qa_raster_of
+from yfmodis.report import file_size, instrumented
+from yfmodis.tiles import filter_hdfs
+from yfmodis.workqueue import QueueExecutor
+from yfmodis.zonal import merge_tables, zonal_stats
+
+try:
+    import arcpy
+except ImportError:
+    # ʹgdalʱûArcGISĻ
+    arcpy = None
+
 
 def is_contain_cn(check_str):
     """
@@ -14,9 +38,12 @@ def is_contain_cn(check_str):
     return False
 
 
-def find_tifs(in_dir):
-    # صǰļУļУin_dirչΪ.tifļľ·ɵб
-    return [os.path.join(in_dir, fname) for fname in os.listdir(in_dir) if fname.endswith(".tif")]
+def find_tifs(in_dir, catalog=None):
+    # صǰļУļУin_dirչΪ.tifļľ·ɵбдеʱļ
+    # ָĿ¼ʱļûб仯ʹü¼б
+    names = catalog.list_dir(in_dir) if catalog is not None else os.listdir(in_dir)
+    return [os.path.join(in_dir, fname) for fname in names
+            if fname.endswith(".tif") and not fname.startswith(TMP_PREFIX)]
 
 
 def localtime():
@@ -24,7 +51,206 @@ def localtime():
     return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
 
 
-def batch_extract_sds(hdfs, out_dir, sds_index=0, suffix="NDVI"):
+def add_message(msg):
+    # ArcGISϢ̨
+    if arcpy is not None:
+        arcpy.AddMessage(msg)
+    else:
+        print(msg)
+
+
+def run_batch(jobs, workers=1, executor=None, cache=None, stage=None, report=None, catalog=None):
+    """
+    ִ񲢰˳Ϣ
+
+    ѴڵļᱻִִַУӰ
+    ֻвʱդཻĲü߽磩ΪɣԼΪerrored
+
+    Parameters
+    ----------
+    jobs:List[tuple]
+        (label, out_path, func, args)(label, out_path, func, args, (inputs, params))ɵб
+        labelڽϢout_pathжǷѾڣΪбʱȫڲ
+        funcǿԱӽ̵ģ鼶inputsparamsڼ㻺
+    workers:int
+        ĬΪ1ڵǰִ
+    executor:object,optional
+        ṩmap(func, iterable)ִmultiprocessing.Pool
+    cache:StageCache,optional
+        棬ָֻлһµŻᱻֻжļǷ
+    stage:str,optional
+        ¼ڻбУLRUɾ
+    report:RunReport,optional
+        б棬¼ÿĺʱCPUʱ䡢дֽڴֵ
+    catalog:Catalog,optional
+        Ŀ¼ָ󰴼¼ļбжǷڣ¼ÿ״̬
+
+    Returns
+    -------
+    (completed, skipped, errored)ĸ
+    """
+    nums = len(jobs)
+    keys = [None] * nums
+    if cache is not None:
+        for i, job in enumerate(jobs):
+            if len(job) > 4:
+                keys[i] = cache.key(*job[4])
+                cache.touch(job[4][0])
+    exists = [outputs_exist(job[1], cache, key, catalog) for job, key in zip(jobs, keys)]
+    tasks = [(job[2], job[3]) for job, e in zip(jobs, exists) if not e]
+    results = run_tasks(tasks, workers=workers, executor=executor)
+    completed, skipped, errored = 0, 0, 0
+    for num, job in enumerate(jobs, 1):
+        label = job[0]
+        if not exists[num - 1]:
+            used, err, cpu, peak = next(results)
+            failed = err if isinstance(err, dict) else {}
+            written = [p for p in as_list(job[1]) if p not in failed]
+            if err is None or failed:
+                completed += 1
+                add_message("%d/%d | %s completed, time used %.2fs" % (num, nums, label, used))
+                if keys[num - 1] is not None:
+                    for out_path in written:
+                        cache.record(out_path, keys[num - 1], stage)
+                for out_path in sorted(failed):
+                    errored += 1
+                    add_message("%d/%d | %s errored, %s" % (num, nums, os.path.basename(out_path), failed[out_path]))
+                    if report is not None:
+                        report.add_file(stage, os.path.basename(out_path), "errored")
+            else:
+                errored += 1
+                add_message("%d/%d | %s errored, %s" % (num, nums, label, err))
+            status = "errored" if err is not None and not failed else "completed"
+            if report is not None:
+                report.add_file(stage, label, status, used, cpu, peak,
+                                file_size(job[4][0]) if len(job) > 4 else 0, file_size(written))
+            if catalog is not None:
+                catalog.record(written if failed else as_list(job[1]), stage, status)
+                if failed:
+                    catalog.record(sorted(failed), stage, "errored")
+        else:
+            skipped += 1
+            add_message("%d/%d | %s already exists" % (num, nums, label))
+            if report is not None:
+                report.add_file(stage, label, "skipped")
+            if catalog is not None:
+                catalog.record(as_list(job[1]), stage, "skipped")
+    results.close()
+    add_message("%d completed, %d skipped, %d errored" % (completed, skipped, errored))
+    if cache is not None:
+        # ֻС޵мɵ÷ɺevict_cacheɾ
+        cache.save()
+    return completed, skipped, errored
+
+
+def evict_cache(cache, protect_stages=()):
+    """
+    һȫɺ󣬰LRU˳ɾС޵м
+
+    Parameters
+    ----------
+    cache:StageCache,optional
+        棬ΪNoneʱִκβ
+    protect_stages:tuple
+        ɾĲ裺ɵĲ裨һ룩֮δִеĲ
+    """
+    if cache is None:
+        return
+    removed = cache.evict(protect_stages=protect_stages)
+    if removed:
+        add_message("%d cached intermediate files removed to stay under the cache size limit" % len(removed))
+    cache.save()
+
+
+def as_list(out_path):
+    if out_path is None:
+        return []
+    if isinstance(out_path, (list, tuple)):
+        return out_path
+    return [out_path]
+
+
+def outputs_exist(out_path, cache=None, key=None, catalog=None):
+    # û·׷ӵʱ壩ִУԼɵĲ
+    if out_path is None:
+        return False
+    if key is not None:
+        return all(cache.is_fresh(p, key) for p in as_list(out_path))
+    return all(file_exists(p, catalog) for p in as_list(out_path))
+
+
+def file_exists(path, catalog=None):
+    # ָĿ¼ʱ¼ļбжϣļ
+    if catalog is not None:
+        return catalog.exists(path)
+    return os.path.exists(path)
+
+
+def open_cache(workspace, cache=None, cache_size=None):
+    """
+    򿪹ռµ
+
+    Parameters
+    ----------
+    cache:bool or StageCache
+        ΪTrueʱʹworkspaceµ.yfcacheΪFalseNoneʱʹû
+    cache_size:float,optional
+        мĴСޣMBLRU˳ɾΪNoneʱ
+    """
+    if not cache:
+        return None
+    if isinstance(cache, StageCache):
+        return cache
+    max_bytes = int(float(cache_size) * 1024 * 1024) if cache_size else None
+    return StageCache(os.path.join(workspace, ".yfcache"), max_bytes=max_bytes)
+
+
+CATALOG_FILE = "catalog.sqlite"
+
+
+def open_catalog(workspace, catalog=None):
+    """
+    򿪹ռµĿ¼
+
+    Parameters
+    ----------
+    catalog:bool or Catalog
+        ΪTrueʱʹworkspaceµ.yfcache/catalog.sqliteΪFalseNoneʱʹĿ¼
+    """
+    if not catalog:
+        return None
+    if isinstance(catalog, Catalog):
+        return catalog
+    return Catalog(os.path.join(workspace, ".yfcache", CATALOG_FILE))
+
+
+def skip_tiles(hdfs, masks):
+    """
+    ȥвü߽綼ཻƬļʹС
+    """
+    kept, skipped = filter_hdfs(hdfs, masks)
+    if skipped:
+        size = sum(os.path.getsize(hdf) for hdf in skipped if os.path.exists(hdf))
+        add_message("Skipped {0} of {1} hdf files ({2:.1f} MB) whose tiles do not intersect any mask".format(
+            len(skipped), len(hdfs), size / 1024.0 / 1024.0))
+    return kept
+
+
+def skip_duplicates(hdfs, collections=None, catalog=None):
+    """
+    ͬһƷںƬֻһhdfȥļļ
+    """
+    kept, dropped = dedup_granules(hdfs, collections, catalog)
+    if dropped:
+        add_message("Dropped {0} of {1} duplicate hdf files, keeping one granule per product, date and tile".format(
+            len(dropped), len(hdfs)))
+        for hdf, winner in dropped:
+            add_message("    {0} -> {1}".format(os.path.basename(hdf), os.path.basename(winner)))
+    return kept
+
+
+def batch_extract_sds(hdfs, out_dir, sds_index=0, suffix="NDVI", workers=1, executor=None, backend=None,
+                      cache=None, layers=None, report=None, creation_options=None, catalog=None):
     """
     ȡݼ
 
@@ -38,23 +264,106 @@ def batch_extract_sds(hdfs, out_dir, sds_index=0, suffix="NDVI"):
         ȡݼ0ʼ
     suffix:str
         ȡݼļĺ׺ĬΪ"NDVI"
+    workers:int
+        ִеĽĬΪ1
+    executor:object,optional
+        Զִṩ˳򷵻ؽmap(func, iterable)
+    backend:str or RasterBackend,optional
+        դ棬"arcpy"Ĭϣ"gdal"
+    cache:StageCache,optional
+        棬ָļݺͲжǷҪ¼
+    report:RunReport,optional
+        б棬¼ÿļĺʱͶдֽ
+    creation_options:str or List[str],optional
+        GeoTIFFĴѡ"COMPRESS=DEFLATE;PREDICTOR=YES"blocks.gtiff_optionsĬʹ
+    catalog:Catalog,optional
+        Ŀ¼ָ󰴼¼ļбжǷڣ¼ÿ״̬
+    layers:List[tuple],optional
+        (sds_index, suffix)ɵбָsds_indexsuffix
+        ÿhdfֻһβȡȫݼ[(0, "NDVI"), (1, "EVI"), (2, "QA")]
     """
-    nums = len(hdfs)
-    num = 1
+    backend = get_backend(backend, creation_options=creation_options)
+    if layers is None:
+        layers = [(sds_index, suffix)]
+    sds_indexes = [layer[0] for layer in layers]
+    jobs = []
     for hdf in hdfs:
-        s = time.time()
         base_name = os.path.splitext(os.path.basename(hdf))[0]
-        out_tif = os.path.join(out_dir, base_name + "." + "{0}.tif".format(suffix))
-        if not os.path.exists(out_tif):
-            try:
-                arcpy.ExtractSubDataset_management(hdf, out_tif, sds_index)
-                e = time.time()
-                arcpy.AddMessage("%d/%d | %s completed, time used %.2fs" % (num, nums, out_tif, e - s))
-            except Exception as err:
-                arcpy.AddMessage("%d/%d | %s errored, %s" % (num, nums, out_tif, err))
+        out_tifs = [os.path.join(out_dir, base_name + "." + "{0}.tif".format(layer[1])) for layer in layers]
+        if len(layers) == 1:
+            jobs.append((out_tifs[0], out_tifs[0], call_backend,
+                         (backend, "extract_sds", (hdf, out_tifs[0], sds_indexes[0])),
+                         ([hdf], ("extract_sds", sds_indexes[0], backend.name))))
         else:
-            arcpy.AddMessage("%d/%d | %s already exists" % (num, nums, out_tif))
-        num += 1
+            jobs.append((hdf, out_tifs, call_backend, (backend, "extract_sds_multi", (hdf, out_tifs, sds_indexes)),
+                         ([hdf], ("extract_sds_multi", sds_indexes, backend.name))))
+    return run_batch(jobs, workers=workers, executor=executor, cache=cache, stage="extract",
+                     report=report, catalog=catalog)
+
+
+def normalize_layers(layers, sds_index, sds_name, scale_factor, condition=None):
+    """
+    ݼбͳһΪ(sds_index, name, scale_factor, condition)ɵб
+
+    Parameters
+    ----------
+    layers:List[tuple] or str,optional
+        ÿΪ(sds_index, name)(sds_index, name, scale_factor)(sds_index, name, scale_factor, condition)
+        ȱʡӺΪʹscale_factorcondition
+        Ҳ"0:NDVI;1:EVI:0.0001;2:QA:1"ʽַ߽ʹã
+        ΪNoneʱֻsds_indexӦһݼ
+    """
+    if not layers:
+        return [(sds_index, sds_name, scale_factor, condition)]
+    if hasattr(layers, "split"):
+        layers = [item.split(":") for item in layers.split(";") if item.strip()]
+    result = []
+    for layer in layers:
+        layer = list(layer) + [None] * (4 - len(layer))
+        index, name, factor, con = layer[:4]
+        result.append((int(index), str(name).strip(), scale_factor if factor in (None, "") else factor,
+                       condition if con is None else (con or None)))
+    return result
+
+
+def metadata_layers(layers, hdfs, metadata):
+    """
+    hdfжȡԴݼӺΪûжȡԵݼֲ䣬
+    ûscale_factorԵݼʹԭӣ
+    add_offsetΪ0ݼҲֲ䣬ֻӣܰ(ԭʼֵ - add_offset) * scale_factor㣬
+    ÿݼscale_factorǳ㣨hdfmeta.effective_scaleдϢ
+
+    Parameters
+    ----------
+    layers:List[tuple]
+        normalize_layersķֵ
+    metadata:dict
+        hdfmeta.load_metadataķֵ
+    """
+    result = []
+    for index, name, factor, con in layers:
+        values = sds_metadata(metadata, hdfs, index)
+        if values is None:
+            add_message("No metadata for subdataset {0} ({1}), using the scale factor {2}".format(index, name,
+                                                                                                 factor))
+            result.append((index, name, factor, con))
+            continue
+        if values.get("add_offset"):
+            add_message("Subdataset {0} ({1}) has add_offset {2} which can not be applied, "
+                        "using the scale factor {3} and condition {4}".format(index, name, values["add_offset"],
+                                                                             factor, con))
+            result.append((index, name, factor, con))
+            continue
+        scale = effective_scale(values["scale_factor"])
+        result.append((index, name, factor if scale is None else scale, metadata_condition(values)))
+        add_message("Subdataset {0} ({1}): {2}, scale factor {3}, condition {4}".format(
+            index, name, scale_rule(values["scale_factor"]), result[-1][2], result[-1][3]))
+    return result
+
+
+def layer_of(raster):
+    # ļȡݼƣ"m_MOD16A2.A2004001.ET.tif"Ӧ"ET"
+    return os.path.basename(raster).split(".")[-2]
 
 
 def normal_mosaic_rule(fname):
@@ -102,7 +411,8 @@ def group_tifs(tif_names, group_func="mosaic"):
 
 
 def batch_mosaic(in_dir, out_dir, groups=None, pixel_type="16_BIT_SIGNED", mosaic_method="MAXIMUM",
-                 colormap_mode="FIRST"):
+                 colormap_mode="FIRST", workers=1, executor=None, backend=None, cache=None, report=None,
+                 creation_options=None, catalog=None, qa_pixel_type=None):
     """
     ƴӹ
 
@@ -122,36 +432,30 @@ def batch_mosaic(in_dir, out_dir, groups=None, pixel_type="16_BIT_SIGNED", mosai
         ǶصķĬΪ"LAST"
     colormap_modestr
         դӦǶɫӳѡķĬΪ"FIRST"
+    qa_pixel_type:str,optional
+        QA㣨ݼΪQAķʹõͣQA㰴ǶضϸλΪNoneʱʹpixel_type
+    ͬbatch_extract_sds
     """
-    tif_names = [n for n in os.listdir(in_dir) if n.endswith(".tif")]
+    tif_names = [os.path.basename(tif) for tif in find_tifs(in_dir, catalog)]
     if groups is None:
         groups = group_tifs(tif_names, group_func="mosaic")
-    arcpy.env.workspace = in_dir
-    base = tif_names[0]
-    out_coor_system = arcpy.Describe(base).spatialReference
-    cell_width = arcpy.Describe(base).meanCellWidth
-    band_count = arcpy.Describe(base).bandCount
-    nums = len(groups)
-    num = 1
+    backend = get_backend(backend, creation_options=creation_options)
+    jobs = []
     for i in groups:
-        s = time.time()
-        groups[i] = ';'.join(groups[i])
-        if not os.path.exists(os.path.join(out_dir, i)):
-            try:
-                arcpy.MosaicToNewRaster_management(groups[i], out_dir, i, out_coor_system, pixel_type,
-                                                   cell_width,
-                                                   band_count, mosaic_method, colormap_mode)
-                e = time.time()
-                arcpy.AddMessage("%d/%d | %s completed, time used %.2fs" % (num, nums, i, e - s))
-            except Exception as err:
-                arcpy.AddMessage("%d/%d | %s errored, %s" % (num, nums, i, err))
-        else:
-            arcpy.AddMessage("%d/%d | %s already exists" % (num, nums, i))
-        num = num + 1
+        rasters = [os.path.join(in_dir, n) for n in groups[i]]
+        out_raster = os.path.join(out_dir, i)
+        pt = qa_pixel_type if qa_pixel_type and layer_of(i) == QA_NAME else pixel_type
+        jobs.append((i, out_raster, call_backend,
+                     (backend, "mosaic", (rasters, out_raster, pt, mosaic_method, colormap_mode)),
+                     (rasters, ("mosaic", pt, mosaic_method, colormap_mode, backend.name))))
+    return run_batch(jobs, workers=workers, executor=executor, cache=cache, stage="mosaic",
+                     report=report, catalog=catalog)
 
 
 def batch_project_raster(rasters, out_dir, prefix=None, out_coor_system="WGS_1984.prj",
-                         resampling_type="NEAREST", cell_size="#"):
+                         resampling_type="NEAREST", cell_size="#", workers=1, executor=None,
+                         backend=None, cache=None, report=None, creation_options=None, catalog=None,
+                         qa_resampling_type=None):
     """
     ͶӰդ񹤾
 
@@ -176,38 +480,33 @@ def batch_project_raster(rasters, out_dir, prefix=None, out_coor_system="WGS_198
     cell_size:str
         դݼԪС
         ֱΪ250mΪ250 250"
+    qa_resampling_type:str,optional
+        QA㣨ݼΪQAʹõز㷨QAλֵܲͨΪNEARESTΪNoneʱʹresampling_type
 
     Examples
     ----------
     >> in_dir = r"S:\1_merge"
     >> tifs = [os.path.join(in_dir,n) for n in os.listdir(in_dir) if n.endswith(".tif")]
     >> batch_project_raster(tifs,  out_dir=r"S:\test2")
+    ͬbatch_extract_sds
     """
-    if arcpy.CheckExtension("Spatial") != "Available":
-        arcpy.AddMessage("Error!!! Spatial Analyst is unavailable")
+    backend = get_backend(backend, creation_options=creation_options)
     if prefix is None:
         prefix = ""
-    nums = len(rasters)
-    num = 1
+    jobs = []
     for raster in rasters:
-        s = time.time()
         raster_name = os.path.split(raster)[1]
         out_raster = os.path.join(out_dir, prefix + raster_name)
-        if not os.path.exists(out_raster):
-            try:
-                arcpy.ProjectRaster_management(raster, out_raster, out_coor_system, resampling_type, cell_size,
-                                               "#",
-                                               "#", "#")
-                e = time.time()
-                arcpy.AddMessage("%d/%d | %s completed, time used %.2fs" % (num, nums, out_raster, e - s))
-            except Exception as err:
-                arcpy.AddMessage("%d/%d | %s errored, %s" % (num, nums, out_raster, err))
-        else:
-            arcpy.AddMessage("%d/%d | %s already exists" % (num, nums, raster))
-        num = num + 1
+        method = qa_resampling_type if qa_resampling_type and layer_of(raster) == QA_NAME else resampling_type
+        jobs.append((out_raster, out_raster, call_backend,
+                     (backend, "project_raster", (raster, out_raster, out_coor_system, method, cell_size)),
+                     ([raster], ("project_raster", out_coor_system, method, cell_size, backend.name))))
+    return run_batch(jobs, workers=workers, executor=executor, cache=cache, stage="reproject",
+                     report=report, catalog=catalog)
 
 
-def batch_clip_raster(rasters, out_dir, masks):
+def batch_clip_raster(rasters, out_dir, masks, workers=1, executor=None, backend=None, cache=None, report=None,
+                      creation_options=None, catalog=None):
     """
     ü
 
@@ -231,36 +530,38 @@ def batch_clip_raster(rasters, out_dir, masks):
                 u'H:\\NDVI_china\\scriptTest\\0_shapefiles\\beijing.shp']
     >> batch_clip_raster(rasters=tifs,masks=masks,out_dir=r"S:\test2")
 
-    1/6 | anhui_A2004001.NDVI.tif Completed, time used 5.54600000381s
-    2/6 | anhui_A2004032.NDVI.tif Completed, time used 0.138999938965s
-    3/6 | anhui_A2004061.NDVI.tif Completed, time used 0.136000156403s
-    4/6 | beijing_A2004001.NDVI.tif Completed, time used 0.105000019073s
-    5/6 | beijing_A2004032.NDVI.tif Completed, time used 0.100999832153s
-    6/6 | beijing_A2004061.NDVI.tif Completed, time used 0.101000070572s
-
-    """
-    nums = len(rasters) * len(masks)
-    num = 1
-    for i, mask in enumerate(masks):
-        mask_name = os.path.splitext(os.path.basename(mask))[0]
-        for raster in rasters:
-            s = time.time()
-            old_raster_name = os.path.splitext(os.path.basename(raster))[0]
-            new_raster_name = "{0}_{1}.tif".format(mask_name, old_raster_name.split("_")[-1])
-            out_raster = os.path.join(out_dir, new_raster_name)
-            if not os.path.exists(out_raster):
-                try:
-                    arcpy.Clip_management(raster, "#", out_raster, mask, "#", "ClippingGeometry")
-                    e = time.time()
-                    arcpy.AddMessage("%d/%d | %s completed, time used %.2fs" % (num, nums, out_raster, e - s))
-                except Exception as err:
-                    arcpy.AddMessage("%d/%d | %s errored, %s" % (num, nums, out_raster, err))
-            else:
-                arcpy.AddMessage("%d/%d | %s already exists" % (num, nums, out_raster))
-            num += 1
-
+    1/3 | H:\\NDVI_china\\scriptTest\\0_ndvi\\A2004001.NDVI.tif completed, time used 5.64s
+    2/3 | H:\\NDVI_china\\scriptTest\\0_ndvi\\A2004032.NDVI.tif completed, time used 0.24s
+    3/3 | H:\\NDVI_china\\scriptTest\\0_ndvi\\A2004061.NDVI.tif completed, time used 0.24s
+    3 completed, 0 skipped, 0 errored
 
-def batch_multiply(rasters, out_dir, scale_factor=0.0001, prefix=None):
+    ͬbatch_extract_sds
+    """
+    backend = get_backend(backend, creation_options=creation_options)
+    mask_names = [os.path.splitext(os.path.basename(mask))[0] for mask in masks]
+    jobs = []
+    # ÿդֻȡһΣһдȫ߽Ĳü
+    for raster in rasters:
+        old_raster_name = os.path.splitext(os.path.basename(raster))[0]
+        out_rasters = [os.path.join(out_dir, "{0}_{1}.tif".format(mask_name, old_raster_name.split("_")[-1]))
+                       for mask_name in mask_names]
+        inputs, params = [raster] + list(masks), ("clip_multi", backend.name)
+        if cache is None:
+            todo = [(o, m) for o, m in zip(out_rasters, masks) if not file_exists(o, catalog)]
+        else:
+            # դཻı߽û߽ʱ²ü
+            key = cache.key(inputs, params)
+            todo = [(o, m) for o, m in zip(out_rasters, masks) if not cache.is_fresh(o, key)]
+        todo_rasters = [o for o, m in todo]
+        todo_masks = [m for o, m in todo]
+        jobs.append((raster, out_rasters, call_backend, (backend, "clip_multi", (raster, todo_rasters, todo_masks)),
+                     (inputs, params)))
+    return run_batch(jobs, workers=workers, executor=executor, cache=cache, stage="clip",
+                     report=report, catalog=catalog)
+
+
+def batch_multiply(rasters, out_dir, scale_factor=0.0001, prefix=None, workers=1, executor=None, backend=None,
+                   cache=None, report=None, creation_options=None, catalog=None):
     """
     ˹
 
@@ -280,33 +581,30 @@ def batch_multiply(rasters, out_dir, scale_factor=0.0001, prefix=None):
     Examples
     -------
 
+    ͬbatch_extract_sds
     """
-    arcpy.CheckOutExtension("Spatial")
-    if arcpy.CheckExtension("Spatial") != "Available":
-        arcpy.AddMessage("Error!!! Spatial Analyst is unavailable")
+    backend = get_backend(backend, creation_options=creation_options)
+    if backend.name == "arcpy" and arcpy.CheckExtension("Spatial") != "Available":
+        add_message("Error!!! Spatial Analyst is unavailable")
     if prefix is None:
         prefix = ""
-    scale_factor = str(scale_factor)
-
-    nums = len(rasters)
-    num = 1
+    jobs = []
     for raster in rasters:
-        s = time.time()
         raster_name = os.path.split(raster)[1]
         out_raster = os.path.join(out_dir, prefix + raster_name)
-        if not os.path.exists(out_raster):
-            try:
-                arcpy.gp.Times_sa(raster, scale_factor, out_raster)
-                e = time.time()
-                arcpy.AddMessage("%d/%d | %s completed, time used %.2fs" % (num, nums, out_raster, e - s))
-            except Exception as err:
-                arcpy.AddMessage("%d/%d | %s errored, %s" % (num, nums, out_raster, err))
+        # Ϊ1ʱдդ
+        if is_unit_scale(scale_factor):
+            jobs.append((out_raster, out_raster, call_backend, (backend, "link", (raster, out_raster)),
+                         ([raster], ("link", backend.name))))
         else:
-            arcpy.AddMessage("%d/%d | %s already exists" % (num, nums, out_raster))
-        num = num + 1
+            jobs.append((out_raster, out_raster, call_backend, (backend, "times", (raster, out_raster, scale_factor)),
+                         ([raster], ("times", scale_factor, backend.name))))
+    return run_batch(jobs, workers=workers, executor=executor, cache=cache, stage="scale",
+                     report=report, catalog=catalog)
 
 
-def batch_setnull(rasters, out_dir, condition="VALUE>65528", prefix=None):
+def batch_setnull(rasters, out_dir, condition="VALUE>65528", prefix=None, workers=1, executor=None, backend=None,
+                  cache=None, report=None, creation_options=None, catalog=None):
     """
     Ϊչ
 
@@ -320,33 +618,468 @@ def batch_setnull(rasters, out_dir, condition="VALUE>65528", prefix=None):
         ԪΪٵ߼ʽ,ĬΪ"VALUE>65528"
     prefix:str,optional
         Ϊպļǰ׺ĬΪ"sn_"
+    ͬbatch_extract_sds
     """
-    arcpy.CheckOutExtension("Spatial")
+    backend = get_backend(backend, creation_options=creation_options)
     if prefix is None:
         prefix = ""
-    nums = len(rasters)
-    num = 1
+    jobs = []
     for raster in rasters:
-        s = time.time()
         raster_name = os.path.split(raster)[1]
         out_raster = os.path.join(out_dir, prefix + raster_name)
-        if not os.path.exists(out_raster):
-            try:
-                arcpy.gp.SetNull_sa(raster, raster, out_raster, condition)
-                e = time.time()
-                arcpy.AddMessage("%d/%d | %s completed, time used %.2fs" % (num, nums, out_raster, e - s))
-            except Exception as err:
-                arcpy.AddMessage("%d/%d | %s errored, %s" % (num, nums, out_raster, err))
+        jobs.append((out_raster, out_raster, call_backend, (backend, "setnull", (raster, out_raster, condition)),
+                     ([raster], ("setnull", condition, backend.name))))
+    return run_batch(jobs, workers=workers, executor=executor, cache=cache, stage="setnull",
+                     report=report, catalog=catalog)
+
+
+def batch_setnull_multiply(rasters, out_dir, condition="VALUE>65528", scale_factor=0.1, prefix=None, workers=1,
+                           executor=None, backend=None, cache=None, report=None, creation_options=None, catalog=None):
+    """
+    Ϊղӹ
+
+    ൱ִbatch_setnullִbatch_multiplyÿդֻдһΣΪյмļ
+    gdal水ʽ㣬arcpyʹSetNullTimesϵĵͼʽ
+
+    Parameters
+    ----------
+    rasters:List[str]
+        ɴդļɵб
+    out_dir:str
+        ļ
+    condition:str
+        ԪΪٵ߼ʽ,ĬΪ"VALUE>65528"
+    scale_factor:float
+        ӣĬΪ0.1ӦET
+    prefix:str,optional
+        ļǰ׺ĬΪ""
+    ͬbatch_extract_sds
+    """
+    backend = get_backend(backend, creation_options=creation_options)
+    if prefix is None:
+        prefix = ""
+    jobs = []
+    for raster in rasters:
+        raster_name = os.path.split(raster)[1]
+        out_raster = os.path.join(out_dir, prefix + raster_name)
+        # Ϊ1ʱֻΪգԭʼ
+        if is_unit_scale(scale_factor):
+            jobs.append((out_raster, out_raster, call_backend, (backend, "setnull", (raster, out_raster, condition)),
+                         ([raster], ("setnull", condition, backend.name))))
         else:
-            arcpy.AddMessage("%d/%d | %s already exists" % (num, nums, out_raster))
-        num = num + 1
+            jobs.append((out_raster, out_raster, call_backend,
+                         (backend, "setnull_times", (raster, out_raster, condition, scale_factor)),
+                         ([raster], ("setnull_times", condition, scale_factor, backend.name))))
+    return run_batch(jobs, workers=workers, executor=executor, cache=cache, stage="scale",
+                     report=report, catalog=catalog)
 
 
-def mod13preprocess(workspace, hdfs, masks, out_coor_system, cell_size="#",
-                    sds_index=0, sds_name="NDVI",
-                    pixel_type="16_BIT_SIGNED", mosaic_method="LAST", colormap_mode="FIRST",
-                    pr_prefix="pr_", resampling_type="NEAREST",
-                    scale_prefix="", scale_factor=0.0001):
+def batch_qa_mask(rasters, out_dir, qa_rule, condition=None, scale_factor=1, prefix=None, workers=1, executor=None,
+                  backend=None, cache=None, report=None, creation_options=None, catalog=None):
+    """
+    QAĤ
+
+    ͬһļеQA㣨"mask0_MOD13Q1.A2004001.NDVI.tif"Ӧ"mask0_MOD13Q1.A2004001.QA.tif"
+    ȥqa_ruleԪͬʱΪպͳӣÿդֻдһ
+
+    Parameters
+    ----------
+    rasters:List[str]
+        ɴդļɵбQA㱾
+    out_dir:str
+        ļ
+    qa_rule:str
+        QAλ"0-1:0,1;2-5:0-11"qa.parse_qa_rule
+    condition:str,optional
+        ΪյΪNoneʱֻQAĤ
+    scale_factor:float
+        ӣΪ1ʱԭʼ
+    prefix:str,optional
+        ļǰ׺ĬΪ""
+    ͬbatch_extract_sds
+    """
+    backend = get_backend(backend, creation_options=creation_options)
+    if prefix is None:
+        prefix = ""
+    jobs = []
+    for raster in rasters:
+        raster_name = os.path.split(raster)[1]
+        out_raster = os.path.join(out_dir, prefix + raster_name)
+        qa_raster = qa_raster_of(raster)
+        jobs.append((out_raster, out_raster, call_backend,
+                     (backend, "qa_setnull_times", (raster, out_raster, qa_raster, qa_rule, condition, scale_factor)),
+                     ([raster, qa_raster], ("qa_setnull_times", qa_rule, condition, scale_factor, backend.name))))
+    return run_batch(jobs, workers=workers, executor=executor, cache=cache, stage="scale",
+                     report=report, catalog=catalog)
+
+
+def cube_groups(rasters, masks):
+    """
+    ߽硢Ʒݼս飬{(߽, Ʒ, ݼ): [դ, ...]}
+
+    սļΪ"[ǰ׺]߽_Ʒ..ݼ.tif"߽ȡ"_"֮ǰֽβı߽
+    ͬһ߽MOD13Q1MYD13Q1ȲͬƷֱдԵ
+    """
+    mask_names = sorted((os.path.splitext(os.path.basename(mask))[0] for mask in masks), key=len, reverse=True)
+    groups = {}
+    for raster in rasters:
+        name = os.path.basename(raster)
+        if "_" not in name:
+            continue
+        head, tail = name.rsplit("_", 1)
+        for mask_name in mask_names:
+            if head.endswith(mask_name):
+                groups.setdefault((mask_name, tail.split(".")[0], layer_of(raster)), []).append(raster)
+                break
+    return groups
+
+
+def batch_build_overviews(rasters, levels=(2, 4, 8, 16), resampling="NEAREST", workers=1, executor=None,
+                          backend=None, report=None, creation_options=None, catalog=None):
+    """
+    
+
+    дդԵ.ovrļУ.ovrդgdalĽʹդͬѹ
+
+    Parameters
+    ----------
+    rasters:List[str]
+        Ҫդ
+    levels:tuple
+        СĬΪ(2, 4, 8, 16)
+    resampling:str
+        ز"NEAREST"Ĭϣ"AVERAGE"
+    creation_options:str or List[str],optional
+        GeoTIFFĴѡgdalеCOMPRESSBIGTIFFѹ
+    ͬbatch_extract_sds
+    """
+    backend = get_backend(backend, creation_options=creation_options)
+    jobs = [(raster, raster + ".ovr", call_inplace, (backend, "build_overviews", (raster, list(levels), resampling)),
+             ([raster], ("overviews", list(levels), resampling)))
+            for raster in rasters]
+    return run_batch(jobs, workers=workers, executor=executor, stage="overviews", report=report, catalog=catalog)
+
+
+def batch_cube(rasters, out_dir, masks, layers=None, chunks=None, workers=1, executor=None, backend=None,
+               report=None):
+    """
+    дʱ
+
+    ÿ߽ÿƷÿݼдһZarrʽ"߽_Ʒ_ݼ.zarr"άΪ(time, y, x)
+    ʱļеAYYYYDDDѴʱֻ׷ûе
+
+    Parameters
+    ----------
+    rasters:List[str]
+        ս5_scaleеդ
+    out_dir:str
+        ڵļ
+    masks:List[str]
+        üõı߽磬ڴļʶ߽
+    layers:List[tuple],optional
+        normalize_layersķֵָֻдеݼ
+    chunks:tuple,optional
+        ֿС(time, y, x)ĬΪcube.DEFAULT_CHUNKSֻڴʱʹãÿΪһڶȡդ
+    report:RunReport,optional
+        б棬¼ÿĺʱͶȡֽ
+    ͬbatch_extract_sds
+    """
+    backend = get_backend(backend)
+    if not os.path.exists(out_dir):
+        os.mkdir(out_dir)
+    names = None if layers is None else set(layer[1] for layer in layers)
+    jobs = []
+    for (mask_name, product, name), group in sorted(cube_groups(rasters, masks).items()):
+        if names is not None and name not in names:
+            continue
+        cube_path = os.path.join(out_dir, "{0}_{1}_{2}.zarr".format(mask_name, product, name))
+        jobs.append((cube_path, None, append_rasters, (backend, cube_path, sorted(group), chunks), (group, ())))
+    return run_batch(jobs, workers=workers, executor=executor, stage="cube", report=report)
+
+
+def batch_composite(rasters, out_dir, reducers="MAX", period="month", condition=None, workers=1, executor=None,
+                    backend=None, cache=None, report=None, creation_options=None, catalog=None):
+    """
+    ʱϳɹ
+
+    ļеڽͬһ߽硢ͬһݼդΪ¡꣬ÿʱκϳΪһդ
+    ļ"henan_MOD13Q1.M200401.max.NDVI.tif"
+
+    Parameters
+    ----------
+    rasters:List[str]
+        ս5_scaleеդ
+    out_dir:str
+        ϳɽļ
+    reducers:str or List[str]
+        ϳɷ"MAX""MEAN""MEDIAN""COUNT"Чֵ÷ֺŸĬΪ"MAX"
+    period:str
+        ʱΣ"month"Ĭϣ"season"DJF/MAM/JJA/SON12¼һ꣩"year"
+    condition:str,optional
+        Ԫϳɣ"VALUE < 0"NoDataԪǲϳ
+    cache:StageCache,optional
+        棬ָʱʱºϳɣֻжļǷ
+    report:RunReport,optional
+        б棬¼ÿϳɽĺʱͶдֽ
+    ͬbatch_extract_sds
+    """
+    backend = get_backend(backend, creation_options=creation_options)
+    if backend.name == "arcpy" and arcpy.CheckExtension("Spatial") != "Available":
+        add_message("Error!!! Spatial Analyst is unavailable")
+    reducers = parse_reducers(reducers)
+    if not os.path.exists(out_dir):
+        os.mkdir(out_dir)
+    jobs = []
+    for (head, label, name), group in sorted(composite_groups(rasters, period).items()):
+        for reducer in reducers:
+            out_raster = os.path.join(out_dir, composite_name(head, label, name, reducer))
+            jobs.append((out_raster, out_raster, call_backend,
+                         (backend, "composite", (group, out_raster, reducer, condition)),
+                         (group, ("composite", reducer, condition, backend.name))))
+    return run_batch(jobs, workers=workers, executor=executor, cache=cache, stage="composite",
+                     report=report, catalog=catalog)
+
+
+ZONAL_TABLE = "zonal_stats.csv"
+
+
+def batch_zonal_stats(rasters, out_dir, masks, layers=None, out_table=None, workers=1, executor=None, backend=None,
+                      cache=None, report=None, catalog=None, qa_rule=None):
+    """
+    ͳƹ
+
+    дüźդֱͳÿդڸ߽ЧԪĸƽֵСֵֵͱ׼
+    ÿդдһCSV"pr_MOD13Q1.A2004001.NDVI.csv"ȫɺϲΪһű
+    Ϊzone߽ļdatelayerݼ͸ͳֵ
+
+    Parameters
+    ----------
+    rasters:List[str]
+        ͶӰ󣨲ͶӰʱΪǶ󣩵դ
+    out_dir:str
+        ļ
+    masks:List[str]
+        ߽磬ÿ߽Ϊһ߽໥ص
+    layers:List[tuple],optional
+        normalize_layersķֵݼȷӺΪδгݼ
+    out_table:str,optional
+        ϲıĬΪout_dirµzonal_stats.csvչΪ.parquetʱдParquetҪpyarrow
+    cache:StageCache,optional
+        棬ָӡ߽ıʱͳƣֻжļǷ
+    report:RunReport,optional
+        б棬¼ÿդĺʱͶȡֽ
+    qa_rule:str,optional
+        QAλָͬһļеQAȥԪQA㱾ͳ
+    ͬbatch_extract_sds
+
+    Returns
+    -------
+    (completed, skipped, errored)ĸ
+    """
+    backend = get_backend(backend)
+    if not os.path.exists(out_dir):
+        os.mkdir(out_dir)
+    params = dict((layer[1], (layer[2], layer[3])) for layer in layers or [])
+    jobs = []
+    parts = []
+    for raster in rasters:
+        qa_raster = None
+        if qa_rule:
+            if layer_of(raster) == QA_NAME:
+                continue
+            qa_raster = qa_raster_of(raster)
+        scale_factor, condition = params.get(layer_of(raster), (1.0, None))
+        out_csv = os.path.join(out_dir, os.path.splitext(os.path.basename(raster))[0] + ".csv")
+        parts.append(out_csv)
+        jobs.append((out_csv, out_csv, zonal_stats,
+                     (backend, raster, out_csv, list(masks), scale_factor, condition, qa_raster, qa_rule),
+                     ([raster] + ([qa_raster] if qa_raster else []) + list(masks),
+                      ("zonal", scale_factor, condition, qa_rule, backend.name))))
+    result = run_batch(jobs, workers=workers, executor=executor, cache=cache, stage="zonal", report=report,
+                       catalog=catalog)
+    out_table = out_table or os.path.join(out_dir, ZONAL_TABLE)
+    rows = merge_tables([part for part in parts if os.path.exists(part)], out_table)
+    add_message("{0} zonal statistics rows written to {1}".format(rows, out_table))
+    return result
+
+
+def date_groups(hdfs, masks, layers, out_dir, pr_prefix="pr_", sn_prefix="sn_", scale_prefix=""):
+    """
+    ڶhdf飬ÿݼǶļںϴʽʹ
+
+    ֲʱһ£ȡļӦnormal_mosaic_ruleݼķͬ
+
+    Parameters
+    ----------
+    layers:List[tuple]
+        normalize_layersķֵ
+    out_dir:str
+        սڵļ
+
+    Returns
+    -------
+    (label, group_hdfs, group_layers)ɵбgroup_layersĸʽfused.process_group
+    """
+    names = dict((os.path.splitext(os.path.basename(hdf))[0] + "." + "{0}.tif".format(layers[0][1]), hdf)
+                 for hdf in hdfs)
+    groups = group_tifs(sorted(names), group_func="mosaic")
+    result = []
+    for first_group in sorted(groups):
+        group_layers = []
+        for index, name, factor, con in layers:
+            group = ".".join(first_group.split(".")[:2]) + ".{0}.tif".format(name)
+            old_raster_name = os.path.splitext((pr_prefix or "") + group)[0]
+            outputs = []
+            for mask in masks:
+                mask_name = os.path.splitext(os.path.basename(mask))[0]
+                clip_name = "{0}_{1}.tif".format(mask_name, old_raster_name.split("_")[-1])
+                final_name = (scale_prefix or "") + ((sn_prefix or "") if con else "") + clip_name
+                outputs.append((mask, clip_name, os.path.join(out_dir, final_name)))
+            group_layers.append({"sds_index": index, "suffix": name, "scale_factor": factor, "condition": con,
+                                 "group": group, "outputs": outputs})
+        label = first_group if len(layers) == 1 else ".".join(first_group.split(".")[:2])
+        result.append((label, [names[n] for n in groups[first_group]], group_layers))
+    return result
+
+
+def stage_layers(layers, stages=None):
+    # ִΪյĲʱȥݼɸѡļҲΪյǰ׺
+    if stages is None or "setnull" in stages:
+        return layers
+    return [(index, name, factor, None) for index, name, factor, con in layers]
+
+
+def with_qa_layer(layers, qa=None):
+    # QAĤʱݼ֮QA㣬ݼͬһδ򿪵hdfȡ
+    if qa is None or not qa.rule:
+        return layers
+    return list(layers) + [(int(qa.sds_index), QA_NAME, 1, None)]
+
+
+def qa_options(options, qa=None):
+    # ںϴʽQAδʱ룬ʹļ֮ǰͬ
+    if qa is not None and qa.rule:
+        options.update({"qa_rule": qa.rule, "qa_pixel_type": qa.pixel_type})
+    return options
+
+
+def qa_group_layer(qa_layer, group_layers):
+    # QAֻüı߽
+    needed = set(o[0] for layer in group_layers for o in layer["outputs"])
+    qa_layer["outputs"] = [o for o in qa_layer["outputs"] if o[0] in needed]
+    return qa_layer
+
+
+def fused_preprocess(workspace, hdfs, masks, out_coor_system, out_dir_name, cell_size="#",
+                     sds_index=0, sds_name="NDVI",
+                     pixel_type="16_BIT_SIGNED", mosaic_method="LAST", colormap_mode="FIRST",
+                     pr_prefix="pr_", resampling_type="NEAREST",
+                     sn_prefix="sn_", condition=None,
+                     scale_prefix="", scale_factor=0.0001,
+                     keep_intermediate=False, workers=1, executor=None, backend=None, cache=None, layers=None,
+                     report=None, stages=None, catalog=None, qa=None):
+    """
+    ںϴ
+
+    ڷ飬ÿȡǶͶӰüΪգconditionΪʱţ
+    мֻڴ棨ʱռ䣩Уworkspaceֻдout_dir_nameļС
+    ļֲĽһ£ַʽԻá
+
+    Parameters
+    ----------
+    out_dir_name:str
+        սڵļ"5_scale"
+    condition:str,optional
+        ΪյΪNoneʱִΪ
+    keep_intermediate:bool
+        ǷмʱʹãΪTrueʱмд1_extract2_mosaicļ
+    cache:StageCache,optional
+        棬ɷڵhdfü߽ȫ㣬һʱ¼
+    report:RunReport,optional
+        б棬ÿڷ¼Ϊһļ
+    stages:List[str],optional
+        ҪִеĲ裬preprocess
+    layers:List[tuple] or str,optional
+        ҪĶݼʽnormalize_layersÿhdfֻһ
+    catalog:Catalog,optional
+        Ŀ¼¼ļбжǷڣ¼ÿ״̬
+    qa:QAOptions,optional
+        QAĤΪʱݼһȡQA㣬ΪպʱȥԪ
+    ͬmod13preprocess/mod16preprocess
+    """
+    backend = get_backend(backend)
+    if not os.path.exists(workspace):
+        os.mkdir(workspace)
+    out_dir = os.path.join(workspace, out_dir_name)
+    if not os.path.exists(out_dir):
+        os.mkdir(out_dir)
+    stage_dirs = None
+    if keep_intermediate:
+        stage_names = ["extract", "mosaic", "reproject", "clip"]
+        dir_names = ["1_extract", "2_mosaic", "3_reproject", "4_clip"]
+        stage_dirs = dict(zip(stage_names, [os.path.join(workspace, name) for name in dir_names]))
+        for d in stage_dirs.values():
+            if not os.path.exists(d):
+                os.mkdir(d)
+
+    options = {"pixel_type": pixel_type, "mosaic_method": mosaic_method, "colormap_mode": colormap_mode,
+               "out_coor_system": out_coor_system, "resampling_type": resampling_type, "cell_size": cell_size,
+               "pr_prefix": pr_prefix or "", "stages": stages or STAGES}
+    qa_options(options, qa)
+    layers = stage_layers(normalize_layers(layers, sds_index, sds_name, scale_factor, condition), stages)
+    extract_layers = with_qa_layer(layers, qa)
+    with_qa = len(extract_layers) > len(layers)
+    jobs = []
+    for label, group_hdfs, group_layers in date_groups(hdfs, masks, extract_layers, out_dir, pr_prefix, sn_prefix,
+                                                       scale_prefix):
+        qa_layer = group_layers.pop() if with_qa else None
+        out_paths = []
+        for layer in group_layers:
+            out_paths.extend(o[2] for o in layer["outputs"])
+            if cache is None:
+                layer["outputs"] = [o for o in layer["outputs"] if not file_exists(o[2], catalog)]
+            # ʹûʱѾı䣬ѴڵҲҪ¼
+        # Ѵڵݼȡ
+        group_layers = [layer for layer in group_layers if layer["outputs"]] or group_layers[:1]
+        if qa_layer is not None:
+            group_layers.append(qa_group_layer(qa_layer, group_layers))
+        params = ("fused", sorted(options.items()), layers, backend.name)
+        jobs.append((label, out_paths, process_group,
+                     (backend, group_hdfs, group_layers, options, stage_dirs), (group_hdfs + list(masks), params)))
+    s = time.time()
+    result = run_batch(jobs, workers=workers, executor=executor, cache=cache, stage="scale", report=report,
+                       catalog=catalog)
+    evict_cache(cache, ("scale",))
+    if report is not None:
+        report.add_stage("scale", time.time() - s)
+    return result
+
+
+def stream_preprocess(workspace, hdfs, masks, out_coor_system, cell_size="#",
+                      sds_index=0, sds_name="NDVI",
+                      pixel_type="16_BIT_SIGNED", mosaic_method="LAST", colormap_mode="FIRST",
+                      pr_prefix="pr_", resampling_type="NEAREST",
+                      sn_prefix="sn_", condition=None,
+                      scale_prefix="", scale_factor=0.0001,
+                      workers=1, backend=None, layers=None, report=None, stages=None, qa=None):
+    """
+    ʽ
+
+    ļкļֲͬڲ֮ȴ
+    һڷȫƬȡɺڿнִиǶͶӰüţ
+    ȡͬʱУһصȵȫhdfȡ
+
+    Parameters
+    ----------
+    report:RunReport,optional
+        б棬ʽĸ໥صȡͷ񶼼¼"stream"
+    ͬfused_preprocess
+
+    Returns
+    -------
+    (completed, skipped, errored)ȡͷĸ
+    """
+    backend = get_backend(backend)
     if not os.path.exists(workspace):
         os.mkdir(workspace)
     dir_names = ["1_extract", "2_mosaic", "3_reproject", "4_clip", "5_scale"]
@@ -354,111 +1087,388 @@ def mod13preprocess(workspace, hdfs, masks, out_coor_system, cell_size="#",
     for dir in dirs:
         if not os.path.exists(dir):
             os.mkdir(dir)
+    stage_dirs = dict(zip(["extract", "mosaic", "reproject", "clip"], dirs[:4]))
+    options = {"pixel_type": pixel_type, "mosaic_method": mosaic_method, "colormap_mode": colormap_mode,
+               "out_coor_system": out_coor_system, "resampling_type": resampling_type, "cell_size": cell_size,
+               "pr_prefix": pr_prefix or "", "stages": stages or STAGES}
+    qa_options(options, qa)
+    layers = stage_layers(normalize_layers(layers, sds_index, sds_name, scale_factor, condition), stages)
+    extract_layers = with_qa_layer(layers, qa)
+    with_qa = len(extract_layers) > len(layers)
+
+    # ڷȡʹ龡
+    tasks = []
+    groups = []
+    downstream = {}
+    for label, group_hdfs, group_layers in date_groups(hdfs, masks, extract_layers, dirs[4], pr_prefix, sn_prefix,
+                                                       scale_prefix):
+        extracted = [[] for _ in extract_layers]
+        for hdf in group_hdfs:
+            base_name = os.path.splitext(os.path.basename(hdf))[0]
+            out_tifs = [os.path.join(dirs[0], base_name + "." + "{0}.tif".format(layer[1]))
+                        for layer in extract_layers]
+            for tifs, out_tif in zip(extracted, out_tifs):
+                tifs.append(out_tif)
+            if all(os.path.exists(out_tif) for out_tif in out_tifs):
+                continue
+            if len(extract_layers) == 1:
+                tasks.append((hdf, call_backend, (backend, "extract_sds", (hdf, out_tifs[0], extract_layers[0][0]))))
+            else:
+                tasks.append((hdf, call_backend, (backend, "extract_sds_multi",
+                                                  (hdf, out_tifs, [layer[0] for layer in extract_layers]))))
+        qa_layer = group_layers.pop() if with_qa else None
+        qa_tifs = extracted.pop() if with_qa else None
+        for layer in group_layers:
+            layer["outputs"] = [o for o in layer["outputs"] if not os.path.exists(o[2])]
+        todo = [(layer, tifs) for layer, tifs in zip(group_layers, extracted) if layer["outputs"]]
+        if todo and qa_layer is not None:
+            todo.append((qa_group_layer(qa_layer, [t[0] for t in todo]), qa_tifs))
+        groups.append((label, group_hdfs))
+        if todo:
+            downstream[label] = (process_extracted, (backend, [t[0] for t in todo], [t[1] for t in todo], options,
+                                                     stage_dirs))
+
+    nums = len(tasks) + len(groups)
+    num = 0
+    start = time.time()
+    completed, skipped, errored = 0, 0, 0
+    for kind, name, used, err, cpu, peak in stream_groups(tasks, groups, downstream, workers=workers):
+        num += 1
+        label = name if kind == "task" else "group " + name
+        if kind == "group" and err is None and downstream.get(name) is None:
+            skipped += 1
+            status = "skipped"
+            add_message("%d/%d | %s already exists" % (num, nums, label))
+        elif err is None or isinstance(err, dict):
+            completed += 1
+            status = "completed"
+            add_message("%d/%d | %s completed, time used %.2fs" % (num, nums, label, used))
+            # դཻıֻ߽ӰԵ
+            for out_path in sorted(err or {}):
+                errored += 1
+                add_message("%d/%d | %s errored, %s" % (num, nums, os.path.basename(out_path), err[out_path]))
+        else:
+            errored += 1
+            status = "errored"
+            add_message("%d/%d | %s errored, %s" % (num, nums, label, err))
+        if report is not None:
+            report.add_file("stream", label, status, used, cpu, peak, file_size([name]) if kind == "task" else 0)
+    if report is not None:
+        report.add_stage("stream", time.time() - start)
+    add_message("%d completed, %d skipped, %d errored" % (completed, skipped, errored))
+    return completed, skipped, errored
+
+
+STEP_TITLES = {"extract": "extract subdataset", "mosaic": "mosaic raster", "reproject": "reproject raster",
+               "clip": "clip raster", "scale": "raster times scale factor",
+               "setnull": "exclude invalid value and times scale factor",
+               "qa": "mask by QA bits, exclude invalid value and times scale factor"}
+
+
+@instrumented
+def preprocess(workspace, hdfs, masks, out_coor_system, cell_size="#",
+               sds_index=0, sds_name="NDVI",
+               pixel_type="16_BIT_SIGNED", mosaic_method="LAST", colormap_mode="FIRST",
+               pr_prefix="pr_", resampling_type="NEAREST",
+               sn_prefix="sn_", condition=None,
+               scale_prefix="", scale_factor=0.0001, layers=None, stages=None, tile_filter=False,
+               use_metadata=False, dedup=False, collections=None, report=None, engine=None, caching=None,
+               output=None, qa=None):
+    """
+    ԤȡǶͶӰüΪգconditionΪʱ
 
-    # step1
-    s = time.time()
-    arcpy.AddMessage("Starting step 1/5: extract subdataset into {0}... {1}".format(dirs[0], localtime()))
-    batch_extract_sds(hdfs, dirs[0], sds_index=sds_index, suffix=sds_name)
-    e = time.time()
-    arcpy.AddMessage("Time for step1 = {0} seconds. {1}\n".format(e - s, localtime()))
+    Parameters
+    ----------
+    stages:List[str],optional
+        ҪִеĲ裬ͨΪpresetsԤstagesĬִȫ裻
+        ʡmosaicÿֻһļreprojectԭʼͶӰsetnull
+        ʡԵĲ費ļУһֱӶȡһĽ
+    use_metadata:bool
+        Ƿʹhdfݼscale_factorvalid_range_FillValueԴscale_factorconditionmetadata_layers
+        ÿƷֻȡһβ浽workspaceµsds_metadata.json
+        Ϊ1ݼдûΪʱӲӣֻΪգ
+    dedup:bool
+        Ƿȡ֮ǰȥظhdfͬһƷںƬж汾ļʱֻһ
+        ǻһǶظ㣬ȡļ˳Ĭϲȥأ֮ǰĽһ
+    collections:str or List[str],optional
+        ȥʱʹõİ汾"061;006"ΪNoneʱʹµİ汾ͬһ汾ʹʱµļ
+    engine:EngineOptions,optional
+        桢GeoTIFFѡִзʽֲںϡʽУĬΪarcpy浥̷ֲ
+    caching:CacheOptions,optional
+        Ŀ¼Ĭ϶ʹ
+    output:OutputOptions,optional
+        塢ʱϳɡͷͳƣĬֻ5_scale
+    qa:QAOptions,optional
+        QAĤĬϲʹ
+    ͬmod16preprocess
+    """
+    engine = engine or EngineOptions()
+    caching = caching or CacheOptions()
+    output = output or OutputOptions()
+    qa = qa or QAOptions()
+    if stages is None:
+        stages = STAGES
+    for stage in STAGES:
+        if stage not in stages and stage not in OPTIONAL_STAGES:
+            raise ValueError("stage %s can not be skipped" % stage)
+    workers = engine.workers
+    cache = open_cache(workspace, caching.cache, caching.size)
+    # ʹͬһ󣬴ѡֻһ
+    options = {}
+    if engine.native_mosaic and engine.backend in (None, "arcpy"):
+        options["native_mosaic"] = True
+    if engine.backend == "gdal":
+        # ͶӰͼͱ߽ĤֻԱռĸЧһ.yfcache
+        options["warp_dir"] = os.path.join(workspace, ".yfcache", "warp")
+        options["mask_dir"] = os.path.join(workspace, ".yfcache", "masks")
+    backend = get_backend(engine.backend, creation_options=engine.creation_options, **options)
+    catalog = open_catalog(workspace, caching.catalog)
+    if catalog is not None:
+        added = catalog.add_granules(hdfs)
+        if added:
+            add_message("{0} new hdf files added to the catalog".format(added))
+    if dedup:
+        hdfs = skip_duplicates(hdfs, collections, catalog)
+    if tile_filter:
+        hdfs = skip_tiles(hdfs, masks)
+    layers = normalize_layers(layers, sds_index, sds_name, scale_factor, condition)
+    if qa.rule and QA_NAME in [layer[1] for layer in layers]:
+        raise ValueError("subdataset name {0} is reserved for the QA layer".format(QA_NAME))
+    if use_metadata:
+        if not os.path.exists(workspace):
+            os.mkdir(workspace)
+        metadata = load_metadata(hdfs, [layer[0] for layer in layers], os.path.join(workspace, METADATA_FILE))
+        layers = metadata_layers(layers, hdfs, metadata)
+    if output.zonal:
+        if engine.by_group:
+            add_message("Zonal statistics run the stages one by one")
+        zonal_preprocess(workspace, hdfs, masks, out_coor_system, cell_size=cell_size, pixel_type=pixel_type,
+                         mosaic_method=mosaic_method, colormap_mode=colormap_mode, pr_prefix=pr_prefix,
+                         resampling_type=resampling_type, workers=workers, backend=backend, cache=cache,
+                         layers=layers, report=report, stages=stages, catalog=catalog,
+                         out_table=output.zonal if hasattr(output.zonal, "split") else None, qa=qa)
+    elif engine.fused or engine.queue:
+        executor = QueueExecutor(engine.queue, workers) if engine.queue else None
+        try:
+            fused_preprocess(workspace, hdfs, masks, out_coor_system, "5_scale", cell_size=cell_size,
+                             sds_index=sds_index, sds_name=sds_name, pixel_type=pixel_type,
+                             mosaic_method=mosaic_method, colormap_mode=colormap_mode, pr_prefix=pr_prefix,
+                             resampling_type=resampling_type, sn_prefix=sn_prefix, condition=condition,
+                             scale_prefix=scale_prefix, scale_factor=scale_factor,
+                             keep_intermediate=engine.keep_intermediate, workers=workers, executor=executor,
+                             backend=backend, cache=cache, layers=layers, report=report, stages=stages,
+                             catalog=catalog, qa=qa)
+        finally:
+            if executor is not None:
+                executor.close()
+    elif engine.streaming:
+        # ʽƽʹ
+        stream_preprocess(workspace, hdfs, masks, out_coor_system, cell_size=cell_size,
+                          sds_index=sds_index, sds_name=sds_name, pixel_type=pixel_type,
+                          mosaic_method=mosaic_method, colormap_mode=colormap_mode, pr_prefix=pr_prefix,
+                          resampling_type=resampling_type, sn_prefix=sn_prefix, condition=condition,
+                          scale_prefix=scale_prefix, scale_factor=scale_factor, workers=workers,
+                          backend=backend, layers=layers, report=report, stages=stages, qa=qa)
+    else:
+        staged_preprocess(workspace, hdfs, masks, out_coor_system, cell_size=cell_size, pixel_type=pixel_type,
+                          mosaic_method=mosaic_method, colormap_mode=colormap_mode, pr_prefix=pr_prefix,
+                          resampling_type=resampling_type, sn_prefix=sn_prefix, scale_prefix=scale_prefix,
+                          workers=workers, backend=backend, cache=cache, layers=layers, report=report,
+                          stages=stages, catalog=catalog, qa=qa)
+    if output.composite:
+        s = time.time()
+        add_message("Starting step: {0} composite by {1} into {2}... {3}".format(
+            ";".join(output.composite), output.period, os.path.join(workspace, "7_composite"),
+            localtime()))
+        batch_composite(find_tifs(os.path.join(workspace, "5_scale"), catalog), os.path.join(workspace, "7_composite"),
+                        reducers=output.composite, period=output.period, workers=workers, backend=backend,
+                        cache=cache, report=report, catalog=catalog)
+        evict_cache(cache, ("composite",))
+        e = time.time()
+        add_message("Time for compositing = {0} seconds. {1}\n".format(e - s, localtime()))
+        if report is not None:
+            report.add_stage("composite", e - s)
+    if output.overviews:
+        s = time.time()
+        add_message("Starting step: build overviews... {0}".format(localtime()))
+        rasters = []
+        for name in ("5_scale", "7_composite"):
+            if os.path.exists(os.path.join(workspace, name)):
+                rasters.extend(find_tifs(os.path.join(workspace, name), catalog))
+        batch_build_overviews(rasters, workers=workers, backend=backend, report=report, catalog=catalog)
+        e = time.time()
+        add_message("Time for building overviews = {0} seconds. {1}\n".format(e - s, localtime()))
+        if report is not None:
+            report.add_stage("overviews", e - s)
+    if output.cube:
+        s = time.time()
+        add_message("Starting step: write time series cubes into {0}... {1}".format(
+            os.path.join(workspace, "6_cube"), localtime()))
+        batch_cube(find_tifs(os.path.join(workspace, "5_scale"), catalog), os.path.join(workspace, "6_cube"), masks,
+                   layers=layers, workers=workers, backend=backend, report=report)
+        e = time.time()
+        add_message("Time for writing cubes = {0} seconds. {1}\n".format(e - s, localtime()))
+        if report is not None:
+            report.add_stage("cube", e - s)
+    if catalog is not None:
+        counts = sorted(catalog.status().items())
+        add_message("Catalog: {0}".format(", ".join("{0} {1}".format(n, k) for k, n in counts)))
+
+
+def zonal_preprocess(workspace, hdfs, masks, out_coor_system, cell_size="#",
+                     pixel_type="16_BIT_SIGNED", mosaic_method="LAST", colormap_mode="FIRST",
+                     pr_prefix="pr_", resampling_type="NEAREST", workers=1, backend=None, cache=None, layers=None,
+                     report=None, stages=None, catalog=None, out_table=None, qa=None):
+    """
+    ͳƣִȡǶͶӰȻͳͶӰڸ߽ڵֵдüźդ
 
-    # step2
+    Parameters
+    ----------
+    out_table:str,optional
+        ϲıĬΪworkspaceµ8_zonal/zonal_stats.csv
+    ͬstaged_preprocess
+    """
+    if stages is None:
+        stages = STAGES
+    qa = qa or QAOptions()
+    raster_stages = [stage for stage in stages if stage in ("extract", "mosaic", "reproject")]
+    staged_preprocess(workspace, hdfs, masks, out_coor_system, cell_size=cell_size, pixel_type=pixel_type,
+                      mosaic_method=mosaic_method, colormap_mode=colormap_mode, pr_prefix=pr_prefix,
+                      resampling_type=resampling_type, workers=workers, backend=backend, cache=cache,
+                      layers=layers, report=report, stages=raster_stages, catalog=catalog, qa=qa)
+    if "setnull" not in stages:
+        layers = [(index, name, factor, None) for index, name, factor, con in layers]
+    in_dir = os.path.join(workspace, STAGE_DIRS[raster_stages[-1]])
+    out_dir = os.path.join(workspace, "8_zonal")
     s = time.time()
-    arcpy.AddMessage("Starting step 2/5: mosaic raster into {0}... {1}".format(dirs[1], localtime()))
-    batch_mosaic(dirs[0], dirs[1], pixel_type=pixel_type, mosaic_method=mosaic_method,
-                 colormap_mode=colormap_mode)
+    add_message("Starting step: zonal statistics into {0}... {1}".format(out_dir, localtime()))
+    batch_zonal_stats(find_tifs(in_dir, catalog), out_dir, masks, layers=layers, out_table=out_table,
+                      workers=workers, backend=backend, cache=cache, report=report, catalog=catalog, qa_rule=qa.rule)
+    evict_cache(cache, ("zonal",))
     e = time.time()
-    arcpy.AddMessage("Time for step2 = {0} seconds. {1}\n".format(e - s, localtime()))
+    add_message("Time for zonal statistics = {0} seconds. {1}\n".format(e - s, localtime()))
+    if report is not None:
+        report.add_stage("zonal", e - s)
 
-    # step3
-    s = time.time()
-    arcpy.AddMessage("Starting step 3/5: reproject raster into {0}... {1}".format(dirs[2], localtime()))
-    rasters = find_tifs(dirs[1])
-    batch_project_raster(rasters, dirs[2], prefix=pr_prefix, out_coor_system=out_coor_system,
-                         resampling_type=resampling_type, cell_size=cell_size)
-    e = time.time()
-    arcpy.AddMessage("Time for step3 = {0} seconds. {1}\n".format(e - s, localtime()))
 
-    # step4
-    s = time.time()
-    arcpy.AddMessage("Starting step 4/5: clip raster into {0}... {1}".format(dirs[3], localtime()))
-    rasters = find_tifs(dirs[2])
-    batch_clip_raster(rasters, dirs[3], masks=masks)
-    e = time.time()
-    arcpy.AddMessage("Time for step4 = {0} seconds. {1}\n".format(e - s, localtime()))
+# ֲиļ
+STAGE_DIRS = {"extract": "1_extract", "mosaic": "2_mosaic", "reproject": "3_reproject", "clip": "4_clip",
+              "scale": "5_scale"}
 
-    # step5
-    s = time.time()
-    arcpy.AddMessage("Starting step 5/5:raster times scale factor into {0}... {1}".format(dirs[4], localtime()))
-    tifs = find_tifs(dirs[3])
-    batch_multiply(tifs, out_dir=dirs[4], prefix=scale_prefix, scale_factor=scale_factor)
-    e = time.time()
-    arcpy.AddMessage("Time for step5 = {0} seconds. {1}\n".format(e - s, localtime()))
 
+def staged_preprocess(workspace, hdfs, masks, out_coor_system, cell_size="#",
+                      pixel_type="16_BIT_SIGNED", mosaic_method="LAST", colormap_mode="FIRST",
+                      pr_prefix="pr_", resampling_type="NEAREST", sn_prefix="sn_", scale_prefix="",
+                      workers=1, backend=None, cache=None, layers=None, report=None, stages=None, catalog=None,
+                      qa=None):
+    """
+    ֲÿһȫļִɺٿʼһĽֱ𱣴workspaceµ1_extract~5_scale
 
-def mod16preprocess(workspace, hdfs, masks, out_coor_system, cell_size="#",
-                    sds_index=0, sds_name="ET",
-                    pixel_type="16_BIT_UNSIGNED", mosaic_method="LAST", colormap_mode="FIRST",
-                    pr_prefix="pr_", resampling_type="NEAREST",
-                    sn_prefix="sn_", condition="VALUE > 65528",
-                    scale_prefix="", scale_factor=0.1):
+    Parameters
+    ----------
+    layers:List[tuple]
+        normalize_layersķֵ
+    catalog:Catalog,optional
+        Ŀ¼open_catalogķֵ
+    ͬpreprocess
+    """
+    if stages is None:
+        stages = STAGES
+    qa = qa or QAOptions()
+    backend = get_backend(backend)
     if not os.path.exists(workspace):
         os.mkdir(workspace)
 
-    dir_names = ["1_extract", "2_mosaic", "3_reproject", "4_clip", "5_setn", "6_scale"]
-    dirs = [os.path.join(workspace, name) for name in dir_names]
-    for dir in dirs:
-        if not os.path.exists(dir):
-            os.mkdir(dir)
-
-    # step1
-    s = time.time()
-    arcpy.AddMessage("Starting step 1/6: extract subdataset into {0}... {1}".format(dirs[0], localtime()))
-    batch_extract_sds(hdfs, dirs[0], sds_index=sds_index, suffix=sds_name)
-    e = time.time()
-    arcpy.AddMessage("Time for step1 = {0} seconds. {1}\n".format(e - s, localtime()))
-
-    # step2
-    s = time.time()
-    arcpy.AddMessage("Starting step 2/6: mosaic raster into {0}... {1}".format(dirs[1], localtime()))
-    batch_mosaic(dirs[0], dirs[1], pixel_type=pixel_type, mosaic_method=mosaic_method,
-                 colormap_mode=colormap_mode)
-    e = time.time()
-    arcpy.AddMessage("Time for step2 = {0} seconds. {1}\n".format(e - s, localtime()))
+    dirs = {}
+    for stage, name in STAGE_DIRS.items():
+        if stage in stages:
+            dirs[stage] = os.path.join(workspace, name)
+            if not os.path.exists(dirs[stage]):
+                os.mkdir(dirs[stage])
+    # ΪӺϲΪһ5_setnļ
+    steps = [stage for stage in STAGES if stage in dirs]
+    in_dir = None
+    for num, stage in enumerate(steps, 1):
+        s = time.time()
+        title = STEP_TITLES[stage]
+        if stage == "scale" and qa.rule:
+            title = STEP_TITLES["qa"]
+        elif stage == "scale" and "setnull" in stages:
+            title = STEP_TITLES["setnull"]
+        add_message("Starting step {0}/{1}: {2} into {3}... {4}".format(num, len(steps), title, dirs[stage],
+                                                                         localtime()))
+        if stage == "extract":
+            batch_extract_sds(hdfs, dirs[stage], workers=workers, backend=backend, cache=cache,
+                              layers=[layer[:2] for layer in with_qa_layer(layers, qa)],
+                              report=report, catalog=catalog)
+        elif stage == "mosaic":
+            # QAݼͬһǶ
+            batch_mosaic(in_dir, dirs[stage], pixel_type=pixel_type, mosaic_method=mosaic_method,
+                         colormap_mode=colormap_mode, workers=workers, backend=backend, cache=cache, report=report,
+                         catalog=catalog, qa_pixel_type=qa.pixel_type if qa.rule else None)
+        elif stage == "reproject":
+            # QAλֵܲʹڽ
+            batch_project_raster(find_tifs(in_dir, catalog), dirs[stage], prefix=pr_prefix,
+                                 out_coor_system=out_coor_system, resampling_type=resampling_type,
+                                 cell_size=cell_size, workers=workers, backend=backend, cache=cache, report=report,
+                                 catalog=catalog, qa_resampling_type="NEAREST" if qa.rule else None)
+        elif stage == "clip":
+            batch_clip_raster(find_tifs(in_dir, catalog), dirs[stage], masks=masks, workers=workers, backend=backend,
+                              cache=cache, report=report, catalog=catalog)
+        else:
+            tifs = find_tifs(in_dir, catalog)
+            for index, name, factor, con in layers:
+                layer_tifs = [t for t in tifs if layer_of(t) == name]
+                if qa.rule:
+                    con = con if "setnull" in stages else None
+                    batch_qa_mask(layer_tifs, dirs[stage], qa.rule, condition=con, scale_factor=factor,
+                                  prefix=(scale_prefix or "") + ((sn_prefix or "") if con else ""), workers=workers,
+                                  backend=backend, cache=cache, report=report, catalog=catalog)
+                elif con and "setnull" in stages:
+                    batch_setnull_multiply(layer_tifs, dirs[stage], condition=con, scale_factor=factor,
+                                           prefix=(scale_prefix or "") + (sn_prefix or ""), workers=workers,
+                                           backend=backend, cache=cache, report=report, catalog=catalog)
+                else:
+                    batch_multiply(layer_tifs, out_dir=dirs[stage], prefix=scale_prefix, scale_factor=factor,
+                                   workers=workers, backend=backend, cache=cache, report=report, catalog=catalog)
+        # ŰݼִֶУȫɺɾм
+        # һ룬֮Ĳеʱɾ
+        evict_cache(cache, steps[num - 1:])
+        e = time.time()
+        add_message("Time for step{0} = {1} seconds. {2}\n".format(num, e - s, localtime()))
+        if report is not None:
+            report.add_stage(stage, e - s)
+        in_dir = dirs[stage]
 
-    # step3
-    s = time.time()
-    arcpy.AddMessage("Starting step 3/6: reproject raster into {0}... {1}".format(dirs[2], localtime()))
-    rasters = find_tifs(dirs[1])
-    batch_project_raster(rasters, dirs[2], prefix=pr_prefix, out_coor_system=out_coor_system,
-                         resampling_type=resampling_type, cell_size=cell_size)
-    e = time.time()
-    arcpy.AddMessage("Time for step3 = {0} seconds. {1}\n".format(e - s, localtime()))
 
-    # step4
-    s = time.time()
-    arcpy.AddMessage("Starting step 4/6: clip raster into {0}... {1}".format(dirs[3], localtime()))
-    rasters = find_tifs(dirs[2])
-    batch_clip_raster(rasters, dirs[3], masks=masks)
-    e = time.time()
-    arcpy.AddMessage("Time for step4 = {0} seconds. {1}\n".format(e - s, localtime()))
+def mod13preprocess(workspace, hdfs, masks, out_coor_system, cell_size="#",
+                    sds_index=0, sds_name="NDVI",
+                    pixel_type="16_BIT_SIGNED", mosaic_method="LAST", colormap_mode="FIRST",
+                    pr_prefix="pr_", resampling_type="NEAREST",
+                    scale_prefix="", scale_factor=0.0001, layers=None, tile_filter=False, report=None, profile=None,
+                    engine=None, caching=None):
+    # MOD13ֵЧΧ֮⣬ִΪ
+    return preprocess(workspace, hdfs, masks, out_coor_system, cell_size=cell_size, sds_index=sds_index,
+                      sds_name=sds_name, pixel_type=pixel_type, mosaic_method=mosaic_method,
+                      colormap_mode=colormap_mode, pr_prefix=pr_prefix, resampling_type=resampling_type,
+                      scale_prefix=scale_prefix, scale_factor=scale_factor, layers=layers, tile_filter=tile_filter,
+                      report=report, profile=profile, engine=engine, caching=caching,
+                      stages=get_preset("MOD13_NDVI").stages)
 
-    # step5
-    s = time.time()
-    arcpy.AddMessage("Starting step 5/6: exclude invalid value, into {0}... {1}".format(dirs[4], localtime()))
-    rasters = find_tifs(dirs[3])
-    batch_setnull(rasters, dirs[4], condition=condition, prefix=sn_prefix)
-    e = time.time()
-    arcpy.AddMessage("Time for step5 = {0} seconds. {1}\n".format(e - s, localtime()))
 
-    # step6
-    s = time.time()
-    arcpy.AddMessage(
-        "Starting step 6/6: raster times scale factor into {0}... {1}".format(dirs[5], localtime()))
-    tifs = find_tifs(dirs[4])
-    batch_multiply(tifs, out_dir=dirs[5], prefix=scale_prefix, scale_factor=scale_factor)
-    e = time.time()
-    arcpy.AddMessage("Time for step5 = {0} seconds. {1}\n".format(e - s, localtime()))
+def mod16preprocess(workspace, hdfs, masks, out_coor_system, cell_size="#",
+                    sds_index=0, sds_name="ET",
+                    pixel_type="16_BIT_UNSIGNED", mosaic_method="LAST", colormap_mode="FIRST",
+                    pr_prefix="pr_", resampling_type="NEAREST",
+                    sn_prefix="sn_", condition="VALUE > 65528",
+                    scale_prefix="", scale_factor=0.1, layers=None, tile_filter=False, report=None, profile=None,
+                    engine=None, caching=None):
+    return preprocess(workspace, hdfs, masks, out_coor_system, cell_size=cell_size, sds_index=sds_index,
+                      sds_name=sds_name, pixel_type=pixel_type, mosaic_method=mosaic_method,
+                      colormap_mode=colormap_mode, pr_prefix=pr_prefix, resampling_type=resampling_type,
+                      sn_prefix=sn_prefix, condition=condition, scale_prefix=scale_prefix, scale_factor=scale_factor,
+                      layers=layers, tile_filter=tile_filter, report=report, profile=profile, engine=engine,
+                      caching=caching)
 
 
 class Toolbox(object):
@@ -472,6 +1482,19 @@ class Toolbox(object):
         self.tools = [Tool1]
 
 
+# ԤеĲڹ߲беλ
+PRESET_PARAMETERS = [(5, "cell_size"), (6, "sds_index"), (7, "sds_name"), (8, "pixel_type"), (9, "scale_factor"),
+                     (16, "condition"), (43, "qa_sds_index"), (44, "qa_rule")]
+
+
+def apply_preset(parameters, preset):
+    # ԤвΪNoneĲ빤
+    for index, key in PRESET_PARAMETERS:
+        value = getattr(preset, key)
+        if value is not None:
+            parameters[index].value = value
+
+
 class Tool1(object):
     def __init__(self):
         """Define the tool (tool name is the name of the class)."""
@@ -489,12 +1512,7 @@ class Tool1(object):
                                   datatype="String", parameterType="Required",
                                   direction="Input")
         param_0.filter.type = "ValueList"
-        param_0.filter.list = ["MOD13_NDVI", "MOD13_EVI",
-                               "MOD16_ET", "MOD16_PET",
-                               "MOD11A2_LST",
-                               "MOD17A2_GPP", "MOD17A3_NPP",
-                               "MOD15A2_LAI",
-                               "custom"]
+        param_0.filter.list = list(PRESETS)
         param_0.value = "MOD13_NDVI"
         param_1 = arcpy.Parameter(displayName="ռ", name="ws",
                                   datatype="DEFolder", parameterType="Required",
@@ -559,16 +1577,135 @@ class Tool1(object):
         param_16 = arcpy.Parameter(displayName="ɸѡ", name="con_filter",
                                    datatype="GPString", parameterType="Optional",
                                    direction="Input")
+        param_17 = arcpy.Parameter(displayName="н", name="workers",
+                                   datatype="GPLong", parameterType="Optional",
+                                   direction="Input")
+        param_17.value = 1
+        param_18 = arcpy.Parameter(displayName="", name="backend",
+                                   datatype="GPString", parameterType="Optional",
+                                   direction="Input")
+        param_18.filter.type = "ValueList"
+        param_18.filter.list = ["arcpy", "gdal"]
+        param_18.value = "arcpy"
+        param_19 = arcpy.Parameter(displayName="ںϴм", name="fused",
+                                   datatype="GPBoolean", parameterType="Optional",
+                                   direction="Input")
+        param_19.value = False
+        param_20 = arcpy.Parameter(displayName="мã", name="keep_intermediate",
+                                   datatype="GPBoolean", parameterType="Optional",
+                                   direction="Input")
+        param_20.value = False
+        param_21 = arcpy.Parameter(displayName="ʹ棨ıʱֻӰļ", name="cache",
+                                   datatype="GPBoolean", parameterType="Optional",
+                                   direction="Input")
+        param_21.value = False
+        param_22 = arcpy.Parameter(displayName="мСޣMB", name="cache_size",
+                                   datatype="GPDouble", parameterType="Optional",
+                                   direction="Input")
+        param_23 = arcpy.Parameter(displayName="ͬʱȡݼ0:NDVI;1:EVI;2:QA:1", name="layers",
+                                   datatype="GPString", parameterType="Optional",
+                                   direction="Input")
+        param_24 = arcpy.Parameter(displayName="ü߽粻ཻƬ", name="tile_filter",
+                                   datatype="GPBoolean", parameterType="Optional",
+                                   direction="Input")
+        param_24.value = False
+        param_25 = arcpy.Parameter(displayName="ʽÿȡɺк裩", name="streaming",
+                                   datatype="GPBoolean", parameterType="Optional",
+                                   direction="Input")
+        param_25.value = False
+        param_26 = arcpy.Parameter(displayName="б棨.json.csv", name="report",
+                                   datatype="DEFile", parameterType="Optional",
+                                   direction="Output")
+        param_26.filter.list = ["json", "csv"]
+        param_27 = arcpy.Parameter(displayName="ܷcProfile", name="profile",
+                                   datatype="DEFile", parameterType="Optional",
+                                   direction="Output")
+        param_28 = arcpy.Parameter(displayName="ʹhdfеӺЧΧӺɸѡ",
+                                   name="use_metadata", datatype="GPBoolean", parameterType="Optional",
+                                   direction="Input")
+        param_28.value = False
+        param_29 = arcpy.Parameter(displayName="дʱ壨ÿ߽硢ƷݼһZarr洢", name="cube",
+                                   datatype="GPBoolean", parameterType="Optional",
+                                   direction="Input")
+        param_29.value = False
+        param_30 = arcpy.Parameter(displayName="ʱϳɷ", name="composite",
+                                   datatype="GPString", parameterType="Optional",
+                                   direction="Input", multiValue=True)
+        param_30.filter.list = list(REDUCERS)
+        param_31 = arcpy.Parameter(displayName="ʱϳɵʱ", name="composite_period",
+                                   datatype="GPString", parameterType="Optional",
+                                   direction="Input")
+        param_31.filter.list = list(PERIODS)
+        param_31.value = "month"
+        param_32 = arcpy.Parameter(displayName="GeoTIFFѹ", name="compress",
+                                   datatype="GPString", parameterType="Optional",
+                                   direction="Input")
+        param_32.filter.list = list(COMPRESSIONS)
+        param_32.value = "NONE"
+        param_33 = arcpy.Parameter(displayName="ѹʱʹԤΪˮƽ֣ΪԤ", name="predictor",
+                                   datatype="GPBoolean", parameterType="Optional",
+                                   direction="Input")
+        param_33.value = False
+        param_34 = arcpy.Parameter(displayName="GeoTIFFڲֿ", name="tiled",
+                                   datatype="GPBoolean", parameterType="Optional",
+                                   direction="Input")
+        param_34.value = True
+        param_35 = arcpy.Parameter(displayName="BigTIFF4GB", name="bigtiff",
+                                   datatype="GPString", parameterType="Optional",
+                                   direction="Input")
+        param_35.filter.list = list(BIGTIFF_MODES)
+        param_36 = arcpy.Parameter(displayName="Ϊս", name="overviews",
+                                   datatype="GPBoolean", parameterType="Optional",
+                                   direction="Input")
+        param_36.value = False
+        param_37 = arcpy.Parameter(displayName="ʹĿ¼繲ϵĴļ", name="catalog",
+                                   datatype="GPBoolean", parameterType="Optional",
+                                   direction="Input")
+        param_37.value = False
+        param_38 = arcpy.Parameter(displayName="ȥظhdfͬһƷںƬֻһ", name="dedup",
+                                   datatype="GPBoolean", parameterType="Optional",
+                                   direction="Input")
+        param_38.value = False
+        param_39 = arcpy.Parameter(displayName="ʹõİ汾061;006Ĭʹ°汾", name="collections",
+                                   datatype="GPString", parameterType="Optional",
+                                   direction="Input")
+        param_40 = arcpy.Parameter(displayName="ڵ㹤Уļе.sqliteڵм룩",
+                                   name="queue", datatype="DEFile", parameterType="Optional",
+                                   direction="Output")
+        param_41 = arcpy.Parameter(displayName="ֻ߽ķͳƱдüդ", name="zonal",
+                                   datatype="GPBoolean", parameterType="Optional",
+                                   direction="Input")
+        param_41.value = False
+        param_42 = arcpy.Parameter(displayName="QAλĤȥϸԪ", name="qa",
+                                   datatype="GPBoolean", parameterType="Optional",
+                                   direction="Input")
+        param_42.value = False
+        param_43 = arcpy.Parameter(displayName="QAݼ", name="qa_sds_index",
+                                   datatype="GPLong", parameterType="Optional",
+                                   direction="Input")
+        param_44 = arcpy.Parameter(displayName="QAλʼλ-λ:ֵ0-1:0,1;2-5:0-11",
+                                   name="qa_rule", datatype="GPString", parameterType="Optional",
+                                   direction="Input")
+        param_45 = arcpy.Parameter(displayName="arcpyNumPyǶѶƬǶդ",
+                                   name="native_mosaic", datatype="GPBoolean", parameterType="Optional",
+                                   direction="Input")
+        param_45.value = False
         params = [param_0, param_1, param_2, param_3, param_4, param_5, param_6,
-                  param_7, param_8, param_9, param_10, param_11, param_12, param_13, param_14, param_15, param_16]
-        for i in range(6, 17):
+                  param_7, param_8, param_9, param_10, param_11, param_12, param_13, param_14, param_15, param_16,
+                  param_17, param_18, param_19, param_20, param_21, param_22, param_23, param_24, param_25,
+                  param_26, param_27, param_28, param_29, param_30, param_31, param_32, param_33, param_34,
+                  param_35, param_36, param_37, param_38, param_39,
+                  param_40, param_41, param_42, param_43, param_44, param_45]
+        for i in range(6, len(params)):
             params[i].category = "Advanced options"
+        # 򿪹ʱĬԤĲֻ֮ڸԤʱ
+        apply_preset(params, get_preset(param_0.value))
         return params
 
     def initializeParameters(self, parameters):
         """Refine the properties of a tool's parameters.  This method is
         called when the tool is opened."""
-        for i in range(6, 17):
+        for i in range(6, len(parameters)):
             parameters[i].category = "Advanced options"
         return
 
@@ -580,75 +1717,38 @@ class Tool1(object):
         """Modify the values and properties of parameters before internal
         validation is performed.  This method is called whenever a parameter
         has been changed."""
-        if parameters[0].altered:
-            if parameters[0].value in ["MOD13_NDVI", "MOD13_EVI"]:
-                parameters[16].enabled = 0
-            else:
-                parameters[16].enabled = 1
-        if parameters[0].value == "MOD13_NDVI":
-            # parameters[5].value = "250 250"  # cell_size
-            parameters[6].value = 0  # sds_index
-            parameters[7].value = "NDVI"  # sds_name
-            parameters[8].value = "16_BIT_SIGNED"
-            parameters[9].value = 0.0001
-        elif parameters[0].value == "MOD13_EVI":
-            # parameters[5].value = "250 250"  # cell_size
-            parameters[6].value = 1  # sds_index
-            parameters[7].value = "EVI"  # sds_name
-            parameters[8].value = "16_BIT_SIGNED"
-            parameters[9].value = 0.0001
-        elif parameters[0].value == "MOD16_ET":
-            # parameters[5].value = "500 500"  # cell_size
-            parameters[6].value = 0  # sds_index
-            parameters[7].value = "ET"  # sds_name
-            parameters[8].value = "16_BIT_UNSIGNED"
-            parameters[9].value = 0.1
-            parameters[16].value = "VALUE > 32700"
-        elif parameters[0].value == "MOD16_PET":
-            # parameters[5].value = "500 500"  # cell_size
-            parameters[6].value = 2  # sds_index
-            parameters[7].value = "PET"  # sds_name
-            parameters[8].value = "16_BIT_UNSIGNED"
-            parameters[9].value = 0.1
-            parameters[16].value = "VALUE > 32700"
-        elif parameters[0].value == "MOD11A2_LST":
-            parameters[5].value = "1000 1000"  # cell_size
-            parameters[6].value = 0  # sds_index
-            parameters[7].value = "LST"  # sds_name
-            parameters[8].value = "16_BIT_UNSIGNED"
-            parameters[9].value = 0.02
-            parameters[16].value = "VALUE < 7500"
-        elif parameters[0].value == "MOD17A2_GPP":
-            parameters[5].value = "500 500"  # cell_size
-            parameters[6].value = 0  # sds_index
-            parameters[7].value = "GPP"  # sds_name
-            parameters[8].value = "16_BIT_SIGNED"
-            parameters[9].value = 0.0001
-            parameters[16].value = "VALUE > 30000"
-        elif parameters[0].value == "MOD17A3_NPP":
-            parameters[5].value = "500 500"  # cell_size
-            parameters[6].value = 0  # sds_index
-            parameters[7].value = "NPP"  # sds_name
-            parameters[8].value = "16_BIT_SIGNED"
-            parameters[9].value = 0.0001
-            parameters[16].value = "VALUE > 32700"
-        elif parameters[0].value == "MOD15A2_LAI":
-            parameters[5].value = "500 500"  # cell_size
-            parameters[6].value = 1  # sds_index
-            parameters[7].value = "LAI"  # sds_name
-            parameters[8].value = "8_BIT_UNSIGNED"
-            parameters[9].value = 0.1
-            parameters[16].value = "VALUE > 100"
+        parameters[20].enabled = bool(parameters[19].value)
+        parameters[22].enabled = bool(parameters[21].value)
+        parameters[43].enabled = parameters[44].enabled = bool(parameters[42].value)
+        parameters[45].enabled = parameters[18].valueAsText in (None, "", "arcpy")
+        preset = get_preset(parameters[0].valueAsText)
+        parameters[16].enabled = "setnull" not in preset.skip
+        # ֻڸԤʱԤĲ޸ʱû޸Ĳᱻǣ
+        # ӽģ´򿪹ʱԤδ޸ģѱĲֲ
+        if parameters[0].altered and not parameters[0].hasBeenValidated:
+            apply_preset(parameters, preset)
         return
 
     def updateMessages(self, parameters):
         """Modify the messages created by internal validation for each tool
         parameter.  This method is called after internal validation."""
+        # gdalʹõĽɸѡǰ﷨
+        if parameters[16].enabled and parameters[16].value and parameters[18].valueAsText == "gdal":
+            try:
+                compile_condition(parameters[16].valueAsText)
+            except ValueError as err:
+                parameters[16].setErrorMessage(str(err))
+        if parameters[42].value and parameters[44].value:
+            try:
+                parse_qa_rule(parameters[44].valueAsText)
+            except ValueError as err:
+                parameters[44].setErrorMessage(str(err))
         return
 
     def execute(self, parameters, messages):
         """The source code of the tool."""
 
+        # workersڽ̼ƣGP̵ֵ̣߱߳߳
         arcpy.env.parallelProcessingFactor = 0
 
         preset = parameters[0].valueAsText
@@ -668,60 +1768,71 @@ class Tool1(object):
         scale_prefix = parameters[14].valueAsText
         sn_prefix = parameters[15].valueAsText
         condition = parameters[16].valueAsText
+        engine = EngineOptions(
+            backend=parameters[18].valueAsText or "arcpy",
+            workers=int(parameters[17].valueAsText) if parameters[17].valueAsText else 1,
+            creation_options=gtiff_options(compress=parameters[32].valueAsText, predictor=bool(parameters[33].value),
+                                           tiled=parameters[34].value is not False,
+                                           bigtiff=parameters[35].valueAsText),
+            native_mosaic=bool(parameters[45].value),
+            fused=bool(parameters[19].value),
+            streaming=bool(parameters[25].value),
+            queue=parameters[40].valueAsText,
+            keep_intermediate=bool(parameters[20].value))
+        caching = CacheOptions(cache=bool(parameters[21].value), size=parameters[22].valueAsText,
+                               catalog=bool(parameters[37].value))
+        output = OutputOptions(cube=bool(parameters[29].value), composite=parameters[30].valueAsText,
+                               period=parameters[31].valueAsText or "month", overviews=bool(parameters[36].value),
+                               zonal=bool(parameters[41].value))
+        # ʽΪ":[:[:ɸѡ]]"ݼ÷ֺŸΪʱֻݼӦһ
+        layers = parameters[23].valueAsText
+        tile_filter = bool(parameters[24].value)
+        report = parameters[26].valueAsText
+        profile = parameters[27].valueAsText
+        use_metadata = bool(parameters[28].value)
+        dedup = bool(parameters[38].value)
+        collections = parameters[39].valueAsText
 
         hdfs = hdfs.split(";")
         masks = masks.split(";")
 
+        preset = get_preset(preset)
+        if "setnull" in preset.skip:
+            condition = None
+        qa = None
+        if parameters[42].value:
+            qa = QAOptions(sds_index=parameters[43].valueAsText, rule=parameters[44].valueAsText,
+                           pixel_type=preset.qa_pixel_type)
+
         try:
-            if preset in ["MOD13_NDVI", "MOD13_EVI"]:
-                mod13preprocess(workspace=workspace,
-                                hdfs=hdfs,
-                                masks=masks,
-                                out_coor_system=out_coor_system,
-                                cell_size=cell_size,
-                                sds_index=sds_index,
-                                sds_name=sds_name,
-                                pixel_type=pixel_type,
-                                mosaic_method=mosaic_method,
-                                colormap_mode=colormap_mode,
-                                resampling_type=resampling_type,
-                                scale_factor=scale_factor,
-                                scale_prefix=scale_prefix,
-                                pr_prefix=pr_prefix)
-            elif preset in ["MOD16_ET", "MOD16_PET"]:
-                mod16preprocess(workspace=workspace,
-                                hdfs=hdfs,
-                                masks=masks,
-                                out_coor_system=out_coor_system,
-                                cell_size=cell_size,
-                                sds_index=sds_index,
-                                sds_name=sds_name,
-                                pixel_type=pixel_type,
-                                mosaic_method=mosaic_method,
-                                colormap_mode=colormap_mode,
-                                resampling_type=resampling_type,
-                                scale_factor=scale_factor,
-                                scale_prefix=scale_prefix,
-                                pr_prefix=pr_prefix,
-                                sn_prefix=sn_prefix,
-                                condition=condition)
-            else:
-                mod16preprocess(workspace=workspace,
-                                hdfs=hdfs,
-                                masks=masks,
-                                out_coor_system=out_coor_system,
-                                cell_size=cell_size,
-                                sds_index=sds_index,
-                                sds_name=sds_name,
-                                pixel_type=pixel_type,
-                                mosaic_method=mosaic_method,
-                                colormap_mode=colormap_mode,
-                                resampling_type=resampling_type,
-                                scale_factor=scale_factor,
-                                scale_prefix=scale_prefix,
-                                pr_prefix=pr_prefix,
-                                sn_prefix=sn_prefix,
-                                condition=condition)
+            preprocess(workspace=workspace,
+                       hdfs=hdfs,
+                       masks=masks,
+                       out_coor_system=out_coor_system,
+                       cell_size=cell_size,
+                       sds_index=sds_index,
+                       sds_name=sds_name,
+                       pixel_type=pixel_type,
+                       mosaic_method=mosaic_method,
+                       colormap_mode=colormap_mode,
+                       resampling_type=resampling_type,
+                       scale_factor=scale_factor,
+                       scale_prefix=scale_prefix,
+                       pr_prefix=pr_prefix,
+                       sn_prefix=sn_prefix,
+                       condition=condition,
+                       layers=layers,
+                       stages=preset.stages,
+                       tile_filter=tile_filter,
+                       use_metadata=use_metadata,
+                       dedup=dedup,
+                       collections=collections,
+                       report=report,
+                       profile=profile,
+                       engine=engine,
+                       caching=caching,
+                       output=output,
+                       qa=qa)
         except UnicodeEncodeError as cnerr:
             arcpy.AddMessage("󣡲ֲַ¸ù޷Уɳ޸ΪӢԽ%s"%"".encode('utf-8'))
             raise cnerr
@@ -0,0 +1,7 @@
+# -- coding:cp936 C
+"""
+yfMODISToolĸģ
+
+yfMODISTool.py.pyt䣩õĹ
+ԱִʱӽܹͨimportҵӦĺ
+"""
@@ -0,0 +1,6 @@
+# -- coding:cp936 C
+import sys
+
+from yfmodis.cli import main
+
+sys.exit(main())
@@ -0,0 +1,699 @@
+# -- coding:cp936 C
+"""
+դ
+
+ֻﶨȡݼǶͶӰüˡΪա
+ArcpyBackendArcGISĵߣGdalBackendʹGDAL/NumPyʵ֣
+ûArcGISLinuxڵС
+"""
+import copy
+import os
+import re
+import shutil
+import tempfile
+
+from yfmodis.blocks import (FLOAT_NODATA, GTIFF_OPTIONS, gdal_options, is_unit_scale, option_value,
+                            parse_creation_options, setnull_func, setnull_times_func, stream_apply, times_func,
+                            typed_options)
+from yfmodis.cache import replace_file, sidecars
+from yfmodis.clipmask import clip_by_masks, load_mask
+from yfmodis.composite import gdal_composite
+from yfmodis.condition import compile_condition
+from yfmodis.mosaic import PIXEL_DTYPES, gdal_mosaic, grid_offsets, mosaic_arrays
+from yfmodis.parallel import PartialOutputError
+from yfmodis.qa import parse_qa_rule
+from yfmodis.warp import reproject_nearest
+
+try:
+    import arcpy
+except ImportError:
+    arcpy = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from osgeo import gdal, gdal_array, osr
+
+    gdal.UseExceptions()
+except ImportError:
+    gdal = None
+    gdal_array = None
+    osr = None
+
+
+class RasterBackend(object):
+    """
+    դĽӿ
+
+    зΪļ·ÿεֻһդ
+    ˳ͳһΪ(, , ...)
+    ᱻݵӽִУ˲ܳд򿪵ݼ޷pickle״̬
+    """
+    name = None
+
+    # GeoTIFFĴѡblocks.gtiff_optionsķֵΪNoneʱʹĬ
+    creation_options = None
+
+    def setup(self):
+        """
+        ִвĽеһΣдΪý̼Ļarcpy.env
+        """
+
+    def extract_sds(self, hdf, out_tif, sds_index):
+        raise NotImplementedError
+
+    def extract_sds_multi(self, hdf, out_tifs, sds_indexes):
+        """
+        һhdfȡݼout_tifssds_indexesһһӦ
+        Ĭextract_sdsдΪֻһhdf
+        """
+        for out_tif, sds_index in zip(out_tifs, sds_indexes):
+            self.extract_sds(hdf, out_tif, sds_index)
+
+    def mosaic(self, rasters, out_raster, pixel_type, mosaic_method, colormap_mode):
+        raise NotImplementedError
+
+    def project_raster(self, raster, out_raster, out_coor_system, resampling_type, cell_size):
+        raise NotImplementedError
+
+    def clip_raster(self, raster, out_raster, mask):
+        raise NotImplementedError
+
+    def clip_multi(self, raster, out_rasters, masks):
+        """
+        ö߽üͬһդout_rastersmasksһһӦ
+        Ĭclip_rasterдΪֻȡһդ
+
+        һ߽դཻӰ߽磬ûдʹϢɵֵ
+        """
+        failed = {}
+        for out_raster, mask in zip(out_rasters, masks):
+            try:
+                self.clip_raster(raster, out_raster, mask)
+            except Exception as e:
+                failed[out_raster] = "%s" % e
+        return failed
+
+    def times(self, raster, out_raster, scale_factor):
+        raise NotImplementedError
+
+    def setnull(self, raster, out_raster, condition):
+        raise NotImplementedError
+
+    def composite(self, rasters, out_raster, reducer, condition=None):
+        """
+        ΧͬĶںϳΪһդreducercomposite.REDUCERSconditionԪϳ
+        """
+        raise NotImplementedError
+
+    def build_overviews(self, raster, levels, resampling="NEAREST"):
+        """
+        Ϊդⲿ.ovrlevelsΪС[2, 4, 8, 16]
+        """
+        raise NotImplementedError
+
+    def to_numpy(self, raster):
+        """
+        ȡդ񣬷(, GDALʽĵ任, ϵWKT, NoDataֵ)дʱʹ
+        """
+        raise NotImplementedError
+
+    def mask_windows(self, raster, masks):
+        """
+        դĸդÿ߽磬masksһһӦ(window, inside)clipmask.mask_window
+        ͳʹ
+        """
+        raise NotImplementedError
+
+    def setnull_times(self, raster, out_raster, condition, scale_factor):
+        """
+        ΪպӣĬͨʱդεsetnulltimesдΪһμ
+        """
+        tmp = self.scratch_path("sn_" + os.path.basename(out_raster))
+        try:
+            self.setnull(raster, tmp, condition)
+            self.times(tmp, out_raster, scale_factor)
+        finally:
+            self.delete(tmp)
+
+    def qa_setnull_times(self, raster, out_raster, qa_raster, qa_rule, condition=None, scale_factor=None):
+        """
+        QAĤͬʱΪգconditionΪʱͳӣΪ1ʱһμ
+
+        qa_rasterrasterĸͬqa_ruleԪQAΪNoDataԪΪNoData
+        Ϊ1ʱԭʼͣfloat32
+        """
+        raise NotImplementedError
+
+    def scratch_path(self, name):
+        """
+        ʱդ·ںϴʱмдdeleteɾ
+        """
+        return os.path.join(tempfile.gettempdir(), "yfmodis_%d_%s" % (os.getpid(), name))
+
+    def delete(self, raster):
+        for path in sidecars(raster):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def rename(self, raster, out_raster):
+        """
+        դͬļΪout_rasterout_rasterѴʱ
+        """
+        self.delete(out_raster)
+        for src, dst in zip(sidecars(raster), sidecars(out_raster)):
+            if os.path.exists(src):
+                replace_file(src, dst)
+
+    def link(self, raster, out_raster):
+        """
+        Ϊ1ҲҪΪʱtimesдդ񣺴Ӳӣ֧ʱļ
+        """
+        for src, dst in zip(sidecars(raster), sidecars(out_raster)):
+            if not os.path.exists(src):
+                continue
+            try:
+                os.link(src, dst)
+            except (AttributeError, OSError):
+                # python2Windows汾ûos.linkFAT32ļϵͳ֧Ӳ
+                shutil.copyfile(src, dst)
+
+
+class ArcpyBackend(RasterBackend):
+    """
+    arcpyߵ棬֮ǰĴһ
+
+    Parameters
+    ----------
+    native_mosaic:bool
+        ΪTrueʱǶNumPyƬƫɣMosaicToNewRasterƬûжʱʹõ
+    creation_options:List[str],optional
+        GeoTIFFĴѡΪarcpy.env.compressiontileSize
+        arcpyûZSTDԤZSTDLZ77DEFLATEBigTIFFarcpyԶж
+    """
+    name = "arcpy"
+
+    def __init__(self, native_mosaic=False, creation_options=None):
+        if arcpy is None:
+            raise RuntimeError("arcpy is unavailable, use the gdal backend instead")
+        self.native_mosaic = native_mosaic
+        self.creation_options = parse_creation_options(creation_options)
+
+    def setup(self):
+        if self.creation_options is None:
+            return
+        compress = option_value(self.creation_options, "COMPRESS", "NONE")
+        arcpy.env.compression = ARCPY_COMPRESSION[compress]
+        if option_value(self.creation_options, "TILED") == "YES":
+            size = option_value(self.creation_options, "BLOCKXSIZE", "256")
+            arcpy.env.tileSize = "%s %s" % (size, size)
+        # build_overviews轨
+        arcpy.env.pyramid = "NONE"
+
+    def extract_sds(self, hdf, out_tif, sds_index):
+        arcpy.ExtractSubDataset_management(hdf, out_tif, sds_index)
+
+    def extract_sds_multi(self, hdf, out_tifs, sds_indexes):
+        # һȡΪನդٰβ֣ݼͲͬʱನդȡֵͣ
+        multi = self.scratch_path("sds_" + os.path.basename(hdf))
+        try:
+            arcpy.ExtractSubDataset_management(hdf, multi, ";".join(str(i) for i in sds_indexes))
+            for band, out_tif in enumerate(out_tifs, 1):
+                arcpy.CopyRaster_management(os.path.join(multi, "Band_%d" % band), out_tif)
+        finally:
+            self.delete(multi)
+
+    def mosaic(self, rasters, out_raster, pixel_type, mosaic_method, colormap_mode):
+        if self.native_mosaic:
+            try:
+                self.numpy_mosaic(rasters, out_raster, pixel_type, mosaic_method)
+                return
+            except ValueError:
+                pass
+        desc = arcpy.Describe(rasters[0])
+        out_dir, name = os.path.split(out_raster)
+        arcpy.MosaicToNewRaster_management(';'.join(rasters), out_dir, name, desc.spatialReference, pixel_type,
+                                           desc.meanCellWidth, desc.bandCount, mosaic_method, colormap_mode)
+
+    def numpy_mosaic(self, rasters, out_raster, pixel_type, mosaic_method):
+        tiles = [arcpy.Raster(raster) for raster in rasters]
+        cell_size = (tiles[0].meanCellWidth, tiles[0].meanCellHeight)
+        if any(t.meanCellWidth != cell_size[0] or t.meanCellHeight != cell_size[1] for t in tiles):
+            raise ValueError("tiles do not share the same cell size")
+        offsets, shape, origin = grid_offsets([(t.extent.XMin, t.extent.YMax, t.width, t.height) for t in tiles],
+                                              cell_size)
+        nodatas = [t.noDataValue for t in tiles]
+        arrays = [arcpy.RasterToNumPyArray(t) for t in tiles]
+        array = mosaic_arrays(arrays, offsets, shape, mosaic_method, nodatas, PIXEL_DTYPES[pixel_type], nodatas[0])
+        lower_left = arcpy.Point(origin[0], origin[1] - shape[1] * cell_size[1])
+        arcpy.NumPyArrayToRaster(array, lower_left, cell_size[0], cell_size[1], nodatas[0]).save(out_raster)
+        arcpy.DefineProjection_management(out_raster, tiles[0].spatialReference)
+
+    def project_raster(self, raster, out_raster, out_coor_system, resampling_type, cell_size):
+        arcpy.ProjectRaster_management(raster, out_raster, out_coor_system, resampling_type, cell_size,
+                                       "#", "#", "#")
+
+    def clip_raster(self, raster, out_raster, mask):
+        arcpy.Clip_management(raster, "#", out_raster, mask, "#", "ClippingGeometry")
+
+    def times(self, raster, out_raster, scale_factor):
+        arcpy.CheckOutExtension("Spatial")
+        arcpy.gp.Times_sa(raster, str(scale_factor), out_raster)
+
+    def setnull(self, raster, out_raster, condition):
+        arcpy.CheckOutExtension("Spatial")
+        arcpy.gp.SetNull_sa(raster, raster, out_raster, condition)
+
+    def setnull_times(self, raster, out_raster, condition, scale_factor):
+        # ͼʽSpatial AnalystһμɣΪյмդ
+        arcpy.CheckOutExtension("Spatial")
+        arcpy.sa.Times(arcpy.sa.SetNull(raster, raster, condition), float(scale_factor)).save(out_raster)
+
+    def qa_setnull_times(self, raster, out_raster, qa_raster, qa_rule, condition=None, scale_factor=None):
+        # ֶBitwiseRightShiftBitwiseAndInList룬ΪաΪһͼʽ
+        arcpy.CheckOutExtension("Spatial")
+        qa = arcpy.Raster(qa_raster)
+        invalid = None
+        for low, count, allowed in parse_qa_rule(qa_rule):
+            value = arcpy.sa.BitwiseAnd(arcpy.sa.BitwiseRightShift(qa, low), (1 << count) - 1)
+            bad = ~arcpy.sa.InList(value, sorted(allowed))
+            invalid = bad if invalid is None else invalid | bad
+        result = arcpy.sa.SetNull(raster, raster, condition) if condition else arcpy.Raster(raster)
+        if not is_unit_scale(scale_factor):
+            result = arcpy.sa.Times(result, float(scale_factor))
+        arcpy.sa.SetNull(invalid, result).save(out_raster)
+
+    def composite(self, rasters, out_raster, reducer, condition=None):
+        arcpy.CheckOutExtension("Spatial")
+        inputs = [arcpy.sa.SetNull(r, r, condition) if condition else arcpy.Raster(r) for r in rasters]
+        if reducer == "COUNT":
+            result = arcpy.sa.CellStatistics([arcpy.sa.Con(arcpy.sa.IsNull(r), 0, 1) for r in inputs], "SUM")
+        else:
+            statistic = {"MAX": "MAXIMUM", "MEAN": "MEAN", "MEDIAN": "MEDIAN"}[reducer]
+            result = arcpy.sa.CellStatistics(inputs, statistic, "DATA")
+        result.save(out_raster)
+
+    def build_overviews(self, raster, levels, resampling="NEAREST"):
+        # arcpyĽСһ룬ıȷ
+        level_count = max(levels).bit_length() - 1
+        arcpy.BuildPyramids_management(raster, level_count, "NONE", resampling)
+
+    def to_numpy(self, raster):
+        r = arcpy.Raster(raster)
+        geotransform = (r.extent.XMin, r.meanCellWidth, 0.0, r.extent.YMax, 0.0, -r.meanCellHeight)
+        return (arcpy.RasterToNumPyArray(r), geotransform, r.spatialReference.exportToString(), r.noDataValue)
+
+    def mask_windows(self, raster, masks):
+        # դΪ׽դʹΧִתդԪڱ߽ڵԪΪTrue
+        r = arcpy.Raster(raster)
+        names = ("snapRaster", "extent", "cellSize", "outputCoordinateSystem")
+        old = dict((name, getattr(arcpy.env, name)) for name in names)
+        arcpy.env.snapRaster = arcpy.env.extent = arcpy.env.cellSize = raster
+        arcpy.env.outputCoordinateSystem = r.spatialReference
+        windows = []
+        try:
+            for mask in masks:
+                tmp = self.scratch_path("zone_" + os.path.basename(mask))
+                arcpy.PolygonToRaster_conversion(mask, arcpy.Describe(mask).OIDFieldName, tmp, "CELL_CENTER")
+                # shapefileFID0ʼNoDataתΪ-1
+                lower_left = arcpy.Point(r.extent.XMin, r.extent.YMin)
+                zones = arcpy.RasterToNumPyArray(tmp, lower_left, r.width, r.height, nodata_to_value=-1)
+                self.delete(tmp)
+                rows, cols = np.nonzero(zones >= 0)
+                if rows.size == 0:
+                    windows.append((None, None))
+                    continue
+                yoff, xoff = rows.min(), cols.min()
+                ycount, xcount = rows.max() - yoff + 1, cols.max() - xoff + 1
+                windows.append(((int(xoff), int(yoff), int(xcount), int(ycount)),
+                                zones[yoff:yoff + ycount, xoff:xoff + xcount] >= 0))
+        finally:
+            for name, value in old.items():
+                setattr(arcpy.env, name, value)
+        return windows
+
+    def scratch_path(self, name):
+        # in_memoryռеդܰ"."ַ
+        return os.path.join("in_memory", re.sub(r"\W", "_", os.path.splitext(name)[0]))
+
+    def delete(self, raster):
+        if arcpy.Exists(raster):
+            arcpy.Delete_management(raster)
+
+    def rename(self, raster, out_raster):
+        self.delete(out_raster)
+        arcpy.Rename_management(raster, out_raster)
+
+
+# GeoTIFFѹӦarcpy.env.compression
+ARCPY_COMPRESSION = {"NONE": "NONE", "LZW": "LZW", "DEFLATE": "LZ77", "ZSTD": "LZ77"}
+
+# arcpyͶӦGDAL
+GDAL_PIXEL_TYPES = {
+    "1_BIT": "Byte", "2_BIT": "Byte", "4_BIT": "Byte",
+    "8_BIT_UNSIGNED": "Byte", "8_BIT_SIGNED": "Int16",
+    "16_BIT_UNSIGNED": "UInt16", "16_BIT_SIGNED": "Int16",
+    "32_BIT_UNSIGNED": "UInt32", "32_BIT_SIGNED": "Int32",
+    "32_BIT_FLOAT": "Float32", "64_BIT": "Float64",
+}
+
+# arcpyزӦGDALز
+GDAL_RESAMPLING = {"NEAREST": "near", "BILINEAR": "bilinear", "CUBIC": "cubic", "MAJORITY": "mode"}
+
+# gdalͼͱ߽ĤļеĬϴСޣһMOD13Q1ƬͼԼΪ100MB
+CACHE_BYTES = 2 * 1024 * 1024 * 1024
+
+
+class GdalBackend(RasterBackend):
+    """
+    GDAL/NumPy棬ArcGIS
+
+    Parameters
+    ----------
+    block_size:int
+        ˡΪյԪķֿСԪĬΪ512ڴռС
+    warp_dir:str,optional
+        ڽزͶӰͼļУĬΪϵͳʱļµyfmodis_warp
+        preprocessʹùռµ.yfcache/warpΪFalseʱʹû棬ÿεgdal.Warp
+    mask_dir:str,optional
+        ü߽դ񻯽ĻļУĬΪϵͳʱļµyfmodis_masks
+        preprocessʹùռµ.yfcache/masks
+    max_cache_bytes:int,optional
+        ļиԵĴСޣֽڣдµͼĤ󳬹ʱɾδʹõģ
+        ĬΪCACHE_BYTESΪNoneʱ
+    creation_options:List[str],optional
+        GeoTIFFĴѡblocks.gtiff_optionsĬΪblocks.GTIFF_OPTIONSֿ顢ѹ
+    """
+    name = "gdal"
+
+    def __init__(self, block_size=512, warp_dir=None, mask_dir=None, creation_options=None,
+                 max_cache_bytes=CACHE_BYTES):
+        if gdal is None or np is None:
+            raise RuntimeError("GDAL/NumPy is unavailable, install the osgeo and numpy packages")
+        self.block_size = block_size
+        if warp_dir is None:
+            warp_dir = os.path.join(tempfile.gettempdir(), "yfmodis_warp")
+        self.warp_dir = warp_dir
+        if mask_dir is None:
+            mask_dir = os.path.join(tempfile.gettempdir(), "yfmodis_masks")
+        self.mask_dir = mask_dir
+        self.max_cache_bytes = max_cache_bytes
+        self.creation_options = parse_creation_options(creation_options) or list(GTIFF_OPTIONS)
+
+    def translate(self, out_raster, src, **kwargs):
+        # gdal.TranslateȷԤ
+        if not hasattr(src, "GetRasterBand"):
+            src = gdal.Open(src)
+        gdal_type = kwargs.get("outputType") or src.GetRasterBand(1).DataType
+        gdal.Translate(out_raster, src, format="GTiff",
+                       creationOptions=gdal_options(self.creation_options, gdal_type), **kwargs)
+
+    def extract_sds(self, hdf, out_tif, sds_index):
+        ds = gdal.Open(hdf)
+        sub_datasets = ds.GetSubDatasets()
+        ds = None
+        # ֻһݼhdfûݼֱת
+        src = sub_datasets[int(sds_index or 0)][0] if sub_datasets else hdf
+        self.translate(out_tif, src)
+
+    def extract_sds_multi(self, hdf, out_tifs, sds_indexes):
+        # hdfȫݼдǰִ򿪣ļͷĿ¼ֻһ
+        ds = gdal.Open(hdf)
+        try:
+            sub_datasets = ds.GetSubDatasets()
+            for out_tif, sds_index in zip(out_tifs, sds_indexes):
+                src = gdal.Open(sub_datasets[int(sds_index or 0)][0]) if sub_datasets else ds
+                self.translate(out_tif, src)
+                src = None
+        finally:
+            ds = None
+
+    def mosaic(self, rasters, out_raster, pixel_type, mosaic_method, colormap_mode):
+        # Ƭ뵽ͬһʱƫֱӺϲ
+        try:
+            gdal_mosaic(rasters, out_raster, PIXEL_DTYPES[pixel_type], mosaic_method,
+                        creation_options=self.creation_options)
+            return
+        except ValueError:
+            pass
+        # ûжʱͨVRTǶLASTVRTкݸǰݣFIRSTʱת˳
+        if mosaic_method == "FIRST":
+            rasters = list(reversed(rasters))
+        vrt = "/vsimem/%s.vrt" % os.path.basename(out_raster)
+        gdal.BuildVRT(vrt, list(rasters))
+        try:
+            self.translate(out_raster, vrt, outputType=gdal.GetDataTypeByName(GDAL_PIXEL_TYPES[pixel_type]))
+        finally:
+            gdal.Unlink(vrt)
+
+    def project_raster(self, raster, out_raster, out_coor_system, resampling_type, cell_size):
+        # ڽزʱڹͬһͼֻڵһμ
+        if resampling_type == "NEAREST" and self.warp_dir:
+            reproject_nearest(raster, out_raster, to_wkt(out_coor_system), parse_cell_size(cell_size),
+                              self.warp_dir, self.block_size, self.creation_options, self.max_cache_bytes)
+            return
+        src = gdal.Open(raster)
+        kwargs = {"dstSRS": to_wkt(out_coor_system),
+                  "resampleAlg": GDAL_RESAMPLING[resampling_type],
+                  "creationOptions": gdal_options(self.creation_options, src.GetRasterBand(1).DataType),
+                  "format": "GTiff"}
+        res = parse_cell_size(cell_size)
+        if res is not None:
+            kwargs["xRes"], kwargs["yRes"] = res
+        gdal.Warp(out_raster, src, **kwargs)
+
+    def clip_raster(self, raster, out_raster, mask):
+        failed = self.clip_multi(raster, [out_raster], [mask])
+        if failed:
+            raise ValueError(failed[out_raster])
+
+    def clip_multi(self, raster, out_rasters, masks):
+        # ߽簴դһβ棬Χ뵽ԪarcpyüĽһ
+        ds = gdal.Open(raster)
+        band = ds.GetRasterBand(1)
+        nodata = band.GetNoDataValue()
+        if nodata is None:
+            nodata = default_nodata(gdal_array.GDALTypeCodeToNumericTypeCode(band.DataType))
+        ds = None
+        return clip_by_masks(raster, out_rasters, masks, self.mask_dir, nodata, self.creation_options,
+                             self.max_cache_bytes)
+
+    def times(self, raster, out_raster, scale_factor):
+        stream_apply(raster, out_raster, times_func(scale_factor), out_dtype="float32", out_nodata=FLOAT_NODATA,
+                     block_size=self.block_size, creation_options=self.creation_options)
+
+    def setnull(self, raster, out_raster, condition):
+        nodata = band_nodata(raster)
+        stream_apply(raster, out_raster, setnull_func(compile_condition(condition), nodata), out_nodata=nodata,
+                     block_size=self.block_size, creation_options=self.creation_options)
+
+    def setnull_times(self, raster, out_raster, condition, scale_factor):
+        stream_apply(raster, out_raster, setnull_times_func(compile_condition(condition), scale_factor),
+                     out_dtype="float32", out_nodata=FLOAT_NODATA, block_size=self.block_size,
+                     creation_options=self.creation_options)
+
+    def qa_setnull_times(self, raster, out_raster, qa_raster, qa_rule, condition=None, scale_factor=None):
+        # QA밴ͬһڶȡĤΪպһηֿ
+        mask_func = compile_condition(condition) if condition else None
+        if is_unit_scale(scale_factor):
+            nodata = band_nodata(raster)
+            func = setnull_func(mask_func, nodata) if mask_func else lambda block, nodata: block
+            kwargs = {"out_nodata": nodata}
+        else:
+            func = setnull_times_func(mask_func, scale_factor) if mask_func else times_func(scale_factor)
+            kwargs = {"out_dtype": "float32", "out_nodata": FLOAT_NODATA}
+        stream_apply(raster, out_raster, func, block_size=self.block_size, creation_options=self.creation_options,
+                     qa_raster=qa_raster, qa_rule=qa_rule, **kwargs)
+
+    def composite(self, rasters, out_raster, reducer, condition=None):
+        gdal_composite(rasters, out_raster, reducer, compile_condition(condition) if condition else None,
+                       block_size=self.block_size, creation_options=self.creation_options)
+
+    def build_overviews(self, raster, levels, resampling="NEAREST"):
+        # ֻʽʱдⲿ.ovrѹդͬ
+        config = {"COMPRESS_OVERVIEW": option_value(self.creation_options, "COMPRESS"),
+                  "BIGTIFF_OVERVIEW": option_value(self.creation_options, "BIGTIFF")}
+        old = dict((key, gdal.GetConfigOption(key)) for key in config)
+        try:
+            for key, value in config.items():
+                if value:
+                    gdal.SetConfigOption(key, value)
+            ds = gdal.Open(raster)
+            ds.BuildOverviews(resampling, list(levels))
+            ds = None
+        finally:
+            for key, value in old.items():
+                gdal.SetConfigOption(key, value)
+
+    def to_numpy(self, raster):
+        array, nodata, ds = read_array(raster)
+        return array, ds.GetGeoTransform(), ds.GetProjection(), nodata
+
+    def mask_windows(self, raster, masks):
+        # üդ񻯽Ļ
+        ds = gdal.Open(raster)
+        return [load_mask(self.mask_dir, ds, mask, self.max_cache_bytes) for mask in masks]
+
+    def scratch_path(self, name):
+        return "/vsimem/yfmodis/%d/%s" % (os.getpid(), name)
+
+    def delete(self, raster):
+        if raster.startswith("/vsimem/"):
+            gdal.Unlink(raster)
+        elif os.path.exists(raster):
+            gdal.GetDriverByName("GTiff").Delete(raster)
+
+    def rename(self, raster, out_raster):
+        self.delete(out_raster)
+        gdal.GetDriverByName("GTiff").Rename(out_raster, raster)
+
+
+BACKENDS = {"arcpy": ArcpyBackend, "gdal": GdalBackend}
+
+
+def get_backend(backend=None, creation_options=None, **options):
+    """
+    ȡդ
+
+    Parameters
+    ----------
+    backend:str or RasterBackend,optional
+        ƣ"arcpy""gdal"ĬΪ"arcpy"
+        ҲֱӴʵRasterBackendӿڵĶõ
+    creation_options:str or List[str],optional
+        GeoTIFFĴѡ"COMPRESS=DEFLATE;PREDICTOR=YES"ʱƺ޸
+    options:
+        湹캯Ĳgdalblock_size
+    """
+    if backend is None:
+        backend = "arcpy"
+    if not hasattr(backend, "extract_sds"):
+        if backend not in BACKENDS:
+            raise ValueError("unknown backend %s, expected one of %s" % (backend, ", ".join(sorted(BACKENDS))))
+        if creation_options is not None:
+            options["creation_options"] = creation_options
+        return BACKENDS[backend](**options)
+    if creation_options is not None:
+        # ޸ĵ÷
+        backend = copy.copy(backend)
+        backend.creation_options = parse_creation_options(creation_options)
+    return backend
+
+
+# деʱļǰ׺find_tifsȻЩļ
+TMP_PREFIX = "_tmp_"
+
+
+def temp_path(out_raster):
+    out_dir, name = os.path.split(out_raster)
+    return os.path.join(out_dir, "%s%d_%s" % (TMP_PREFIX, os.getpid(), name))
+
+
+def call_backend(backend, op, args):
+    """
+    ķ̳ʹ
+
+    argsĵڶΪ·extract_sds_multiȶķΪ·бдͬһļµʱļ
+    ɹΪ·;¿ɵİƷ
+    سʱclip_multiդཻı߽磩ճȻ׳PartialOutputError
+    """
+    out_rasters = args[1] if isinstance(args[1], (list, tuple)) else [args[1]]
+    tmps = [temp_path(out_raster) for out_raster in out_rasters]
+    backend.setup()
+    try:
+        failed = getattr(backend, op)(args[0], tmps if isinstance(args[1], (list, tuple)) else tmps[0], *args[2:])
+        failed = failed or {}
+        for tmp, out_raster in zip(tmps, out_rasters):
+            if tmp in failed:
+                backend.delete(tmp)
+            else:
+                backend.rename(tmp, out_raster)
+    except Exception:
+        for tmp in tmps:
+            backend.delete(tmp)
+        raise
+    if failed:
+        raise PartialOutputError(dict((out_raster, failed[tmp]) for tmp, out_raster in zip(tmps, out_rasters)
+                                      if tmp in failed))
+
+
+def call_inplace(backend, op, args):
+    """
+    òդķbuild_overviews̳ʹ
+    """
+    backend.setup()
+    getattr(backend, op)(*args)
+
+
+def to_wkt(coor_system):
+    """
+    ϵ.prjļ·WKTַ"EPSG:4326"ȣתΪWKTַ
+    """
+    text = coor_system
+    if os.path.exists(text):
+        with open(text) as f:
+            text = f.read()
+    srs = osr.SpatialReference()
+    srs.SetFromUserInput(text)
+    return srs.ExportToWkt()
+
+
+def parse_cell_size(cell_size):
+    """
+    "250 250""250"ʽԪСδָʱNone
+    """
+    if cell_size is None or str(cell_size).strip() in ("", "#"):
+        return None
+    values = [float(v) for v in str(cell_size).replace(",", " ").split()]
+    if len(values) == 1:
+        values = values * 2
+    return values[0], values[1]
+
+
+def default_nodata(dtype):
+    if np.issubdtype(dtype, np.floating):
+        return FLOAT_NODATA
+    info = np.iinfo(dtype)
+    return info.min if info.min < 0 else info.max
+
+
+def band_nodata(raster):
+    """
+    صդNoDataֵûʱ͵Ĭֵdefault_nodata
+    """
+    ds = gdal.Open(raster)
+    band = ds.GetRasterBand(1)
+    nodata = band.GetNoDataValue()
+    if nodata is None:
+        nodata = default_nodata(gdal_array.GDALTypeCodeToNumericTypeCode(band.DataType))
+    return nodata
+
+
+def read_array(raster):
+    """
+    ȡդ񣬷(, NoDataֵ, ݼ)
+    """
+    ds = gdal.Open(raster)
+    band = ds.GetRasterBand(1)
+    return band.ReadAsArray(), band.GetNoDataValue(), ds
+
+
+def write_array(out_raster, array, template, nodata, creation_options=None):
+    """
+    templateĵοϢдΪGeoTIFF
+    """
+    driver = gdal.GetDriverByName("GTiff")
+    gdal_type = gdal_array.NumericTypeCodeToGDALTypeCode(array.dtype.type)
+    out = driver.Create(out_raster, template.RasterXSize, template.RasterYSize, 1, gdal_type,
+                        typed_options(creation_options, array.dtype))
+    out.SetGeoTransform(template.GetGeoTransform())
+    out.SetProjection(template.GetProjection())
+    band = out.GetRasterBand(1)
+    if nodata is not None:
+        band.SetNoDataValue(float(nodata))
+    band.WriteArray(array)
+    out.FlushCache()
+
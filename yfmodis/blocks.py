@@ -0,0 +1,234 @@
+# -- coding:cp936 C
+"""
+ֿʽ
+
+̶СĴȡդNumPyԪ㲢ֱд
+ڴռֻСйأդС޹ء
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from osgeo import gdal, gdal_array
+except ImportError:
+    gdal = None
+    gdal_array = None
+
+from yfmodis.qa import qa_invalid
+
+# arcpyһ£դʹfloat32СֵΪNoData
+FLOAT_NODATA = -3.4028234663852886e+38
+
+GTIFF_OPTIONS = ["TILED=YES"]
+
+# ֵ֧ѹZSTDҪGDAL 2.3
+COMPRESSIONS = ("NONE", "LZW", "DEFLATE", "ZSTD")
+
+BIGTIFF_MODES = ("IF_SAFER", "IF_NEEDED", "YES", "NO")
+
+
+def gtiff_options(compress=None, predictor=False, tiled=True, bigtiff=None, tile_size=None):
+    """
+    GeoTIFFĴѡ
+
+    Parameters
+    ----------
+    compress:str,optional
+        ѹCOMPRESSIONSĬϲѹ
+    predictor:bool
+        ǷʹԤդʹˮƽ֣PREDICTOR=2դʹøԤPREDICTOR=3
+        дʱtyped_optionsȷ
+    tiled:bool
+        Ƿʹڲֿ飬ĬΪTrue
+    bigtiff:str,optional
+        BIGTIFF_MODES4GBҪBigTIFFĬGDALжϣIF_NEEDED
+    tile_size:int,optional
+        ڲֿı߳ԪĬΪ256
+    """
+    options = []
+    if tiled:
+        options.append("TILED=YES")
+        if tile_size:
+            options.extend(["BLOCKXSIZE=%d" % int(tile_size), "BLOCKYSIZE=%d" % int(tile_size)])
+    compress = (compress or "NONE").upper()
+    if compress not in COMPRESSIONS:
+        raise ValueError("unknown compression %s, expected one of %s" % (compress, ", ".join(COMPRESSIONS)))
+    if compress != "NONE":
+        options.append("COMPRESS=" + compress)
+        if predictor:
+            options.append("PREDICTOR=YES")
+    if bigtiff:
+        if bigtiff.upper() not in BIGTIFF_MODES:
+            raise ValueError("unknown BIGTIFF mode %s, expected one of %s" % (bigtiff, ", ".join(BIGTIFF_MODES)))
+        options.append("BIGTIFF=" + bigtiff.upper())
+    return options
+
+
+def parse_creation_options(options):
+    """
+    "COMPRESS=DEFLATE;PREDICTOR=YES"ʽĴѡбδָʱNone
+    """
+    if not options:
+        return None
+    if hasattr(options, "split"):
+        options = options.split(";")
+    return [option.strip().upper() for option in options if option.strip()]
+
+
+def option_value(options, key, default=None):
+    # شѡkeyֵ
+    for option in options or []:
+        name, _, value = option.partition("=")
+        if name == key:
+            return value
+    return default
+
+
+def typed_options(options, dtype):
+    """
+    ȷԤPREDICTOR=YESդΪ2դΪ3
+    """
+    options = list(options or GTIFF_OPTIONS)
+    if "PREDICTOR=YES" in options:
+        floating = np.issubdtype(np.dtype(dtype), np.floating)
+        options[options.index("PREDICTOR=YES")] = "PREDICTOR=3" if floating else "PREDICTOR=2"
+    return options
+
+
+def gdal_options(options, gdal_type):
+    # ͬtyped_optionsΪGDALʹ
+    return typed_options(options, gdal_array.GDALTypeCodeToNumericTypeCode(gdal_type))
+
+
+def iter_windows(xsize, ysize, block_size=512):
+    """
+    ȵ˳򷵻ظդĴ(xoff, yoff, xcount, ycount)
+    """
+    for yoff in range(0, ysize, block_size):
+        ycount = min(block_size, ysize - yoff)
+        for xoff in range(0, xsize, block_size):
+            yield xoff, yoff, min(block_size, xsize - xoff), ycount
+
+
+def nodata_mask(array, nodata):
+    # NoDataԪĲ飬ûNoDataʱNone
+    if nodata is None:
+        return None
+    if np.isnan(nodata):
+        return np.isnan(array)
+    return array == nodata
+
+
+def stream_apply(in_raster, out_raster, func, out_dtype=None, out_nodata=None, block_size=512,
+                 creation_options=None, qa_raster=None, qa_rule=None):
+    """
+    Եդִfuncд
+
+    Parameters
+    ----------
+    in_raster:str
+        դ
+    out_raster:str
+        դ
+    func:function
+        func(block, nodata)blockΪǰڵ飬nodataΪNoDataֵͬС
+    out_dtype:str,optional
+        ͣĬͬ
+    out_nodata:float,optional
+        NoDataֵĬͬ
+    block_size:int
+        ڵı߳ԪĬΪ512
+    qa_raster:str,optional
+        ͬQA㣬ָȡqa_ruleԪдǰΪout_nodataqa.qa_invalid
+    qa_rule:str,optional
+        QA"0-1:0,1;2-5:0-11"
+    """
+    src = gdal.Open(in_raster)
+    src_band = src.GetRasterBand(1)
+    nodata = src_band.GetNoDataValue()
+    if out_dtype is None:
+        gdal_type = src_band.DataType
+    else:
+        gdal_type = gdal_array.NumericTypeCodeToGDALTypeCode(np.dtype(out_dtype).type)
+    if out_nodata is None:
+        out_nodata = nodata
+    driver = gdal.GetDriverByName("GTiff")
+    dst = driver.Create(out_raster, src.RasterXSize, src.RasterYSize, 1, gdal_type,
+                        gdal_options(creation_options, gdal_type))
+    dst.SetGeoTransform(src.GetGeoTransform())
+    dst.SetProjection(src.GetProjection())
+    dst_band = dst.GetRasterBand(1)
+    if out_nodata is not None:
+        dst_band.SetNoDataValue(float(out_nodata))
+    qa = qa_band = qa_nodata = None
+    if qa_raster is not None:
+        qa = gdal.Open(qa_raster)
+        if (qa.RasterXSize, qa.RasterYSize) != (src.RasterXSize, src.RasterYSize):
+            raise ValueError("%s and %s are not on the same grid" % (qa_raster, in_raster))
+        qa_band = qa.GetRasterBand(1)
+        qa_nodata = qa_band.GetNoDataValue()
+    for xoff, yoff, xcount, ycount in iter_windows(src.RasterXSize, src.RasterYSize, block_size):
+        block = src_band.ReadAsArray(xoff, yoff, xcount, ycount)
+        out = func(block, nodata)
+        if qa_band is not None:
+            out[qa_invalid(qa_band.ReadAsArray(xoff, yoff, xcount, ycount), qa_rule, qa_nodata)] = out_nodata
+        dst_band.WriteArray(out, xoff, yoff)
+    dst.FlushCache()
+    dst = None
+    qa = None
+    src = None
+
+
+def is_unit_scale(scale_factor):
+    # Ϊ1δָʱ˷ıԪֵ
+    return scale_factor in (None, "") or float(scale_factor) == 1.0
+
+
+def times_func(scale_factor):
+    """
+    ӣΪfloat32NoDataԪΪFLOAT_NODATA
+    """
+    scale_factor = float(scale_factor)
+
+    def func(block, nodata):
+        out = block.astype("float32")
+        out *= scale_factor
+        invalid = nodata_mask(block, nodata)
+        if invalid is not None:
+            out[invalid] = FLOAT_NODATA
+        return out
+
+    return func
+
+
+def setnull_func(mask_func, out_nodata):
+    """
+    ԪΪout_nodataͲ
+    """
+
+    def func(block, nodata):
+        block[mask_func(block)] = out_nodata
+        return block
+
+    return func
+
+
+def setnull_times_func(mask_func, scale_factor):
+    """
+    ΪӺϲΪһμ
+    """
+    scale_factor = float(scale_factor)
+
+    def func(block, nodata):
+        out = block.astype("float32")
+        out *= scale_factor
+        invalid = mask_func(block)
+        nodata_pixels = nodata_mask(block, nodata)
+        if nodata_pixels is not None:
+            invalid |= nodata_pixels
+        out[invalid] = FLOAT_NODATA
+        return out
+
+    return func
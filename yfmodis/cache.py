@@ -0,0 +1,226 @@
+# -- coding:cp936 C
+"""
+Ļ
+
+ÿļ¼һļժҪ͸òĲõ
+ʱֻмһļŻᱻ޸ӡز
+ĿϵȲֻ¼Ӱļ
+м䲽ܴСʱʹãLRU˳ɾ
+"""
+import hashlib
+import json
+import os
+import time
+
+# ժҪʱÿζֽ
+BLOCK = 1024 * 1024
+
+
+def file_digest(path):
+    """
+    ļݵsha1ժҪ
+    """
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(BLOCK)
+            if not data:
+                break
+            sha1.update(data)
+    return sha1.hexdigest()
+
+
+def replace_file(src, dst):
+    # os.replaceֻpython3дڣpython2ɾ
+    if hasattr(os, "replace"):
+        os.replace(src, dst)
+    else:
+        if os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
+def touch_file(path):
+    # ޸ʱΪʹʱ䣬ֻĹļк
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+
+def prune_dir(path, max_bytes, keep=()):
+    """
+    ʹõ˳ɾļеĻֱܴСmax_bytes
+
+    ͬ.npy.jsonļɣʹʱΪµ޸ʱ䣻
+    деʱļ.̺.npyҲɾ
+
+    Parameters
+    ----------
+    keep:tuple
+        ɾļͨǸոдĻ
+
+    Returns
+    -------
+    ɾļб
+    """
+    if max_bytes is None or not os.path.isdir(path):
+        return []
+    entries = {}
+    for name in os.listdir(path):
+        key, ext = os.path.splitext(name)
+        if ext not in (".npy", ".json") or "." in key:
+            continue
+        try:
+            stat = os.stat(os.path.join(path, name))
+        except OSError:
+            # Ѿɾ
+            continue
+        used, size, names = entries.get(key, (0, 0, []))
+        entries[key] = (max(used, stat.st_mtime), size + stat.st_size, names + [name])
+    total = sum(size for used, size, names in entries.values())
+    removed = []
+    for used, key in sorted((entry[0], key) for key, entry in entries.items() if key not in keep):
+        if total <= max_bytes:
+            break
+        used, size, names = entries[key]
+        try:
+            for name in names:
+                os.remove(os.path.join(path, name))
+        except OSError:
+            # Windowsʹãڴӳ䣩ʱɾ
+            continue
+        total -= size
+        removed.append(key)
+    return removed
+
+
+class StageCache(object):
+    """
+    
+
+    Parameters
+    ----------
+    root:str
+        ڵļУͨΪռµ.yfcache
+    max_bytes:int,optional
+        ɾܴСޣֽڣΪNoneʱɾ
+    keep_stages:tuple
+        LRUɾĲ裬Ĭֻս"scale"
+    """
+
+    def __init__(self, root, max_bytes=None, keep_stages=("scale",)):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.keep_stages = keep_stages
+        self.index_path = os.path.join(root, "index.json")
+        if not os.path.exists(root):
+            os.makedirs(root)
+        self.files = {}
+        self.entries = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                index = json.load(f)
+            self.files = index.get("files", {})
+            self.entries = index.get("entries", {})
+
+    def digest(self, path):
+        """
+        ļݵժҪļС޸ʱ䲻ʱֱʹϴμĽ
+        """
+        st = os.stat(path)
+        memo = self.files.get(path)
+        if memo is not None and memo[0] == st.st_size and memo[1] == st.st_mtime:
+            return memo[2]
+        value = file_digest(path)
+        self.files[path] = [st.st_size, st.st_mtime, value]
+        return value
+
+    def key(self, inputs, params):
+        """
+        ļͲ㻺
+
+        Parameters
+        ----------
+        inputs:List[str]
+            ļݼժҪ
+        params:tuple
+            ӰĲӡƵ
+        """
+        sha1 = hashlib.sha1()
+        for path in inputs:
+            sha1.update(self.digest(path).encode("ascii"))
+        sha1.update(repr(tuple(str(p) for p in params)).encode("utf-8"))
+        return sha1.hexdigest()
+
+    def is_fresh(self, out_path, key):
+        """
+        ļڡС¼һҼͬʱTrue
+        """
+        entry = self.entries.get(out_path)
+        if entry is None or entry["key"] != key or not os.path.exists(out_path):
+            return False
+        if os.path.getsize(out_path) != entry["size"]:
+            return False
+        entry["used"] = time.time()
+        return True
+
+    def record(self, out_path, key, stage):
+        self.entries[out_path] = {"key": key, "stage": stage, "size": os.path.getsize(out_path),
+                                  "used": time.time()}
+
+    def touch(self, paths):
+        # һȡʹʱ
+        now = time.time()
+        for path in paths:
+            if path in self.entries:
+                self.entries[path]["used"] = now
+
+    def evict(self, protect_stages=()):
+        """
+        ɾʹõмֱܴСmax_bytes
+
+        Ӧһȫɺãͬһִֶʱǰһ֮ɾɾһ
+
+        Parameters
+        ----------
+        protect_stages:tuple
+            ɾЩͨǸոɡһȡĲ裬Լ֮δִеĲ
+            ʱе
+
+        Returns
+        -------
+        ɾļб
+        """
+        if self.max_bytes is None:
+            return []
+        intermediate = [(entry["used"], path) for path, entry in self.entries.items()
+                        if entry["stage"] not in self.keep_stages]
+        total = sum(self.entries[path]["size"] for _, path in intermediate)
+        candidates = [(used, path) for used, path in intermediate if self.entries[path]["stage"] not in protect_stages]
+        removed = []
+        for _, path in sorted(candidates):
+            if total <= self.max_bytes:
+                break
+            total -= self.entries[path]["size"]
+            del self.entries[path]
+            for sidecar in sidecars(path):
+                if os.path.exists(sidecar):
+                    os.remove(sidecar)
+            removed.append(path)
+        return removed
+
+    def save(self):
+        # дʱļ滻жʱ
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"files": self.files, "entries": self.entries}, f)
+        replace_file(tmp, self.index_path)
+
+
+def sidecars(path):
+    """
+    դļ丽ļ.tfw.aux.xml.ovrȣ·
+    """
+    base = os.path.splitext(path)[0]
+    return [path, path + ".aux.xml", path + ".ovr", path + ".xml", base + ".tfw"]
@@ -0,0 +1,245 @@
+# -- coding:cp936 C
+"""
+Ŀ¼
+
+MODISļ"MOD13Q1.A2004001.h26v05.006.2015136171111.hdf"ֻڵһʱΪ
+ƷڡƬ汾collectionʱ䣬ڹռµSQLiteݿС
+Ŀ¼ͬʱ¼ļеб͸״̬ļе޸ʱûб仯ʱгеļ
+ǷѴɼ¼бжϣ繲ϵļеĿֻļĸйء
+ҲȥͬһƷںƬظļͬ汾ļdedup_granules
+"""
+import os
+import re
+import sqlite3
+import time
+
+# ļиֵĸʽʱͨΪ13λYYYYDDDHHMMSS
+_GRANULE = re.compile(r"^(?P<product>[A-Z0-9]+)\.A(?P<date>\d{7})\.h(?P<h>\d{2})v(?P<v>\d{2})"
+                      r"\.(?P<collection>\d{3})\.(?P<production>\d+)")
+
+# ļ޸ʱľȣ룩FAT32ļϵͳΪ2룻ɨʱ޸ʱֵʱʹü¼б
+MTIME_RESOLUTION = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS granules (
+    path TEXT PRIMARY KEY, product TEXT, date TEXT, tile TEXT, collection TEXT, production TEXT
+);
+CREATE INDEX IF NOT EXISTS granules_key ON granules (product, date, tile);
+CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, mtime REAL, scanned REAL);
+CREATE TABLE IF NOT EXISTS entries (dir TEXT, name TEXT, PRIMARY KEY (dir, name));
+CREATE TABLE IF NOT EXISTS artifacts (path TEXT PRIMARY KEY, stage TEXT, status TEXT, updated REAL);
+CREATE INDEX IF NOT EXISTS artifacts_stage ON artifacts (stage, status);
+"""
+
+
+def parse_granule(fname):
+    """
+    MODISļproductdate"A2004001"tile"h26v05"collection"006"
+    productionɵֵ䣬MODISԭʼļʱNone
+    """
+    match = _GRANULE.match(os.path.basename(fname))
+    if match is None:
+        return None
+    return {"product": match.group("product"), "date": "A" + match.group("date"),
+            "tile": "h%sv%s" % (match.group("h"), match.group("v")), "collection": match.group("collection"),
+            "production": match.group("production")}
+
+
+def parse_collections(collections):
+    """
+    "061;006"["061", "006"]ʽȰ汾λ汾ɵб
+    """
+    if not collections:
+        return []
+    if hasattr(collections, "split"):
+        collections = collections.replace(",", ";").split(";")
+    return ["%03d" % int(c) for c in collections if str(c).strip()]
+
+
+def dedup_granules(hdfs, collections=None, catalog=None):
+    """
+    ͬһƷںƬֻһhdf
+
+    Ȱcollectionsе˳ѡ汾еİ汾ںҽµİ汾ȣ
+    ͬһ汾ѡʱµļMODISԭʼļhdfȫ
+
+    Parameters
+    ----------
+    hdfs:List[str]
+        hdfļ
+    collections:str or List[str],optional
+        ʹõİ汾"061;006"ΪNoneʱʹµİ汾
+    catalog:Catalog,optional
+        Ŀ¼ѵǼǵļٽļ
+
+    Returns
+    -------
+    (kept, dropped)hdfԭ˳УdroppedΪ(ȥhdf, hdf)ɵб
+    """
+    preferred = parse_collections(collections)
+    known = {}
+    if catalog is not None:
+        known = dict((row["path"], row) for row in catalog.granules(paths=hdfs))
+
+    def rank(info):
+        collection = info["collection"]
+        order = preferred.index(collection) if collection in preferred else len(preferred)
+        return order, -int(collection), -int(info["production"])
+
+    keys = {}
+    best = {}
+    for hdf in hdfs:
+        info = known.get(os.path.abspath(hdf)) or parse_granule(hdf)
+        if info is None:
+            continue
+        key = keys[hdf] = (info["product"], info["date"], info["tile"])
+        if key not in best or rank(info) < best[key][0]:
+            best[key] = (rank(info), hdf)
+    kept, dropped = [], []
+    emitted = set()
+    for hdf in hdfs:
+        if hdf not in keys:
+            kept.append(hdf)
+            continue
+        winner = best[keys[hdf]][1]
+        # ظгͬһļҲֻһ
+        if hdf == winner and hdf not in emitted:
+            kept.append(hdf)
+            emitted.add(hdf)
+        else:
+            dropped.append((hdf, winner))
+    return kept, dropped
+
+
+class Catalog(object):
+    """
+    Ŀ¼
+
+    ֻʹãӽִе񲻷Ŀ¼
+
+    Parameters
+    ----------
+    path:str
+        SQLiteݿļͨΪռµ.yfcache/catalog.sqlite
+    """
+
+    def __init__(self, path):
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        self.path = path
+        # 繲ϵݿܱڵ
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self._listings = {}
+
+    def close(self):
+        self.conn.close()
+
+    def add_granules(self, paths):
+        """
+        ǼhdfļѵǼǵļٽµǼǵĸ
+        """
+        paths = [os.path.abspath(p) for p in paths]
+        known = set(row[0] for row in self.conn.execute("SELECT path FROM granules"))
+        rows = []
+        for path in paths:
+            if path in known:
+                continue
+            info = parse_granule(path)
+            if info is None:
+                continue
+            rows.append((path, info["product"], info["date"], info["tile"], info["collection"], info["production"]))
+            known.add(path)
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO granules VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def granules(self, paths=None, **where):
+        """
+        ѯѵǼǵhdfֵɵб·
+
+        Parameters
+        ----------
+        paths:List[str],optional
+            ֻеļ
+        where:
+            productdatetilecollectionɸѡgranules(product="MOD13Q1", tile="h26v05")
+        """
+        columns = ("path", "product", "date", "tile", "collection", "production")
+        for key in where:
+            if key not in columns:
+                raise ValueError("unknown granule field %s" % key)
+        sql = "SELECT %s FROM granules" % ", ".join(columns)
+        if where:
+            sql += " WHERE " + " AND ".join("%s = ?" % key for key in sorted(where))
+        rows = [dict(zip(columns, row)) for row in self.conn.execute(sql + " ORDER BY path",
+                                                                    [where[k] for k in sorted(where)])]
+        if paths is not None:
+            wanted = set(os.path.abspath(p) for p in paths)
+            rows = [row for row in rows if row["path"] in wanted]
+        return rows
+
+    def list_dir(self, directory):
+        """
+        ļеļ
+
+        ļе޸ʱϴɨʱͬϴɨ޸ʱʱʹü¼бг
+        """
+        directory = os.path.abspath(directory)
+        if not os.path.isdir(directory):
+            return []
+        mtime = os.stat(directory).st_mtime
+        row = self.conn.execute("SELECT mtime, scanned FROM dirs WHERE path = ?", (directory,)).fetchone()
+        if row is not None and row[0] == mtime and row[1] - mtime > MTIME_RESOLUTION:
+            if directory not in self._listings:
+                self._listings[directory] = set(r[0] for r in self.conn.execute(
+                    "SELECT name FROM entries WHERE dir = ?", (directory,)))
+            return sorted(self._listings[directory])
+        names = os.listdir(directory)
+        with self.conn:
+            self.conn.execute("DELETE FROM entries WHERE dir = ?", (directory,))
+            self.conn.executemany("INSERT INTO entries VALUES (?, ?)", [(directory, name) for name in names])
+            self.conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)", (directory, mtime, time.time()))
+        self._listings[directory] = set(names)
+        return sorted(names)
+
+    def exists(self, path):
+        """
+        ¼ļбжļǷ
+        """
+        directory, name = os.path.split(os.path.abspath(path))
+        if directory not in self._listings:
+            self.list_dir(directory)
+        return name in self._listings.get(directory, ())
+
+    def record(self, paths, stage, status):
+        """
+        ¼״̬"completed""skipped""errored"ļб
+        """
+        now = time.time()
+        paths = [os.path.abspath(p) for p in paths]
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?)",
+                                  [(path, stage, status, now) for path in paths])
+        for path in paths:
+            directory, name = os.path.split(path)
+            listing = self._listings.get(directory)
+            if listing is None:
+                continue
+            if status == "errored":
+                listing.discard(name)
+            else:
+                listing.add(name)
+
+    def status(self, stage=None):
+        """
+        ظ״̬{"completed": 120, "errored": 2}
+        """
+        sql = "SELECT status, COUNT(*) FROM artifacts"
+        args = ()
+        if stage is not None:
+            sql += " WHERE stage = ?"
+            args = (stage,)
+        return dict(self.conn.execute(sql + " GROUP BY status", args).fetchall())
@@ -0,0 +1,261 @@
+# -- coding:cp936 C
+"""
+
+
+ArcGIS䣬嵥JSONYAMLͲƷԤִԤ
+һļ嵥ʱԷ0״̬˳ڼȺϰݡƷֱύ
+
+    python -m yfmodis manifest.json --workers 8
+    python -m yfmodis manifest.yaml --job 2004_ndvi --job 2005_ndvi
+
+ҵָqueueļϵͳϵ.sqliteʱڷ鷢УڵԹ̼룺
+
+    python -m yfmodis --worker /share/modis/queue.sqlite --workers 8
+
+嵥ʽ::
+
+    {
+      "defaults": {"backend": "gdal", "out_coor_system": "EPSG:4326", "cell_size": "0.0025",
+                   "masks": ["masks/henan.shp"]},
+      "jobs": [
+        {"name": "2004_ndvi", "preset": "MOD13_NDVI", "workspace": "out/2004",
+         "hdfs": ["hdf/2004/MOD13Q1.*.hdf"]},
+        {"name": "2004_et", "preset": "MOD16_ET", "workspace": "out/2004_et",
+         "hdfs": ["hdf/2004/MOD16A2.*.hdf"], "fused": true}
+      ]
+    }
+
+jobsеÿһdefaultsϲpresetݼ͡ӺɸѡĬֵ
+preprocessĲѡеĲͬoptions.split_optionsworkerscache_sizeqa_rule
+hdfsmasksʹͨ·嵥ڵļС
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import traceback
+
+from yfmodis.options import split_options
+from yfmodis.parallel import cpu_count
+from yfmodis.presets import PRESETS, get_preset
+from yfmodis.report import RunReport
+from yfmodis.workqueue import LEASE_SECONDS, WorkQueue, exit_on_sigterm, work_processes, worker_name
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+try:
+    import yfMODISTool
+except ImportError:
+    # ڹڵļʱ
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import yfMODISTool
+
+# 嵥пָĲsplit_optionsΪpreprocessĲѡ
+JOB_KEYS = ("workspace", "hdfs", "masks", "out_coor_system", "cell_size", "sds_index", "sds_name", "pixel_type",
+            "mosaic_method", "colormap_mode", "pr_prefix", "resampling_type", "sn_prefix", "condition",
+            "scale_prefix", "scale_factor", "workers", "backend", "fused", "keep_intermediate", "cache",
+            "cache_size", "layers", "tile_filter", "streaming", "report", "profile", "use_metadata",
+            "cube", "composite", "composite_period", "creation_options", "overviews", "catalog",
+            "dedup", "collections", "queue", "zonal", "qa", "qa_sds_index", "qa_rule", "qa_pixel_type",
+            "native_mosaic")
+
+REQUIRED_KEYS = ("workspace", "hdfs", "masks", "out_coor_system")
+
+# 嵥ļн·zonalΪtrueʱ·
+PATH_KEYS = ("workspace", "report", "profile", "queue", "zonal")
+
+
+class ManifestError(ValueError):
+    pass
+
+
+def load_manifest(path):
+    """
+    ȡ嵥ҵɵбÿҵnamepresetJOB_KEYSеĲ
+    """
+    with open(path) as f:
+        text = f.read()
+    if path.lower().endswith((".yaml", ".yml")):
+        if yaml is None:
+            raise ManifestError("PyYAML is required to read %s" % path)
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+    if isinstance(data, list):
+        data = {"jobs": data}
+    if not isinstance(data, dict) or not data.get("jobs"):
+        raise ManifestError("%s does not contain any jobs" % path)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    defaults = data.get("defaults") or {}
+    jobs = []
+    for i, entry in enumerate(data["jobs"]):
+        job = dict(defaults)
+        job.update(entry)
+        job.setdefault("name", str(i))
+        jobs.append(resolve_job(job, base_dir))
+    return jobs
+
+
+def resolve_job(job, base_dir):
+    """
+    ҵϲԤ貢չhdfsmasksеͨ
+    """
+    name = job["name"]
+    preset = job.get("preset", "custom")
+    if preset not in PRESETS:
+        raise ManifestError("job %s: unknown preset %s, expected one of %s" % (name, preset,
+                                                                               ", ".join(sorted(PRESETS))))
+    unknown = sorted(set(job) - set(JOB_KEYS) - {"name", "preset"})
+    if unknown:
+        raise ManifestError("job %s: unknown keys %s" % (name, ", ".join(unknown)))
+    params = get_preset(preset).defaults()
+    # "qa": trueʹԤQAݼ͹嵥еqa_*
+    if job.get("qa"):
+        params.update(get_preset(preset).qa_defaults())
+    params.update((k, v) for k, v in job.items() if k in JOB_KEYS)
+    if params.pop("qa", None) and not params.get("qa_rule"):
+        raise ManifestError("job %s: preset %s has no QA rule, set qa_sds_index and qa_rule" % (name, preset))
+    missing = [k for k in REQUIRED_KEYS if not params.get(k)]
+    if missing:
+        raise ManifestError("job %s: missing %s" % (name, ", ".join(missing)))
+    for key in PATH_KEYS:
+        if params.get(key) and hasattr(params[key], "split"):
+            params[key] = os.path.join(base_dir, params[key])
+    for key in ("hdfs", "masks"):
+        patterns = params[key]
+        if hasattr(patterns, "split"):
+            patterns = patterns.split(";")
+        paths = []
+        for pattern in patterns:
+            matched = sorted(glob.glob(os.path.join(base_dir, pattern)))
+            if not matched:
+                raise ManifestError("job %s: %s does not match any file" % (name, pattern))
+            paths.extend(matched)
+        params[key] = paths
+    return {"name": name, "preset": preset, "params": params}
+
+
+def run_job(job, workers=None, backend=None):
+    """
+    ִһҵسļҵ׳쳣ʱNone
+    """
+    params = dict(job["params"])
+    if workers is not None:
+        params["workers"] = workers
+    if backend is not None:
+        params["backend"] = backend
+    report = RunReport(params.pop("report", None))
+    preset = get_preset(job["preset"])
+    try:
+        # 嵥еĹռвڵļУ"out/2004"
+        if not os.path.exists(params["workspace"]):
+            os.makedirs(params["workspace"])
+        yfMODISTool.preprocess(report=report, stages=preset.stages, **split_options(params))
+    except Exception:
+        yfMODISTool.add_message(traceback.format_exc())
+        return None
+    finally:
+        if report.path:
+            report.save()
+    return sum(1 for f in report.files if f["status"] == "errored")
+
+
+def select_jobs(jobs, names):
+    # ƻѡҵ
+    if not names:
+        return jobs
+    selected = []
+    for name in names:
+        matched = [job for i, job in enumerate(jobs) if name in (job["name"], str(i))]
+        if not matched:
+            raise ManifestError("no job named %s" % name)
+        selected.extend(matched)
+    return selected
+
+
+def run_worker(path, workers=None, lease_seconds=LEASE_SECONDS, wait=False):
+    """
+    workersִже񣬶еȫwaitΪTrueʱ󷵻0
+    """
+    if workers is None:
+        workers = 1
+    yfMODISTool.add_message("Joining work queue %s as %s with %d workers" % (
+        path, worker_name(), workers or cpu_count()))
+    s = time.time()
+    exit_on_sigterm()
+    processes = work_processes(path, workers, lease_seconds, wait=wait)
+    try:
+        for process in processes:
+            process.join()
+    finally:
+        # ʱͬʱ̣ǷеԼ˳
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+                process.join()
+    queue = WorkQueue(path, lease_seconds)
+    counts = queue.counts()
+    queue.close()
+    yfMODISTool.add_message("Workers exited after %.2fs, queue status: %s" % (
+        time.time() - s, ", ".join("%d %s" % (n, k) for k, n in sorted(counts.items()))))
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m yfmodis",
+                                     description="Run MODIS preprocessing jobs from a JSON or YAML manifest.")
+    parser.add_argument("manifest", nargs="?", help="path of the .json/.yaml manifest")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for every job, overrides the manifest, 0 uses all CPU cores")
+    parser.add_argument("--backend", choices=["arcpy", "gdal"], default=None,
+                        help="raster backend for every job, overrides the manifest")
+    parser.add_argument("--job", action="append", dest="jobs", metavar="NAME",
+                        help="only run the job with this name or index, can be repeated")
+    parser.add_argument("--dry-run", action="store_true", help="list the jobs and their inputs without running them")
+    parser.add_argument("--worker", metavar="QUEUE",
+                        help="instead of running a manifest, lease date groups from this shared work queue")
+    parser.add_argument("--lease", type=float, default=LEASE_SECONDS,
+                        help="lease duration in seconds for --worker, default %(default)s")
+    parser.add_argument("--wait", action="store_true",
+                        help="with --worker, keep waiting for new work instead of exiting when the queue is empty")
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        return run_worker(args.worker, args.workers, args.lease, args.wait)
+    if not args.manifest:
+        parser.error("a manifest or --worker is required")
+
+    try:
+        jobs = select_jobs(load_manifest(args.manifest), args.jobs)
+    except (IOError, OSError, ValueError) as err:
+        sys.stderr.write("error: %s\n" % err)
+        return 2
+
+    failed = []
+    for i, job in enumerate(jobs, 1):
+        params = job["params"]
+        yfMODISTool.add_message("Job %d/%d | %s: %s, %d hdf files, %d masks -> %s" % (
+            i, len(jobs), job["name"], job["preset"], len(params["hdfs"]), len(params["masks"]),
+            params["workspace"]))
+        if args.dry_run:
+            continue
+        s = time.time()
+        errored = run_job(job, workers=args.workers, backend=args.backend)
+        if errored is None:
+            failed.append(job["name"])
+            yfMODISTool.add_message("Job %s failed" % job["name"])
+        elif errored:
+            failed.append(job["name"])
+            yfMODISTool.add_message("Job %s finished with %d errored files in %.2fs" % (job["name"], errored,
+                                                                                       time.time() - s))
+        else:
+            yfMODISTool.add_message("Job %s finished in %.2fs" % (job["name"], time.time() - s))
+    if failed:
+        yfMODISTool.add_message("%d of %d jobs failed: %s" % (len(failed), len(jobs), ", ".join(failed)))
+        return 1
+    return 0
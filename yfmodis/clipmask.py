@@ -0,0 +1,192 @@
+# -- coding:cp936 C
+"""
+ü߽դ񻯻
+
+ͬһդͬһÿֻ߽դһΣ¼߽ڸеĴںʹڵĲĤ
+֮ÿդֻȡһΣƬѱ߽ԪΪNoDataɵõȫ߽Ĳü
+"""
+import hashlib
+import json
+import math
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from osgeo import gdal, ogr, osr
+except ImportError:
+    gdal = None
+    ogr = None
+    osr = None
+
+from yfmodis.blocks import gdal_options
+from yfmodis.cache import prune_dir, replace_file, touch_file
+
+
+def mask_key(ds, mask):
+    """
+    ɸͱ߽ļ·С޸ʱ䣩㻺
+    """
+    stats = []
+    base = os.path.splitext(mask)[0]
+    for path in (mask, base + ".prj"):
+        if os.path.exists(path):
+            st = os.stat(path)
+            stats.append((os.path.abspath(path), st.st_size, st.st_mtime))
+    params = (ds.RasterXSize, ds.RasterYSize, tuple(ds.GetGeoTransform()), ds.GetProjection(), stats)
+    return hashlib.sha1(repr(params).encode("utf-8")).hexdigest()
+
+
+def mask_window(ds, mask):
+    """
+    ߽ڸеĴڲդ
+
+    Ϊ߽뵽ԪķΧԪڱ߽ڵԪΪTrue
+
+    Returns
+    -------
+    (window, inside)windowΪ(xoff, yoff, xcount, ycount)insideΪڴСĲ飻
+    ཻ߽ʱwindowΪNone
+    """
+    gt = ds.GetGeoTransform()
+    srs = osr.SpatialReference()
+    srs.ImportFromWkt(ds.GetProjection())
+    if hasattr(srs, "SetAxisMappingStrategy"):
+        srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+    source = ogr.Open(mask)
+    layer = source.GetLayer(0)
+    layer_srs = layer.GetSpatialRef()
+    transform = None
+    if layer_srs is not None and not layer_srs.IsSame(srs):
+        if hasattr(layer_srs, "SetAxisMappingStrategy"):
+            layer_srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+        transform = osr.CoordinateTransformation(layer_srs, srs)
+
+    # ߽תϵдڴͼ㣬μդ񻯹
+    mem = ogr.GetDriverByName("Memory").CreateDataSource("")
+    mem_layer = mem.CreateLayer("mask", srs, ogr.wkbMultiPolygon)
+    min_x, max_x, min_y, max_y = None, None, None, None
+    for feature in layer:
+        geometry = feature.GetGeometryRef()
+        if geometry is None:
+            continue
+        geometry = geometry.Clone()
+        if transform is not None:
+            geometry.Transform(transform)
+        env = geometry.GetEnvelope()
+        min_x = env[0] if min_x is None else min(min_x, env[0])
+        max_x = env[1] if max_x is None else max(max_x, env[1])
+        min_y = env[2] if min_y is None else min(min_y, env[2])
+        max_y = env[3] if max_y is None else max(max_y, env[3])
+        out_feature = ogr.Feature(mem_layer.GetLayerDefn())
+        out_feature.SetGeometry(geometry)
+        mem_layer.CreateFeature(out_feature)
+    source = None
+    if min_x is None:
+        return None, None
+
+    xoff = max(int(math.floor((min_x - gt[0]) / gt[1])), 0)
+    xend = min(int(math.ceil((max_x - gt[0]) / gt[1])), ds.RasterXSize)
+    yoff = max(int(math.floor((max_y - gt[3]) / gt[5])), 0)
+    yend = min(int(math.ceil((min_y - gt[3]) / gt[5])), ds.RasterYSize)
+    if xend <= xoff or yend <= yoff:
+        return None, None
+
+    target = gdal.GetDriverByName("MEM").Create("", xend - xoff, yend - yoff, 1, gdal.GDT_Byte)
+    target.SetGeoTransform((gt[0] + xoff * gt[1], gt[1], 0.0, gt[3] + yoff * gt[5], 0.0, gt[5]))
+    target.SetProjection(ds.GetProjection())
+    gdal.RasterizeLayer(target, [1], mem_layer, burn_values=[1])
+    inside = target.GetRasterBand(1).ReadAsArray().astype(bool)
+    target = None
+    mem = None
+    return (xoff, yoff, xend - xoff, yend - yoff), inside
+
+
+def load_mask(mask_dir, ds, mask, max_bytes=None):
+    """
+    ȡĴںĤʱ㲢棬ļгmax_bytesֽڣʱɾδʹõĤ
+    """
+    key = mask_key(ds, mask)
+    inside_path = os.path.join(mask_dir, key + ".npy")
+    meta_path = os.path.join(mask_dir, key + ".json")
+    if not os.path.exists(meta_path):
+        if not os.path.exists(mask_dir):
+            try:
+                os.makedirs(mask_dir)
+            except OSError:
+                # Ѿ
+                pass
+        window, inside = mask_window(ds, mask)
+        tmp = "%s.%d" % (key, os.getpid())
+        if window is not None:
+            with open(os.path.join(mask_dir, tmp + ".npy"), "wb") as f:
+                np.save(f, inside)
+            replace_file(os.path.join(mask_dir, tmp + ".npy"), inside_path)
+        with open(os.path.join(mask_dir, tmp + ".json"), "w") as f:
+            json.dump({"window": window}, f)
+        replace_file(os.path.join(mask_dir, tmp + ".json"), meta_path)
+        prune_dir(mask_dir, max_bytes, keep=(key,))
+    else:
+        touch_file(meta_path)
+    with open(meta_path) as f:
+        window = json.load(f)["window"]
+    if window is None:
+        return None, None
+    return window, np.load(inside_path)
+
+
+def clip_by_masks(raster, out_rasters, masks, mask_dir, nodata, creation_options=None, max_bytes=None):
+    """
+    ȡһդ񣬰ÿ߽ĴƬд
+
+    Parameters
+    ----------
+    raster:str
+        դ
+    out_rasters:List[str]
+        masksһһӦդ
+    masks:List[str]
+        ü߽磨ʸļ
+    mask_dir:str
+        դ񻯽Ļļ
+    nodata:float
+        ûNoDataʱ߽ԪʹõֵNoDataʱʹNoData
+    max_bytes:int,optional
+        ļеĴСޣֽڣΪNoneʱ
+
+    Returns
+    -------
+    dictդཻı߽粻дΪӦֵΪϢ߽ճд
+    """
+    ds = gdal.Open(raster)
+    band = ds.GetRasterBand(1)
+    if band.GetNoDataValue() is not None:
+        nodata = band.GetNoDataValue()
+    gt = ds.GetGeoTransform()
+    windows = [load_mask(mask_dir, ds, mask, max_bytes) for mask in masks]
+    failed = dict((out_raster, "mask %s does not overlap raster %s" % (mask, raster))
+                  for out_raster, mask, (window, inside) in zip(out_rasters, masks, windows) if window is None)
+    if len(failed) == len(out_rasters):
+        return failed
+    array = band.ReadAsArray()
+    driver = gdal.GetDriverByName("GTiff")
+    for out_raster, mask, (window, inside) in zip(out_rasters, masks, windows):
+        if window is None:
+            continue
+        xoff, yoff, xcount, ycount = window
+        block = array[yoff:yoff + ycount, xoff:xoff + xcount].copy()
+        block[~inside] = nodata
+        out = driver.Create(out_raster, xcount, ycount, 1, band.DataType,
+                            gdal_options(creation_options, band.DataType))
+        out.SetGeoTransform((gt[0] + xoff * gt[1], gt[1], 0.0, gt[3] + yoff * gt[5], 0.0, gt[5]))
+        out.SetProjection(ds.GetProjection())
+        out_band = out.GetRasterBand(1)
+        out_band.SetNoDataValue(float(nodata))
+        out_band.WriteArray(block)
+        out.FlushCache()
+        out = None
+    ds = None
+    return failed
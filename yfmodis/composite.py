@@ -0,0 +1,179 @@
+# -- coding:cp936 C
+"""
+ʱϳ
+
+ļеڽսΪ¡꣬ÿʱεդֵƽֵֵЧֵ
+ÿֻȡڵͬһڣֵƽֵ͸ֻһڵۼӽ
+ֵҪͬʱʱڸڵһڣڴռդС޹ء
+"""
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from osgeo import gdal
+except ImportError:
+    gdal = None
+
+from yfmodis.blocks import FLOAT_NODATA, gdal_options, iter_windows, nodata_mask
+from yfmodis.cube import parse_date
+from yfmodis.mosaic import merge_array
+
+# ϳɷMAXMEANʹǶMAXIMUMMEAN
+REDUCERS = ("MAX", "MEAN", "MEDIAN", "COUNT")
+
+MOSAIC_OPERATORS = {"MAX": "MAXIMUM", "MEAN": "MEAN"}
+
+PERIODS = ("month", "season", "year")
+
+# 󼾽ڣ12¼һĶ
+SEASONS = {12: "DJF", 1: "DJF", 2: "DJF", 3: "MAM", 4: "MAM", 5: "MAM", 6: "JJA", 7: "JJA", 8: "JJA",
+           9: "SON", 10: "SON", 11: "SON"}
+
+
+def period_label(date, period="month"):
+    """
+    ʱεƣmonthΪ"M200401"seasonΪ"S2004MAM"yearΪ"Y2004"
+    """
+    if period == "month":
+        return "M%04d%02d" % (date.year, date.month)
+    if period == "season":
+        return "S%04d%s" % (date.year + (1 if date.month == 12 else 0), SEASONS[date.month])
+    if period == "year":
+        return "Y%04d" % date.year
+    raise ValueError("unknown period %s, expected one of %s" % (period, ", ".join(PERIODS)))
+
+
+def parse_reducers(reducers):
+    """
+    "MAX;MEAN"["max", "mean"]ʽĺϳɷδָʱؿб
+    """
+    if not reducers:
+        return []
+    if hasattr(reducers, "split"):
+        reducers = reducers.replace(",", ";").split(";")
+    result = []
+    for reducer in reducers:
+        reducer = reducer.strip().upper()
+        if not reducer:
+            continue
+        if reducer not in REDUCERS:
+            raise ValueError("unknown composite reducer %s, expected one of %s" % (reducer, ", ".join(REDUCERS)))
+        if reducer not in result:
+            result.append(reducer)
+    return result
+
+
+def composite_groups(rasters, period="month"):
+    """
+    ʱζդ
+
+    ļΪ"߽_Ʒ.A2004001.ݼ.tif"ͬһ߽硢Ʒݼդڵʱη飬
+    {(֮ǰĲ, ʱ, ݼ): [դ, ...]}ûڵļ
+    """
+    groups = {}
+    for raster in sorted(rasters):
+        date = parse_date(raster)
+        if date is None:
+            continue
+        parts = os.path.basename(raster).split(".")
+        key = (".".join(parts[:-3]), period_label(date, period), parts[-2])
+        groups.setdefault(key, []).append(raster)
+    return groups
+
+
+def composite_name(head, label, layer, reducer):
+    # ϳɽļ"henan_MOD13Q1.M200401.max.NDVI.tif"ݼڵڶ
+    return "{0}.{1}.{2}.{3}.tif".format(head, label, reducer.lower(), layer)
+
+
+def valid_pixels(block, nodata, mask_func=None):
+    # NoDataҲΪԪ
+    invalid = nodata_mask(block, nodata)
+    if mask_func is not None:
+        excluded = mask_func(block)
+        invalid = excluded if invalid is None else invalid | excluded
+    return np.ones(block.shape, dtype=bool) if invalid is None else ~invalid
+
+
+def reduce_blocks(blocks, reducer, mask_func=None):
+    """
+    ϳͬһڸڵ
+
+    Parameters
+    ----------
+    blocks:iterable
+        (, NoDataֵ)ɵĿɵMAXMEANCOUNTȡͬʱȫ
+    reducer:str
+        ϳɷREDUCERS
+    mask_func:function,optional
+        condition.compile_conditionķֵԪϳ
+
+    Returns
+    -------
+    COUNTuint16飬෵float32飬ûЧֵԪΪFLOAT_NODATA
+    """
+    if reducer == "MEDIAN":
+        stack = []
+        for block, nodata in blocks:
+            values = block.astype("float32")
+            values[~valid_pixels(block, nodata, mask_func)] = np.nan
+            stack.append(values)
+        stack = np.stack(stack)
+        has_value = (~np.isnan(stack)).any(axis=0)
+        out = np.full(stack.shape[1:], FLOAT_NODATA, dtype="float32")
+        # ֻЧֵԪֵȫΪNaNľ
+        out[has_value] = np.nanmedian(stack[:, has_value], axis=0)
+        return out
+    out, count = None, None
+    for block, nodata in blocks:
+        valid = valid_pixels(block, nodata, mask_func)
+        if count is None:
+            count = np.zeros(block.shape, dtype="uint16")
+            out = np.zeros(block.shape, dtype="float64")
+        if reducer == "COUNT":
+            count += valid
+        else:
+            merge_array(out, count, block, valid, MOSAIC_OPERATORS[reducer])
+    if reducer == "COUNT":
+        return count
+    if reducer == "MEAN":
+        np.divide(out, count, out=out, where=count > 0)
+    out = out.astype("float32")
+    out[count == 0] = FLOAT_NODATA
+    return out
+
+
+def gdal_composite(rasters, out_raster, reducer, mask_func=None, block_size=512, creation_options=None):
+    """
+    ϳɷΧͬĵդĵοһդͬ
+
+    Raises
+    ------
+    ValueError
+        դͬʱ
+    """
+    datasets = [gdal.Open(raster) for raster in rasters]
+    xsize, ysize = datasets[0].RasterXSize, datasets[0].RasterYSize
+    for raster, ds in zip(rasters, datasets):
+        if (ds.RasterXSize, ds.RasterYSize) != (xsize, ysize):
+            raise ValueError("%s does not share the extent of %s" % (raster, rasters[0]))
+    bands = [ds.GetRasterBand(1) for ds in datasets]
+    nodatas = [band.GetNoDataValue() for band in bands]
+    gdal_type = gdal.GDT_UInt16 if reducer == "COUNT" else gdal.GDT_Float32
+    out = gdal.GetDriverByName("GTiff").Create(out_raster, xsize, ysize, 1, gdal_type,
+                                               gdal_options(creation_options, gdal_type))
+    out.SetGeoTransform(datasets[0].GetGeoTransform())
+    out.SetProjection(datasets[0].GetProjection())
+    out_band = out.GetRasterBand(1)
+    if reducer != "COUNT":
+        out_band.SetNoDataValue(FLOAT_NODATA)
+    for xoff, yoff, xcount, ycount in iter_windows(xsize, ysize, block_size):
+        blocks = ((band.ReadAsArray(xoff, yoff, xcount, ycount), nodata) for band, nodata in zip(bands, nodatas))
+        out_band.WriteArray(reduce_blocks(blocks, reducer, mask_func), xoff, yoff)
+    out.FlushCache()
+    out = None
+    datasets = None
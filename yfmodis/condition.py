@@ -0,0 +1,205 @@
+# -- coding:cp936 C
+"""
+ΪʽĽ
+
+"VALUE > 32700"ɶNumPyĺᱻ棬
+ͬһֻһΡֵ֧﷨ؼֲִСд
+
+    VALUE > 32700                  Ƚϣ>  >=  <  <=  =  ==  !=  <>
+    32700 < VALUE                  Ҳд
+    VALUE IN (32761, 32762, 32767) ֵбҲд NOT IN
+    VALUE BETWEEN 32761 AND 32767  䣬Ҳд NOT BETWEEN
+    VALUE < 0 OR VALUE > 10000     ANDORNOTԼţҲд &|
+"""
+import re
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_TOKEN = re.compile(r"\s*(?:(?P<number>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|"
+                    r"(?P<op>>=|<=|<>|!=|==|=|>|<)|"
+                    r"(?P<punct>[(),&|])|"
+                    r"(?P<word>[A-Za-z_]+))")
+
+_COMPARE = {
+    ">": lambda a, v: a > v,
+    ">=": lambda a, v: a >= v,
+    "<": lambda a, v: a < v,
+    "<=": lambda a, v: a <= v,
+    "=": lambda a, v: a == v,
+    "==": lambda a, v: a == v,
+    "!=": lambda a, v: a != v,
+    "<>": lambda a, v: a != v,
+}
+
+# дʱȽϷ
+_FLIP = {">": "<", ">=": "<=", "<": ">", "<=": ">=", "=": "=", "==": "==", "!=": "!=", "<>": "<>"}
+
+_cache = {}
+
+
+def tokenize(condition):
+    """
+    ʽΪ(, ֵ)ɵбΪnumberoppunctword
+    """
+    tokens = []
+    pos = 0
+    text = condition.rstrip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if match is None:
+            raise ValueError("invalid condition %r: unexpected character at position %d" % (condition, pos))
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "word":
+            value = value.upper()
+        elif kind == "number":
+            value = float(value)
+        tokens.append((kind, value))
+        pos = match.end()
+    return tokens
+
+
+class _Parser(object):
+    # ݹ½ÿparse_*һ mask(array) -> bool array ĺ
+
+    def __init__(self, condition):
+        self.condition = condition
+        self.tokens = tokenize(condition)
+        self.pos = 0
+
+    def error(self, msg):
+        return ValueError("invalid condition %r: %s" % (self.condition, msg))
+
+    def peek(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return None, None
+
+    def next(self):
+        token = self.peek()
+        if token[0] is None:
+            raise self.error("unexpected end of expression")
+        self.pos += 1
+        return token
+
+    def accept(self, *values):
+        kind, value = self.peek()
+        if kind in ("word", "punct") and value in values:
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, *values):
+        if not self.accept(*values):
+            raise self.error("expected %s" % " or ".join(values))
+
+    def number(self):
+        kind, value = self.next()
+        if kind != "number":
+            raise self.error("expected a number, got %r" % (value,))
+        return value
+
+    def parse(self):
+        func = self.parse_or()
+        if self.peek()[0] is not None:
+            raise self.error("unexpected %r" % (self.peek()[1],))
+        return func
+
+    def parse_or(self):
+        funcs = [self.parse_and()]
+        while self.accept("OR", "|"):
+            funcs.append(self.parse_and())
+        if len(funcs) == 1:
+            return funcs[0]
+        return lambda a: np.logical_or.reduce([f(a) for f in funcs])
+
+    def parse_and(self):
+        funcs = [self.parse_not()]
+        while self.accept("AND", "&"):
+            funcs.append(self.parse_not())
+        if len(funcs) == 1:
+            return funcs[0]
+        return lambda a: np.logical_and.reduce([f(a) for f in funcs])
+
+    def parse_not(self):
+        if self.accept("NOT"):
+            func = self.parse_not()
+            return lambda a: ~func(a)
+        return self.parse_term()
+
+    def parse_term(self):
+        if self.accept("("):
+            func = self.parse_or()
+            self.expect(")")
+            return func
+        kind, value = self.next()
+        if kind == "number":
+            op_kind, op = self.next()
+            if op_kind != "op":
+                raise self.error("expected a comparison operator after %r" % (value,))
+            self.expect("VALUE")
+            return self.compare(_FLIP[op], value)
+        if kind != "word" or value != "VALUE":
+            raise self.error("expected VALUE, got %r" % (value,))
+        negate = self.accept("NOT")
+        if self.accept("IN"):
+            values = self.number_list()
+            func = lambda a: np.isin(a, values)
+        elif self.accept("BETWEEN"):
+            low = self.number()
+            self.expect("AND")
+            high = self.number()
+            func = lambda a: (a >= low) & (a <= high)
+        elif negate:
+            raise self.error("expected IN or BETWEEN after NOT")
+        else:
+            op_kind, op = self.next()
+            if op_kind != "op":
+                raise self.error("expected a comparison operator after VALUE")
+            return self.compare(op, self.number())
+        if negate:
+            return lambda a: ~func(a)
+        return func
+
+    def number_list(self):
+        self.expect("(")
+        values = [self.number()]
+        while self.accept(","):
+            values.append(self.number())
+        self.expect(")")
+        return np.array(values)
+
+    @staticmethod
+    def compare(op, value):
+        compare = _COMPARE[op]
+        return lambda a: compare(a, value)
+
+
+def compile_condition(condition):
+    """
+    ʽΪĤ
+
+    Parameters
+    ----------
+    condition:str
+        ʽ"VALUE > 32700""VALUE IN (32761, 32767) OR VALUE < 0"
+
+    Returns
+    -------
+    function
+        mask(array)arrayͬСĲ飬ԪΪTrue
+
+    Examples
+    ----------
+    >> mask = compile_condition("VALUE > 32700")
+    >> mask(np.array([100, 32766]))
+    array([False,  True])
+    """
+    func = _cache.get(condition)
+    if func is None:
+        func = _Parser(condition).parse()
+        _cache[condition] = func
+    return func
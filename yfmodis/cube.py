@@ -0,0 +1,281 @@
+# -- coding:cp936 C
+"""
+ʱ
+
+ͬһ߽硢ͬһƷͬһݼڽдһZarr v2ʽķֿ壨time, y, x
+εԪƷֻһ洢Сļ
+ʱļеAYYYYDDDµڿ׷ӵеС
+
+ֻNumPyzlibдzarrzarrxarrayopen_zarrֱӶȡ
+_ARRAY_DIMENSIONSԣʱĵλΪ"days since 2000-01-01"
+"""
+import datetime
+import itertools
+import json
+import os
+import re
+import shutil
+import zlib
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# ĬϵķֿС(time, y, x)ÿϳʱκͽСĿռ䷶ΧȡԪʱʱֻѹ
+DEFAULT_CHUNKS = (32, 64, 64)
+
+# ʱ
+EPOCH = datetime.date(2000, 1, 1)
+
+# ʱķֿ鳤
+TIME_CHUNK = 1024
+
+ZLIB_LEVEL = 1
+
+_DATE = re.compile(r"\.A(\d{4})(\d{3})\.")
+
+
+def parse_date(fname):
+    """
+    ļнڣ"henan_MOD13Q1.A2004017.NDVI.tif"date(2004, 1, 17)ûʱNone
+    """
+    match = _DATE.search(os.path.basename(fname))
+    if match is None:
+        return None
+    year, doy = int(match.group(1)), int(match.group(2))
+    return datetime.date(year, 1, 1) + datetime.timedelta(doy - 1)
+
+
+def _write_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def _read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _fill_json(fill_value):
+    # Zarr v2иNaNдΪ"NaN"
+    if fill_value is None:
+        return None
+    if isinstance(fill_value, float) and fill_value != fill_value:
+        return "NaN"
+    return fill_value
+
+
+class _Array(object):
+    """
+    Zarr v2ĶдΪC˳zlibѹԵĿ鰴ĿСfill_value
+    """
+
+    def __init__(self, path):
+        self.path = path
+        meta = _read_json(os.path.join(path, ".zarray"))
+        self.shape = list(meta["shape"])
+        self.chunks = list(meta["chunks"])
+        self.dtype = np.dtype(meta["dtype"])
+        fill_value = meta["fill_value"]
+        self.fill_value = float("nan") if fill_value == "NaN" else fill_value
+
+    @classmethod
+    def create(cls, path, shape, chunks, dtype, fill_value, attrs):
+        os.makedirs(path)
+        _write_json(os.path.join(path, ".zarray"), {
+            "zarr_format": 2, "shape": list(shape), "chunks": list(chunks), "dtype": np.dtype(dtype).str,
+            "compressor": {"id": "zlib", "level": ZLIB_LEVEL}, "fill_value": _fill_json(fill_value),
+            "order": "C", "filters": None})
+        _write_json(os.path.join(path, ".zattrs"), attrs)
+        return cls(path)
+
+    def resize(self, shape):
+        meta = _read_json(os.path.join(self.path, ".zarray"))
+        meta["shape"] = list(shape)
+        _write_json(os.path.join(self.path, ".zarray"), meta)
+        self.shape = list(shape)
+
+    def _chunk_path(self, index):
+        return os.path.join(self.path, ".".join(str(i) for i in index))
+
+    def read_chunk(self, index):
+        path = self._chunk_path(index)
+        if not os.path.exists(path):
+            return np.full(self.chunks, self.fill_value if self.fill_value is not None else 0, dtype=self.dtype)
+        with open(path, "rb") as f:
+            data = zlib.decompress(f.read())
+        return np.frombuffer(data, dtype=self.dtype).reshape(self.chunks).copy()
+
+    def write_chunk(self, index, chunk):
+        path = self._chunk_path(index)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(zlib.compress(np.ascontiguousarray(chunk, dtype=self.dtype).tobytes(), ZLIB_LEVEL))
+        if os.path.exists(path):
+            os.remove(path)
+        os.rename(tmp, path)
+
+    def write(self, start, data):
+        """
+        ӵһάstartʼдdatadataάȱͬ
+        """
+        ndim = len(self.shape)
+        stop = start + data.shape[0]
+        first, last = start // self.chunks[0], (stop - 1) // self.chunks[0]
+        spatial = [range((self.shape[d] + self.chunks[d] - 1) // self.chunks[d]) for d in range(1, ndim)]
+        for c0 in range(first, last + 1):
+            t0 = c0 * self.chunks[0]
+            lo, hi = max(start, t0), min(stop, t0 + self.chunks[0])
+            for rest in itertools.product(*spatial):
+                index = (c0,) + rest
+                chunk = self.read_chunk(index)
+                src = [slice(lo - start, hi - start)]
+                dst = [slice(lo - t0, hi - t0)]
+                for d, c in enumerate(rest, 1):
+                    s = c * self.chunks[d]
+                    e = min(s + self.chunks[d], self.shape[d])
+                    src.append(slice(s, e))
+                    dst.append(slice(0, e - s))
+                chunk[tuple(dst)] = data[tuple(src)]
+                self.write_chunk(index, chunk)
+
+    def read(self):
+        out = np.empty(self.shape, dtype=self.dtype)
+        counts = [(self.shape[d] + self.chunks[d] - 1) // self.chunks[d] for d in range(len(self.shape))]
+        for index in itertools.product(*[range(c) for c in counts]):
+            chunk = self.read_chunk(index)
+            dst = []
+            src = []
+            for d, c in enumerate(index):
+                s = c * self.chunks[d]
+                e = min(s + self.chunks[d], self.shape[d])
+                dst.append(slice(s, e))
+                src.append(slice(0, e - s))
+            out[tuple(dst)] = chunk[tuple(src)]
+        return out
+
+
+def check_unique(dates, path):
+    # ͬһжդʱ粻ͬǰ׺ľɽ޷ȷʹһ
+    duplicates = sorted(set(d for d in dates if dates.count(d) > 1))
+    if duplicates:
+        raise ValueError("%s has more than one raster for %s" % (path, ", ".join(str(d) for d in duplicates)))
+
+
+class TimeCube(object):
+    """
+    һ߽硢һƷһݼʱ
+
+    Parameters
+    ----------
+    path:str
+        壨Zarr洢ڵļУ"6_cube/henan_MOD13Q1_NDVI.zarr"
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(os.path.join(self.path, "data", ".zarray"))
+
+    def dates(self):
+        """
+        д
+        """
+        if not self.exists():
+            return []
+        days = _Array(os.path.join(self.path, "time")).read()
+        return [EPOCH + datetime.timedelta(int(d)) for d in days]
+
+    def create(self, shape, dtype, fill_value, geotransform, wkt, chunks=None):
+        """
+        յ壬shapeΪ(ysize, xsize)geotransformGDALͬ
+        """
+        chunks = list(chunks or DEFAULT_CHUNKS)
+        if os.path.exists(self.path):
+            shutil.rmtree(self.path)
+        os.makedirs(self.path)
+        _write_json(os.path.join(self.path, ".zgroup"), {"zarr_format": 2})
+        _write_json(os.path.join(self.path, ".zattrs"), {"geotransform": list(geotransform), "crs_wkt": wkt})
+        ysize, xsize = shape
+        _Array.create(os.path.join(self.path, "data"), (0, ysize, xsize),
+                      (chunks[0], min(chunks[1], ysize), min(chunks[2], xsize)), dtype,
+                      None if fill_value is None else fill_value.item() if hasattr(fill_value, "item") else fill_value,
+                      {"_ARRAY_DIMENSIONS": ["time", "y", "x"], "grid_mapping": "crs_wkt"})
+        _Array.create(os.path.join(self.path, "time"), (0,), (TIME_CHUNK,), "int32", None,
+                      {"_ARRAY_DIMENSIONS": ["time"], "units": "days since %s" % EPOCH.isoformat(),
+                       "calendar": "proleptic_gregorian"})
+        x0, dx, _, y0, _, dy = geotransform
+        for name, start, step, size in (("x", x0, dx, xsize), ("y", y0, dy, ysize)):
+            coords = _Array.create(os.path.join(self.path, name), (size,), (size,), "float64", None,
+                                   {"_ARRAY_DIMENSIONS": [name]})
+            coords.write(0, start + (np.arange(size) + 0.5) * step)
+
+    def append(self, items):
+        """
+        ˳׷ӣitemsΪ(date, array)ɵбѴڵڱ
+
+        Raises
+        ------
+        ValueError
+            itemsظڣеһڣС岻ͬʱ
+        """
+        check_unique([d for d, a in items], self.path)
+        existing = set(self.dates())
+        items = sorted([(d, a) for d, a in items if d not in existing], key=lambda item: item[0])
+        if not items:
+            return 0
+        if existing and items[0][0] < max(existing):
+            raise ValueError("%s is earlier than the last date in %s, rebuild the cube to insert it" % (
+                items[0][0], self.path))
+        data = _Array(os.path.join(self.path, "data"))
+        time = _Array(os.path.join(self.path, "time"))
+        start = data.shape[0]
+        for date, array in items:
+            if list(array.shape) != data.shape[1:]:
+                raise ValueError("%s has shape %s, expected %s" % (date, array.shape, tuple(data.shape[1:])))
+        # дٸ״;ʱԱԭ
+        data.shape[0] = start + len(items)
+        data.write(start, np.stack([a for d, a in items]))
+        time.shape[0] = start + len(items)
+        time.write(start, np.array([(d - EPOCH).days for d, a in items], dtype="int32"))
+        data.resize(data.shape)
+        time.resize(time.shape)
+        return len(items)
+
+
+def append_rasters(backend, cube_path, rasters, chunks=None):
+    """
+    դļе׷ӵУ岻ʱԵһդķΧ
+
+    ÿȡһʱդڴռʱСйأ޹
+
+    Raises
+    ------
+    ValueError
+        ļûڻͬһжդʱڶȡκդ֮ǰ
+    """
+    dated = [(parse_date(r), r) for r in rasters]
+    undated = [os.path.basename(r) for d, r in dated if d is None]
+    if undated:
+        raise ValueError("no AYYYYDDD date in %s" % ", ".join(undated))
+    check_unique([d for d, r in dated], cube_path)
+    cube = TimeCube(cube_path)
+    existing = set(cube.dates())
+    todo = sorted([(d, r) for d, r in dated if d not in existing], key=lambda item: item[0])
+    if not todo:
+        return 0
+    step = (chunks or DEFAULT_CHUNKS)[0]
+    if cube.exists():
+        step = _Array(os.path.join(cube_path, "data")).chunks[0]
+    added = 0
+    for i in range(0, len(todo), step):
+        items = []
+        for date, raster in todo[i:i + step]:
+            array, geotransform, wkt, nodata = backend.to_numpy(raster)
+            if not cube.exists():
+                cube.create(array.shape, array.dtype, nodata, geotransform, wkt, chunks)
+            items.append((date, array))
+        added += cube.append(items)
+    return added
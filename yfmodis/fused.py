@@ -0,0 +1,180 @@
+# -- coding:cp936 C
+"""
+ںϴڷ飬ڴȡǶͶӰüΪպţֻдս
+"""
+import os
+
+from yfmodis.backend import call_backend
+from yfmodis.blocks import is_unit_scale
+from yfmodis.parallel import PartialOutputError
+from yfmodis.presets import STAGES
+
+
+def process_group(backend, hdfs, layers, options, stage_dirs=None):
+    """
+    һڷ飨һǶ漰ȫhdf
+
+    Parameters
+    ----------
+    backend:RasterBackend
+        դ
+    hdfs:List[str]
+        ǰhdfļ
+    layers:List[dict]
+        ÿݼһΪsds_indexsuffixscale_factorconditiongroupoutputs
+        groupΪǶļ"MOD13Q1.A2004001.NDVI.tif"
+        outputsΪ(mask, clip_name, out_raster)ɵбÿü߽Ӧһ
+    options:dict
+        ݼõĲpixel_typemosaic_methodcolormap_mode
+        out_coor_systemresampling_typecell_sizepr_prefix
+        ԼѡstagesҪִеĲ裬mosaicreprojectʱò裩
+        qa_ruleΪʱlayersһΪQA㣬qa_pixel_typeǶڽͶӰ
+        üݼĤqaд
+    stage_dirs:dict,optional
+        ãΪextractmosaicreprojectclipֵΪӦļУ
+        ָмдЩļвдʱռ䲢ڴɾ
+
+    դཻı߽粻Ӱ߽磬ȫЩ߽׳PartialOutputError
+    """
+    backend.setup()
+    temps = []
+    stage_path = stage_path_func(backend, stage_dirs, temps)
+    try:
+        # ÿhdfֻһΣȡȫݼ
+        extracted = [[] for _ in layers]
+        for hdf in hdfs:
+            base_name = os.path.splitext(os.path.basename(hdf))[0]
+            out_tifs = [stage_path("extract", base_name + "." + "{0}.tif".format(layer["suffix"]))
+                        for layer in layers]
+            if len(layers) == 1:
+                backend.extract_sds(hdf, out_tifs[0], layers[0]["sds_index"])
+            else:
+                backend.extract_sds_multi(hdf, out_tifs, [layer["sds_index"] for layer in layers])
+            for tifs, out_tif in zip(extracted, out_tifs):
+                tifs.append(out_tif)
+
+        failed = process_layers(backend, layers, extracted, options, stage_path)
+    finally:
+        for path in temps:
+            backend.delete(path)
+    if failed:
+        raise PartialOutputError(failed)
+
+
+def process_extracted(backend, layers, extracted, options, stage_dirs=None):
+    """
+    һڷѾȡݼʽʱڸȫƬȡɺ
+
+    Parameters
+    ----------
+    extracted:List[List[str]]
+        layersһһӦÿΪݼȡĸƬ
+    ͬprocess_group
+    """
+    backend.setup()
+    temps = []
+    stage_path = stage_path_func(backend, stage_dirs, temps)
+    try:
+        failed = process_layers(backend, layers, extracted, options, stage_path)
+    finally:
+        for path in temps:
+            backend.delete(path)
+    if failed:
+        raise PartialOutputError(failed)
+
+
+def stage_path_func(backend, stage_dirs, temps):
+    # stage_path(stage, name)ָstage_dirsʱضӦļе·򷵻ʱ·¼temps
+    def stage_path(stage, name):
+        if stage_dirs:
+            return os.path.join(stage_dirs[stage], name)
+        path = backend.scratch_path(name)
+        temps.append(path)
+        return path
+
+    return stage_path
+
+
+def process_layers(backend, layers, extracted, options, stage_path):
+    # ȴQA㣨УδݼûдϢ
+    qa_rasters = None
+    if options.get("qa_rule"):
+        qa_rasters = process_qa(backend, layers[-1], extracted[-1], options, stage_path)
+        layers, extracted = layers[:-1], extracted[:-1]
+    failed = {}
+    for layer, tifs in zip(layers, extracted):
+        failed.update(process_layer(backend, layer, tifs, options, stage_path, qa_rasters))
+    return failed
+
+
+def mosaic_project(backend, group, extracted, options, stage_path):
+    # ǶͶӰͶӰĲֱʹһĽ
+    stages = options.get("stages") or STAGES
+    # ֻһƬʱǶ
+    if len(extracted) > 1:
+        if "mosaic" not in stages:
+            raise ValueError("%s has %d tiles but the preset skips mosaic" % (group, len(extracted)))
+        mosaicked = stage_path("mosaic", group)
+        backend.mosaic(extracted, mosaicked, options["pixel_type"], options["mosaic_method"],
+                       options["colormap_mode"])
+    else:
+        mosaicked = extracted[0]
+
+    if "reproject" in stages:
+        projected = stage_path("reproject", options["pr_prefix"] + group)
+        backend.project_raster(mosaicked, projected, options["out_coor_system"], options["resampling_type"],
+                               options["cell_size"])
+    else:
+        projected = mosaicked
+    return projected
+
+
+def process_qa(backend, layer, extracted, options, stage_path):
+    # QAλֵܲҲܰݼͽضϣ{߽: üQA}üı߽
+    qa_options = dict(options, pixel_type=options.get("qa_pixel_type") or "16_BIT_UNSIGNED",
+                      resampling_type="NEAREST")
+    projected = mosaic_project(backend, layer["group"], extracted, qa_options, stage_path)
+    masks = [mask for mask, clip_name, out_raster in layer["outputs"]]
+    clipped_rasters = [stage_path("clip", clip_name) for mask, clip_name, out_raster in layer["outputs"]]
+    failed = backend.clip_multi(projected, clipped_rasters, masks) or {}
+    return dict((mask, clipped) for mask, clipped in zip(masks, clipped_rasters) if clipped not in failed)
+
+
+def process_layer(backend, layer, extracted, options, stage_path, qa_rasters=None):
+    # һݼִǶͶӰüQAĤqa_rastersΪNoneʱΪպţ
+    # زüı߽ӦϢ
+    projected = mosaic_project(backend, layer["group"], extracted, options, stage_path)
+
+    # ͶӰֻȡһΣüȫ߽
+    outputs = layer["outputs"]
+    masks = [mask for mask, clip_name, out_raster in outputs]
+    unit_scale = is_unit_scale(layer["scale_factor"])
+    if unit_scale and not layer["condition"] and qa_rasters is None:
+        # ҪΪպʱֱӲüս
+        try:
+            call_backend(backend, "clip_multi", (projected, [o[2] for o in outputs], masks))
+        except PartialOutputError as e:
+            return e.failed
+        return {}
+    clipped_rasters = [stage_path("clip", clip_name) for mask, clip_name, out_raster in outputs]
+    clip_failed = backend.clip_multi(projected, clipped_rasters, masks) or {}
+    failed = {}
+    for clipped, (mask, clip_name, out_raster) in zip(clipped_rasters, outputs):
+        if clipped in clip_failed:
+            failed[out_raster] = clip_failed[clipped]
+            continue
+        if qa_rasters is not None and mask not in qa_rasters:
+            failed[out_raster] = "the QA layer could not be clipped by %s" % mask
+            continue
+        # սдʱļжϺ󲻻ᱻΪ
+        if qa_rasters is not None:
+            call_backend(backend, "qa_setnull_times", (clipped, out_raster, qa_rasters[mask], options["qa_rule"],
+                                                       layer["condition"], layer["scale_factor"]))
+        elif layer["condition"] and unit_scale:
+            call_backend(backend, "setnull", (clipped, out_raster, layer["condition"]))
+        elif layer["condition"]:
+            call_backend(backend, "setnull_times", (clipped, out_raster, layer["condition"],
+                                                    layer["scale_factor"]))
+        else:
+            call_backend(backend, "times", (clipped, out_raster, layer["scale_factor"]))
+    return failed
@@ -0,0 +1,176 @@
+# -- coding:cp936 C
+"""
+hdfݼ
+
+MODISÿݼ_FillValuevalid_rangescale_factorԣ
+Ʒȡһβ浽ռУֹдӺΪ
+Ϊ1ûֵݼд
+"""
+import json
+import os
+
+try:
+    from osgeo import gdal
+except ImportError:
+    gdal = None
+
+try:
+    from pyhdf.SD import SD, SDC
+except ImportError:
+    SD = None
+    SDC = None
+
+from yfmodis.cache import replace_file
+
+# ռлݼԵļ
+METADATA_FILE = "sds_metadata.json"
+
+
+def product_of(hdf):
+    # ļȡòƷ"MOD13Q1.A2004001.h26v05.006.2015.hdf"Ӧ"MOD13Q1"
+    return os.path.basename(hdf).split(".")[0]
+
+
+def _numbers(value):
+    # ֵ֡"-2000, 10000"ʽַ
+    if value is None:
+        return []
+    if hasattr(value, "split"):
+        return [float(v) for v in value.replace(",", " ").split()]
+    if isinstance(value, (list, tuple)):
+        return [float(v) for v in value]
+    return [float(value)]
+
+
+def _first(value):
+    values = _numbers(value)
+    return values[0] if values else None
+
+
+def _gdal_attributes(hdf, sds_index):
+    ds = gdal.Open(hdf)
+    subdatasets = ds.GetSubDatasets()
+    if subdatasets:
+        ds = gdal.Open(subdatasets[sds_index][0])
+    return ds.GetMetadata()
+
+
+def _pyhdf_attributes(hdf, sds_index):
+    sd = SD(hdf, SDC.READ)
+    try:
+        return sd.select(sds_index).attributes()
+    finally:
+        sd.end()
+
+
+def read_sds_metadata(hdf, sds_index):
+    """
+    ȡݼԣfill_valuevalid_rangescale_factoradd_offsetɵֵ䣬
+    ûGDALpyhdfȡʧʱNoneȱٵΪNone
+    """
+    attributes = None
+    for reader, available in ((_gdal_attributes, gdal is not None), (_pyhdf_attributes, SD is not None)):
+        if not available:
+            continue
+        try:
+            attributes = reader(hdf, sds_index)
+            break
+        except Exception:
+            continue
+    if attributes is None:
+        return None
+    valid_range = _numbers(attributes.get("valid_range"))
+    return {"fill_value": _first(attributes.get("_FillValue")),
+            "valid_range": valid_range[:2] if len(valid_range) >= 2 else None,
+            "scale_factor": _first(attributes.get("scale_factor")),
+            "add_offset": _first(attributes.get("add_offset"))}
+
+
+def effective_scale(scale_factor):
+    """
+    Ϊ˵ԭʼֵϵ
+
+    MOD13ȲƷscale_factorΪNDVIΪ10000MOD11MOD16Ϊ0.020.1
+    1ʱ
+    """
+    if scale_factor is None:
+        return None
+    scale_factor = float(scale_factor)
+    if scale_factor > 1:
+        return 1.0 / scale_factor
+    return scale_factor
+
+
+def scale_rule(scale_factor):
+    """
+    ˵scale_factor԰ǳ㣬д봦Ϣں˶ÿݼĻ
+    """
+    if scale_factor is None:
+        return "no scale_factor attribute"
+    if float(scale_factor) > 1:
+        return "scale_factor %s read as a divisor" % _format(scale_factor)
+    return "scale_factor %s read as a multiplier" % _format(scale_factor)
+
+
+def metadata_condition(metadata):
+    """
+    ЧΧֵΪյûʱNone
+    """
+    fill = metadata.get("fill_value")
+    valid_range = metadata.get("valid_range")
+    parts = []
+    if valid_range:
+        parts.append("VALUE < %s OR VALUE > %s" % (_format(valid_range[0]), _format(valid_range[1])))
+    if fill is not None and not (valid_range and (fill < valid_range[0] or fill > valid_range[1])):
+        parts.append("VALUE = %s" % _format(fill))
+    return " OR ".join(parts) or None
+
+
+def _format(value):
+    return "%d" % value if float(value).is_integer() else repr(float(value))
+
+
+def load_metadata(hdfs, sds_indexes, path=None):
+    """
+    ظƷݼԣΪ"Ʒ:""MOD13Q1:0"
+
+    ÿƷֻȡһhdfϲ浽path´ʱٴhdfȡʧܵݼ
+    """
+    metadata = {}
+    if path and os.path.exists(path):
+        with open(path) as f:
+            metadata = json.load(f)
+    first = {}
+    for hdf in hdfs:
+        first.setdefault(product_of(hdf), hdf)
+    changed = False
+    for product, hdf in sorted(first.items()):
+        for sds_index in sds_indexes:
+            key = "%s:%d" % (product, sds_index)
+            if key in metadata:
+                continue
+            values = read_sds_metadata(hdf, sds_index)
+            if values is not None:
+                metadata[key] = values
+                changed = True
+    if path and changed:
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(metadata, f, indent=2, sort_keys=True)
+        replace_file(tmp, path)
+    return metadata
+
+
+def sds_metadata(metadata, hdfs, sds_index):
+    """
+    hdfsƷsds_indexԣƷԲһ»ûжȡʱNone
+    """
+    found = None
+    for product in sorted(set(product_of(hdf) for hdf in hdfs)):
+        values = metadata.get("%s:%d" % (product, sds_index))
+        if values is None:
+            return None
+        if found is not None and values != found:
+            return None
+        found = values
+    return found
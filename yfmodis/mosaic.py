@@ -0,0 +1,204 @@
+# -- coding:cp936 C
+"""
+NumPyǶ
+
+MODISͶӰƬͬһǶֻ谴ƬϽеƫƷ飺
+һη飬ƬǶĺϲMosaicToNewRasterVRT
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from osgeo import gdal, gdal_array
+except ImportError:
+    gdal = None
+    gdal_array = None
+
+from yfmodis.blocks import nodata_mask, typed_options
+
+# ֵ֧ǶMODISƬ֮ûصBLENDMEAN
+MOSAIC_METHODS = ("FIRST", "LAST", "BLEND", "MEAN", "MINIMUM", "MAXIMUM", "SUM")
+
+# arcpyͶӦNumPy
+PIXEL_DTYPES = {
+    "1_BIT": "uint8", "2_BIT": "uint8", "4_BIT": "uint8",
+    "8_BIT_UNSIGNED": "uint8", "8_BIT_SIGNED": "int16",
+    "16_BIT_UNSIGNED": "uint16", "16_BIT_SIGNED": "int16",
+    "32_BIT_UNSIGNED": "uint32", "32_BIT_SIGNED": "int32",
+    "32_BIT_FLOAT": "float32", "64_BIT": "float64",
+}
+
+# ƫԪԪ
+ALIGN_TOLERANCE = 1e-3
+
+
+def grid_offsets(extents, cell_size):
+    """
+    Ƭеƫ
+
+    Parameters
+    ----------
+    extents:List[tuple]
+        Ƭ(x_min, y_max, xsize, ysize)
+    cell_size:tuple
+        ԪС(x, y)Ϊ
+
+    Returns
+    -------
+    (offsets, (xsize, ysize), (x_min, y_max))offsetsΪƬ(xoff, yoff)
+
+    Raises
+    ------
+    ValueError
+        Ƭûж뵽ͬһʱ
+    """
+    x_min = min(e[0] for e in extents)
+    y_max = max(e[1] for e in extents)
+    offsets = []
+    xsize, ysize = 0, 0
+    for ex, ey, ex_size, ey_size in extents:
+        fx = (ex - x_min) / cell_size[0]
+        fy = (y_max - ey) / cell_size[1]
+        xoff, yoff = int(round(fx)), int(round(fy))
+        if abs(fx - xoff) > ALIGN_TOLERANCE or abs(fy - yoff) > ALIGN_TOLERANCE:
+            raise ValueError("tiles are not aligned to the same grid")
+        offsets.append((xoff, yoff))
+        xsize = max(xsize, xoff + ex_size)
+        ysize = max(ysize, yoff + ey_size)
+    return offsets, (xsize, ysize), (x_min, y_max)
+
+
+def merge_array(target, seen, array, valid, method):
+    """
+    ǶarrayϲtargetУԭ޸targetseen
+
+    Parameters
+    ----------
+    target:numpy.ndarray
+        ѺϲĽSUMMEANΪۼֵ
+    seen:numpy.ndarray
+        ÿԪѺϲЧֵ
+    array:numpy.ndarray
+        targetСͬ
+    valid:numpy.ndarray
+        arrayЧԪĲ
+    method:str
+        ǶBLENDȻΪMEAN
+    """
+    if method == "FIRST":
+        put = valid & (seen == 0)
+    elif method == "LAST":
+        put = valid
+    elif method == "MINIMUM":
+        put = valid & ((seen == 0) | (array < target))
+    elif method == "MAXIMUM":
+        put = valid & ((seen == 0) | (array > target))
+    else:
+        target[valid] += array[valid]
+        seen[valid] += 1
+        return
+    target[put] = array[put]
+    seen[valid] += 1
+
+
+def mosaic_arrays(arrays, offsets, shape, method="LAST", nodatas=None, out_dtype=None, out_nodata=None):
+    """
+    ƫƺϲ
+
+    Parameters
+    ----------
+    arrays:List[numpy.ndarray]
+        Ƭ
+    offsets:List[tuple]
+        Ƭ(xoff, yoff)
+    shape:tuple
+        (xsize, ysize)
+    method:str
+        ǶMOSAIC_METHODS
+    nodatas:List[float],optional
+        ƬNoDataֵNoDataԪϲ
+    out_dtype:str,optional
+        ͣĬһƬͬ
+    out_nodata:float,optional
+        ûκЧֵԪֵ
+
+    Returns
+    -------
+    (ysize, xsize)
+    """
+    method = method.upper()
+    if method not in MOSAIC_METHODS:
+        raise ValueError("unknown mosaic method %s, expected one of %s" % (method, ", ".join(MOSAIC_METHODS)))
+    if method == "BLEND":
+        method = "MEAN"
+    if nodatas is None:
+        nodatas = [None] * len(arrays)
+    out_dtype = np.dtype(out_dtype or arrays[0].dtype)
+    xsize, ysize = shape
+    # ƽڸۼӣ
+    if method in ("SUM", "MEAN"):
+        acc_dtype = "float64" if np.issubdtype(out_dtype, np.floating) or method == "MEAN" else "int64"
+    else:
+        acc_dtype = out_dtype
+    out = np.zeros((ysize, xsize), dtype=acc_dtype)
+    count = np.zeros((ysize, xsize), dtype="uint16")
+    for array, (xoff, yoff), nodata in zip(arrays, offsets, nodatas):
+        rows, cols = array.shape
+        window = (slice(yoff, yoff + rows), slice(xoff, xoff + cols))
+        valid = nodata_mask(array, nodata)
+        valid = np.ones(array.shape, dtype=bool) if valid is None else ~valid
+        merge_array(out[window], count[window], array, valid, method)
+    if method == "MEAN":
+        np.divide(out, count, out=out, where=count > 0)
+    empty = count == 0
+    out = out.astype(out_dtype, copy=False)
+    if out_nodata is not None:
+        out[empty] = out_nodata
+    return out
+
+
+def gdal_mosaic(rasters, out_raster, out_dtype, method="LAST", out_nodata=None, creation_options=None):
+    """
+    NumPyǶGeoTIFFGDALԶȡĵդ
+
+    Parameters
+    ----------
+    out_dtype:str
+        NumPyͣ"int16"
+    out_nodata:float,optional
+        NoDataֵĬʹõһƬNoDataֵ
+
+    Raises
+    ------
+    ValueError
+        ƬԪСͬûж뵽ͬһʱ÷Ըgdal.Warp/VRT
+    """
+    datasets = [gdal.Open(raster) for raster in rasters]
+    gts = [ds.GetGeoTransform() for ds in datasets]
+    cell_size = (gts[0][1], -gts[0][5])
+    for gt in gts:
+        if gt[2] or gt[4] or abs(gt[1] - cell_size[0]) > 1e-9 * cell_size[0] \
+                or abs(-gt[5] - cell_size[1]) > 1e-9 * cell_size[1]:
+            raise ValueError("tiles do not share the same cell size")
+    offsets, shape, origin = grid_offsets([(gt[0], gt[3], ds.RasterXSize, ds.RasterYSize)
+                                           for gt, ds in zip(gts, datasets)], cell_size)
+    bands = [ds.GetRasterBand(1) for ds in datasets]
+    nodatas = [band.GetNoDataValue() for band in bands]
+    if out_nodata is None:
+        out_nodata = nodatas[0]
+    gdal_type = gdal_array.NumericTypeCodeToGDALTypeCode(np.dtype(out_dtype).type)
+    array = mosaic_arrays([band.ReadAsArray() for band in bands], offsets, shape, method, nodatas,
+                          out_dtype, out_nodata)
+    out = gdal.GetDriverByName("GTiff").Create(out_raster, shape[0], shape[1], 1, gdal_type,
+                                               typed_options(creation_options, out_dtype))
+    out.SetGeoTransform((origin[0], cell_size[0], 0.0, origin[1], 0.0, -cell_size[1]))
+    out.SetProjection(datasets[0].GetProjection())
+    out_band = out.GetRasterBand(1)
+    if out_nodata is not None:
+        out_band.SetNoDataValue(float(out_nodata))
+    out_band.WriteArray(array)
+    out.FlushCache()
+    out = None
+    datasets = None
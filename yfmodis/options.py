@@ -0,0 +1,179 @@
+# -- coding:cp936 C
+"""
+Ԥѡ
+
+preprocessƷļð;Ϊ飺ִ桢桢QAĤ
+ÿһѡ룬ֻõĲ衣еĲǱƽļ
+嵥еļͬ"workers""cache_size""qa_rule"split_optionsΪѡ
+"""
+from yfmodis.composite import PERIODS, parse_reducers
+from yfmodis.qa import parse_qa_rule
+
+
+class Options(object):
+    # ƽļ빹ĶӦϵ(, )
+    KEYS = ()
+
+    @classmethod
+    def from_params(cls, params):
+        """
+        ӱƽĲֵȡĲѡֵûеĲʹĬֵ
+        """
+        return cls(**dict((arg, params[key]) for key, arg in cls.KEYS if key in params))
+
+
+class EngineOptions(Options):
+    """
+    ִ
+
+    Parameters
+    ----------
+    backend:str or RasterBackend,optional
+        դ棬"arcpy"Ĭϣ"gdal"
+    workers:int
+        ִеĽĬΪ1
+    creation_options:str or List[str],optional
+        ȫGeoTIFFѡ"COMPRESS=DEFLATE;PREDICTOR=YES;BIGTIFF=IF_SAFER"blocks.gtiff_options
+        arcpy滻Ϊarcpy.env.compressiontileSize
+    native_mosaic:bool
+        arcpyǷNumPyƬƫǶѶƬMosaicToNewRasterArcpyBackend
+        backendΪgdalʱ
+    fused:bool
+        Ƿʹںϴfused_preprocessڷڴȫ
+    streaming:bool
+        Ƿʹʽstream_preprocessһڵƬȡɺ
+    queue:str,optional
+        ļϵͳϵĹУSQLiteݿ⣩ָںϴķʽÿڷ鷢Ϊһ
+        workerṣڵ"python -m yfmodis --worker ·"룬workqueue
+        ȫڱִкϳɡ
+    keep_intermediate:bool
+        ںϴǷмʱʹ
+    """
+    KEYS = (("backend", "backend"), ("workers", "workers"), ("creation_options", "creation_options"),
+            ("native_mosaic", "native_mosaic"), ("fused", "fused"), ("streaming", "streaming"), ("queue", "queue"),
+            ("keep_intermediate", "keep_intermediate"))
+
+    def __init__(self, backend=None, workers=1, creation_options=None, native_mosaic=False, fused=False,
+                 streaming=False, queue=None, keep_intermediate=False):
+        self.backend = backend
+        self.workers = workers
+        self.creation_options = creation_options
+        self.native_mosaic = native_mosaic
+        self.fused = fused
+        self.streaming = streaming
+        self.queue = queue
+        self.keep_intermediate = keep_intermediate
+
+    @property
+    def by_group(self):
+        """
+        Ƿڷ鴦ںϴʽУ
+        """
+        return bool(self.fused or self.streaming or self.queue)
+
+
+class CacheOptions(Options):
+    """
+    Ŀ¼
+
+    Parameters
+    ----------
+    cache:bool or str or StageCache,optional
+        棬open_cacheļݺͲжǷҪ¼
+    size:float,optional
+        мĴСޣMBLRU˳ɾΪNoneʱ
+    catalog:bool or Catalog
+        ǷʹĿ¼workspaceµ.yfcache/catalog.sqlitehdfļֻһΣ
+        ļδ޸ʱгеļǷڰ¼бжϣ¼ÿ״̬
+        繲ϵĴļʽʹĿ¼
+    """
+    KEYS = (("cache", "cache"), ("cache_size", "size"), ("catalog", "catalog"))
+
+    def __init__(self, cache=None, size=None, catalog=False):
+        self.cache = cache
+        self.size = size
+        self.catalog = catalog
+
+
+class OutputOptions(Options):
+    """
+    5_scale֮ڴʱ飬ȫڴɺű
+
+    Parameters
+    ----------
+    cube:bool
+        Ƿ5_scaleеĽ߽硢Ʒݼд6_cubeµʱ壨henan_MOD13Q1_NDVI.zarr
+        Ѵڵֻ׷µڣڵtifڶϵ
+    composite:str or List[str],optional
+        ʱϳɵķ"MAX""MAX;MEAN"ָ5_scaleеĽperiodϳɵ7_composite
+    period:str
+        ʱϳɵʱΣ"month"Ĭϣ"season""year"
+    overviews:bool
+        ǷΪ5_scale7_compositeеĽ.ovrм
+    zonal:bool or str
+        ǷֻͳƣͶӰٲüţֱͳƸ߽ڵĸƽֵСֵֵͱ׼
+        ÿڵĽд8_zonalϲıΪ8_zonal/zonal_stats.csvΪַʱΪϲ·
+        չΪ.parquetʱдParquetͳưִУcubecompositeoverviewsͬʱʹ
+    """
+    KEYS = (("cube", "cube"), ("composite", "composite"), ("composite_period", "period"),
+            ("overviews", "overviews"), ("zonal", "zonal"))
+
+    def __init__(self, cube=False, composite=None, period="month", overviews=False, zonal=False):
+        composite = parse_reducers(composite)
+        period = period or "month"
+        if composite and period not in PERIODS:
+            raise ValueError("unknown period %s, expected one of %s" % (period, ", ".join(PERIODS)))
+        if zonal and (cube or composite or overviews):
+            raise ValueError("zonal statistics do not write rasters, cube, composite and overviews are unavailable")
+        self.cube = cube
+        self.composite = composite
+        self.period = period
+        self.overviews = overviews
+        self.zonal = zonal
+
+
+class QAOptions(Options):
+    """
+    QAĤڴʱ﷨󲻻ȵһű
+
+    Parameters
+    ----------
+    sds_index:int,optional
+        QAݼMOD13Q1VI QualityΪ2ݼͬһδ򿪵hdfȡļ׺ΪQA
+    rule:str,optional
+        QAλ"0-1:0,1;2-5:0-11"qa.parse_qa_ruleƷĹpresets
+        ָQA㰴pixel_typeǶڽͶӰݼһü
+        ΪպŵͬһηֿȥԪΪNoneʱʹQA
+    pixel_type:str
+        QAǶͣĬΪ"16_BIT_UNSIGNED"
+    """
+    KEYS = (("qa_sds_index", "sds_index"), ("qa_rule", "rule"), ("qa_pixel_type", "pixel_type"))
+
+    def __init__(self, sds_index=None, rule=None, pixel_type="16_BIT_UNSIGNED"):
+        if rule:
+            parse_qa_rule(rule)
+            if sds_index in (None, ""):
+                raise ValueError("qa_rule requires qa_sds_index")
+        self.sds_index = sds_index
+        self.rule = rule or None
+        self.pixel_type = pixel_type or "16_BIT_UNSIGNED"
+
+
+# preprocessиѡĲ
+OPTION_GROUPS = (("engine", EngineOptions), ("caching", CacheOptions), ("output", OutputOptions), ("qa", QAOptions))
+
+
+def split_options(params):
+    """
+    ѱƽĲֵ䣨嵥еҵΪѡ󣬷ؿֱӴpreprocessĹؼֲ
+
+    Parameters
+    ----------
+    params:dict
+        嵥еļͬ{"workers": 8, "cache_size": 20480, "qa_rule": "5-7:0,1", "sds_index": 0}
+    """
+    keys = set(key for name, cls in OPTION_GROUPS for key, arg in cls.KEYS)
+    kwargs = dict((key, value) for key, value in params.items() if key not in keys)
+    for name, cls in OPTION_GROUPS:
+        kwargs[name] = cls.from_params(params)
+    return kwargs
@@ -0,0 +1,311 @@
+# -- coding:cp936 C
+"""
+ߵĲִ
+
+ִֻҪṩ map(func, iterable) ύ˳򷵻ؽ
+ multiprocessing.Poolconcurrent.futures.ProcessPoolExecutor Լ
+ SerialExecutor / ProcessExecutor Ϊ executor 롣
+"""
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+
+from yfmodis.report import cpu_time, peak_rss
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+try:
+    from multiprocessing import SimpleQueue
+except ImportError:
+    from multiprocessing.queues import SimpleQueue
+
+
+class SerialExecutor(object):
+    """
+    ڵǰִִworkers=1ʱʹ
+    """
+
+    def map(self, func, iterable):
+        for item in iterable:
+            yield func(item)
+
+    def close(self):
+        pass
+
+
+class ProcessExecutor(object):
+    """
+    multiprocessing.PoolĽִ̳
+
+    Parameters
+    ----------
+    workers:int
+        
+    """
+
+    def __init__(self, workers):
+        _set_python_executable()
+        self.workers = workers
+        self.pool = multiprocessing.Pool(workers)
+
+    def map(self, func, iterable):
+        # imapύ˳򷵻ؽchunksize=1֤Ϣʱ
+        return self.pool.imap(func, iterable, 1)
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+
+def _set_python_executable():
+    # ArcMap/ArcGIS Prosys.executableָArcGISҪֶָӽʹõpython
+    if os.name != "nt":
+        return
+    if os.path.basename(sys.executable).lower().startswith("python"):
+        return
+    exe = os.path.join(sys.exec_prefix, "pythonw.exe")
+    if os.path.exists(exe):
+        multiprocessing.set_executable(exe)
+
+
+def cpu_count():
+    try:
+        return multiprocessing.cpu_count()
+    except NotImplementedError:
+        return 1
+
+
+def make_executor(workers=1, task_count=None):
+    """
+    ݽִ
+
+    Parameters
+    ----------
+    workers:int
+        Сڵ1ʱڵǰдִУΪ0NoneʱʹȫCPU
+    task_count:int,optional
+        ᳬ
+    """
+    if not workers:
+        workers = cpu_count()
+    workers = int(workers)
+    if task_count is not None:
+        workers = min(workers, task_count)
+    if workers <= 1:
+        return SerialExecutor()
+    return ProcessExecutor(workers)
+
+
+class PartialOutputError(Exception):
+    """
+    ֻвʱ׳Ѿд
+
+    Parameters
+    ----------
+    failed:dict
+        Ϊûд·ֵΪϢ
+    """
+
+    def __init__(self, failed):
+        Exception.__init__(self, failed)
+        self.failed = failed
+
+    def __str__(self):
+        return "; ".join("%s: %s" % (os.path.basename(path), msg) for path, msg in sorted(self.failed.items()))
+
+
+def call_task(task):
+    """
+    ִе񲢷(ʱ, Ϣ, CPUʱ, ڴֵ)ϢΪNoneʾִгɹ
+    ΪdictʱʾֻвPartialOutputErrorΪֵΪϢ
+
+    Ϊ(func, args)funcģ鼶Աӽбpickle
+    CPUʱڴִֵĽвڴֵΪý̵ĿǰΪֹķֵ
+    """
+    func, args = task
+    s = time.time()
+    cpu = cpu_time()
+    err = None
+    try:
+        func(*args)
+    except PartialOutputError as e:
+        err = dict(e.failed)
+    except Exception as e:
+        err = "%s" % e
+    return time.time() - s, err, cpu_time() - cpu, peak_rss()
+
+
+def run_tasks(tasks, workers=1, executor=None):
+    """
+    ִһ񣬰ύ˳ηÿ(ʱ, Ϣ, CPUʱ, ڴֵ)
+
+    Parameters
+    ----------
+    tasks:List[tuple]
+        (func, args)ɵб
+    workers:int
+        δָexecutorʱʹõĽ
+    executor:object,optional
+        ṩmap(func, iterable)ִɵ÷ر
+    """
+    own = executor is None
+    if own:
+        executor = make_executor(workers, len(tasks))
+    try:
+        for result in executor.map(call_task, tasks):
+            yield result
+    finally:
+        if own:
+            executor.close()
+
+
+# ȴʱִеĽǷļ룩
+STREAM_POLL = 1.0
+
+# ̳еĽڱ濪ʼִе񣬼_init_stream_worker
+_started = None
+
+
+def _init_stream_worker(started):
+    global _started
+    _started = started
+
+
+def call_stream_task(kind, name, task):
+    """
+    ڽִ̳stream_groupsȱִḶ̌Ա㷢˳Ľ
+    """
+    _started.put((kind, name, os.getpid()))
+    return call_task(task)
+
+
+def stream_groups(tasks, groups, downstream, workers=1):
+    """
+    ʽִзһǰȫɺύĺ񣬲ȴ
+
+    ͬʱִеworkersпнʱύѾĺ
+    ˵һĽȫǰ֮ǰõ
+
+    Parameters
+    ----------
+    tasks:List[tuple]
+        ǰ(key, func, args)ɣύ˳
+    groups:List[tuple]
+        (group, keys)ɣkeysΪǰ񣬲tasksеkeyΪ
+    downstream:dict
+        ΪgroupֵΪ(func, args)ΪNoneʱִ
+    workers:int
+        Сڵ1ʱڵǰִУΪ0NoneʱʹȫCPU
+
+    Returns
+    -------
+    ˳򷵻(kind, name, ʱ, Ϣ, CPUʱ, ڴֵ)kindΪ"task""group"
+    ǰķ鲻ִк񣬷صĴϢ˵ԭ
+    ޷ύ̳أpickleִĽ˳ʱͬشϢ
+    """
+    if not workers:
+        workers = cpu_count()
+    workers = max(int(workers), 1)
+    key_group = {}
+    waiting = {}
+    for group, keys in groups:
+        waiting[group] = set()
+        for key in keys:
+            key_group.setdefault(key, []).append(group)
+    for key, func, args in tasks:
+        for group in key_group.get(key, []):
+            waiting[group].add(key)
+    failed = set()
+    todo = deque(tasks)
+    ready = deque(group for group, keys in groups if not waiting[group])
+    done = deque()
+    pool = None
+    if workers > 1:
+        _set_python_executable()
+        # SimpleQueueֱдܵڱ˳ҲᶪʧϢ
+        started = SimpleQueue()
+        pool = multiprocessing.Pool(workers, _init_stream_worker, (started,))
+
+    def submit(kind, name, task):
+        if pool is None:
+            done.append((kind, name, call_task(task)))
+            return
+        kwargs = {}
+        if sys.version_info[0] >= 3:
+            kwargs["error_callback"] = lambda e: results.put((kind, name, (0.0, "%s" % e, 0.0, None)))
+        pool.apply_async(call_stream_task, (kind, name, task),
+                         callback=lambda result: results.put((kind, name, result)), **kwargs)
+
+    # ִе̣˳ûнʱΪ֮ŵĽ
+    running = {}
+    finished = set()
+    lost = set()
+
+    def next_result():
+        while True:
+            try:
+                kind, name, result = results.get(timeout=STREAM_POLL)
+            except queue.Empty:
+                pass
+            else:
+                if (kind, name) in lost:
+                    continue
+                finished.add((kind, name))
+                running.pop((kind, name), None)
+                return kind, name, result
+            while not started.empty():
+                kind, name, pid = started.get()
+                if (kind, name) not in finished:
+                    running[(kind, name)] = pid
+            alive = set(p.pid for p in multiprocessing.active_children())
+            for (kind, name), pid in list(running.items()):
+                if pid not in alive:
+                    del running[(kind, name)]
+                    lost.add((kind, name))
+                    return kind, name, (0.0, "worker process %d exited unexpectedly" % pid, 0.0, None)
+
+    results = queue.Queue()
+    in_flight = 0
+    try:
+        while True:
+            while in_flight < workers:
+                if ready:
+                    group = ready.popleft()
+                    if group in failed:
+                        yield "group", group, 0.0, "skipped because an input task errored", 0.0, None
+                        continue
+                    if downstream.get(group) is None:
+                        yield "group", group, 0.0, None, 0.0, None
+                        continue
+                    submit("group", group, downstream[group])
+                elif todo:
+                    key, func, args = todo.popleft()
+                    submit("task", key, (func, args))
+                else:
+                    break
+                in_flight += 1
+            if in_flight == 0:
+                break
+            kind, name, (used, err, cpu, peak) = done.popleft() if pool is None else next_result()
+            in_flight -= 1
+            yield kind, name, used, err, cpu, peak
+            if kind == "task":
+                for group in key_group.get(name, []):
+                    waiting[group].discard(name)
+                    if err is not None:
+                        failed.add(group)
+                    if not waiting[group]:
+                        ready.append(group)
+    finally:
+        if pool is not None:
+            # ʧԶнclose֮joinһֱȴ
+            if lost:
+                pool.terminate()
+            else:
+                pool.close()
+            pool.join()
@@ -0,0 +1,129 @@
+# -- coding:cp936 C
+"""
+ƷԤ
+
+ÿԤݼ͡ӡɸѡԭʼԪСԼòƷҪִеĲ裬
+䡢кȡƷֻPRESETSһ
+QAݼλ򣨼qaҲԤиֻʱQAĤʹá
+"""
+from collections import OrderedDict
+
+# Ĵ裬ִ˳
+STAGES = ("extract", "mosaic", "reproject", "clip", "setnull", "scale")
+
+# Ĳ裺ļȫΧĲƷҪǶͶӰʱҪͶӰûֵʱҪΪ
+OPTIONAL_STAGES = ("mosaic", "reproject", "setnull")
+
+
+class Preset(object):
+    """
+    һƷԤ
+
+    Parameters
+    ----------
+    name:str
+        Ԥ"MOD13_NDVI"
+    sds_index:int
+        ݼ
+    sds_name:str
+        ݼƣļ׺
+    pixel_type:str
+        Ƕ
+    scale_factor:float
+        
+    condition:str,optional
+        ΪյֵЧΧֵ֮ΪNoneʱִΪ
+    cell_size:str,optional
+        ԭʼԪС"500 500"ͬһƷжֱַʣMOD13Q1/MOD13A1ʱΪNoneûָ
+    skip:tuple
+        òƷҪĲ裬ֻOPTIONAL_STAGESеĲ
+    qa_sds_index:int,optional
+        QAݼMOD13Q1VI QualityΪ2
+    qa_rule:str,optional
+        QAλ"0-1:0,1;2-5:0-11"qa.parse_qa_rule
+    qa_pixel_type:str
+        QAǶͣQAȫλ8λQAΪ"8_BIT_UNSIGNED"
+    """
+
+    def __init__(self, name, sds_index=None, sds_name=None, pixel_type=None, scale_factor=None, condition=None,
+                 cell_size=None, skip=(), qa_sds_index=None, qa_rule=None, qa_pixel_type="16_BIT_UNSIGNED"):
+        for stage in skip:
+            if stage not in OPTIONAL_STAGES:
+                raise ValueError("stage %s of preset %s can not be skipped" % (stage, name))
+        self.name = name
+        self.sds_index = sds_index
+        self.sds_name = sds_name
+        self.pixel_type = pixel_type
+        self.scale_factor = scale_factor
+        self.condition = condition
+        self.cell_size = cell_size
+        self.skip = tuple(skip)
+        self.qa_sds_index = qa_sds_index
+        self.qa_rule = qa_rule
+        self.qa_pixel_type = qa_pixel_type
+
+    @property
+    def stages(self):
+        """
+        ҪִеĲ裬setnullֻʱָɸѡʱִ
+        """
+        return [stage for stage in STAGES if stage not in self.skip]
+
+    def defaults(self):
+        """
+        ԤĲmod13preprocess/mod16preprocessĲͬδָĲڣ
+        QAڣqa_defaults
+        """
+        params = {}
+        for key in ("sds_index", "sds_name", "pixel_type", "scale_factor", "condition", "cell_size"):
+            value = getattr(self, key)
+            if value is not None:
+                params[key] = value
+        return params
+
+    def qa_defaults(self):
+        """
+        QAĤʱĲqa_sds_indexqa_ruleqa_pixel_typeԤûQAʱؿֵ
+        """
+        if self.qa_rule is None:
+            return {}
+        return {"qa_sds_index": self.qa_sds_index, "qa_rule": self.qa_rule, "qa_pixel_type": self.qa_pixel_type}
+
+
+# õQAλ
+# MOD13 VI Quality16λMODLAND QA0-1λΪ01VI usefulness2-5λ11
+VI_QUALITY = "0-1:0,1;2-5:0-11"
+# MOD15/MOD16/MOD17FparLai_QCET_QCPsn_QC8λSCF_QC5-7λΪ㷨01
+SCF_QC = "5-7:0,1"
+# MOD11 QC_Day8λMandatory QA0-1λΪ01LST6-7λ2K
+LST_QC = "0-1:0,1;6-7:0,1"
+
+PRESETS = OrderedDict((preset.name, preset) for preset in [
+    Preset("MOD13_NDVI", 0, "NDVI", "16_BIT_SIGNED", 0.0001, skip=("setnull",), qa_sds_index=2, qa_rule=VI_QUALITY),
+    Preset("MOD13_EVI", 1, "EVI", "16_BIT_SIGNED", 0.0001, skip=("setnull",), qa_sds_index=2, qa_rule=VI_QUALITY),
+    Preset("MOD16_ET", 0, "ET", "16_BIT_UNSIGNED", 0.1, "VALUE > 32700", qa_sds_index=4, qa_rule=SCF_QC,
+           qa_pixel_type="8_BIT_UNSIGNED"),
+    Preset("MOD16_PET", 2, "PET", "16_BIT_UNSIGNED", 0.1, "VALUE > 32700", qa_sds_index=4, qa_rule=SCF_QC,
+           qa_pixel_type="8_BIT_UNSIGNED"),
+    Preset("MOD11A2_LST", 0, "LST", "16_BIT_UNSIGNED", 0.02, "VALUE < 7500", "1000 1000", qa_sds_index=1,
+           qa_rule=LST_QC, qa_pixel_type="8_BIT_UNSIGNED"),
+    Preset("MOD17A2_GPP", 0, "GPP", "16_BIT_SIGNED", 0.0001, "VALUE > 30000", "500 500", qa_sds_index=2,
+           qa_rule=SCF_QC, qa_pixel_type="8_BIT_UNSIGNED"),
+    # Npp_QCЧİٷֱȣλֶ
+    Preset("MOD17A3_NPP", 0, "NPP", "16_BIT_SIGNED", 0.0001, "VALUE > 32700", "500 500"),
+    Preset("MOD15A2_LAI", 1, "LAI", "8_BIT_UNSIGNED", 0.1, "VALUE > 100", "500 500", qa_sds_index=2,
+           qa_rule=SCF_QC, qa_pixel_type="8_BIT_UNSIGNED"),
+    # ȫûָ
+    Preset("custom"),
+])
+
+
+def get_preset(name):
+    """
+    ƻȡԤ裬nameΪNoneʱcustom
+    """
+    if name is None:
+        name = "custom"
+    if name not in PRESETS:
+        raise ValueError("unknown preset %s, expected one of %s" % (name, ", ".join(PRESETS)))
+    return PRESETS[name]
@@ -0,0 +1,138 @@
+# -- coding:cp936 C
+"""
+QAλĤ
+
+MODISݼMOD13VI QualityMOD11QC_DayMOD15FparLai_QCȣλ洢ֶΣ
+д"ʼλ-λ:ֵ"ֶ÷ֺŸȫֶζʱԪЧ磺
+
+    0-1:0,1;2-5:0-11     MODLAND QAΪ01VI usefulness11
+    5-7:0,1              SCF_QCΪ01㷨
+
+ԤչΪ8λ25616λ65536ĲұʱÿԪֻһ
+ֶλȽϡQAݼһȡǶڽͶӰͲü
+ΪպŵͬһηֿʹãҪһ
+"""
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# QAݼƣȡǶͶӰͲüļ׺
+QA_NAME = "QA"
+
+# ұֻڲ16λQAֶμ
+LUT_BITS = 16
+
+_rules = {}
+_luts = {}
+
+
+def parse_qa_rule(rule):
+    """
+    QA򣬷(ʼλ, λ, ֵ)ɵб
+
+    Parameters
+    ----------
+    rule:str
+        "0-1:0,1;2-5:0-11"λֻдһ֣"10:0"ֵб
+
+    Returns
+    -------
+    List[tuple]ֵΪfrozenset
+    """
+    if rule in _rules:
+        return _rules[rule]
+    fields = []
+    for item in rule.split(";"):
+        if not item.strip():
+            continue
+        bits, sep, values = item.partition(":")
+        if not sep or not values.strip():
+            raise ValueError("invalid QA rule %r: expected bits:values in %r" % (rule, item.strip()))
+        try:
+            low, high = _parse_range(bits)
+            allowed = set()
+            for value in values.split(","):
+                first, last = _parse_range(value)
+                allowed.update(range(first, last + 1))
+        except ValueError:
+            raise ValueError("invalid QA rule %r: %r is not a bit range and a list of values" % (rule, item.strip()))
+        count = high - low + 1
+        if low < 0 or count < 1 or high > 31:
+            raise ValueError("invalid QA rule %r: bits %s out of range" % (rule, bits.strip()))
+        if max(allowed) >= 1 << count:
+            raise ValueError("invalid QA rule %r: %d does not fit in %d bits" % (rule, max(allowed), count))
+        fields.append((low, count, frozenset(allowed)))
+    if not fields:
+        raise ValueError("invalid QA rule %r: no fields" % (rule,))
+    _rules[rule] = fields
+    return fields
+
+
+def _parse_range(text):
+    # "2-5"(2, 5)"3"(3, 3)
+    first, sep, last = text.strip().partition("-")
+    first = int(first)
+    return first, int(last) if sep else first
+
+
+def qa_lut(rule, bits=LUT_BITS):
+    """
+    2**bitsĲұQAֵΪTrueÿλֻһ
+    """
+    key = (rule, bits)
+    lut = _luts.get(key)
+    if lut is None:
+        fields = parse_qa_rule(rule)
+        codes = np.arange(1 << bits, dtype="uint32")
+        lut = qa_valid(codes, fields)
+        _luts[key] = lut
+    return lut
+
+
+def qa_valid(qa, fields):
+    """
+    ֶλȽϣĲ飬ɲұԼ16λQA
+    """
+    qa = qa.astype("uint32")
+    valid = np.ones(qa.shape, dtype=bool)
+    for low, count, allowed in fields:
+        value = (qa >> low) & ((1 << count) - 1)
+        valid &= np.isin(value, sorted(allowed))
+    return valid
+
+
+def qa_invalid(qa, rule, nodata=None):
+    """
+    زԪQAΪNoDataԪǶͶӰüʱԪҲΪЧ
+
+    Parameters
+    ----------
+    qa:numpy.ndarray
+        QA飬8λ16λͨұ룬зͰͬȵ޷ͽ
+        16_BIT_SIGNEDǶVI Qualityԭʼλͬ
+    rule:str
+        QA򣬼parse_qa_rule
+    nodata:float,optional
+        QANoDataֵ
+    """
+    itemsize = qa.dtype.itemsize
+    if qa.dtype.kind in "iu" and itemsize <= 2:
+        lut = qa_lut(rule, 8 * itemsize)
+        invalid = ~lut[qa.astype("uint%d" % (8 * itemsize), copy=False)]
+    else:
+        invalid = ~qa_valid(qa, parse_qa_rule(rule))
+    if nodata is not None:
+        invalid |= np.isnan(qa) if np.isnan(nodata) else qa == nodata
+    return invalid
+
+
+def qa_raster_of(raster, name=QA_NAME):
+    """
+    դͬһQA㣬"mask0_MOD13Q1.A2004001.NDVI.tif"Ӧ"mask0_MOD13Q1.A2004001.QA.tif"
+    """
+    folder, base = os.path.split(raster)
+    parts = base.rsplit(".", 2)
+    return os.path.join(folder, ".".join([parts[0], name, parts[2]]))
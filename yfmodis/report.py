@@ -0,0 +1,162 @@
+# -- coding:cp936 C
+"""
+б
+
+¼ÿļÿĺʱCPUʱ䡢дֽڴֵΪJSONCSV
+ٴӵϢн"time used"жƿһ
+"""
+import cProfile
+import csv
+import functools
+import json
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    # Windowsûresourceģ
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+FILE_FIELDS = ["stage", "label", "status", "wall", "cpu", "peak_rss", "bytes_read", "bytes_written"]
+STAGE_FIELDS = ["stage", "wall", "cpu", "files", "completed", "skipped", "errored", "peak_rss",
+                "bytes_read", "bytes_written"]
+
+
+def cpu_time():
+    # ǰ̵û̬ں̬CPUʱ֮ͣ룩
+    times = os.times()
+    return times[0] + times[1]
+
+
+def peak_rss():
+    """
+    صǰ̵ڴֵֽڣ޷ȡʱNone
+
+    ̳еӽִ̻жǸý̵ĿǰΪֹķֵ
+    """
+    if resource is not None:
+        value = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # LinuxĵλΪKBmacOSΪֽ
+        return value if sys.platform == "darwin" else value * 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    return None
+
+
+def file_size(paths):
+    # ļС֮ͣin_memory/vsimemȲļ·Ϊ0
+    total = 0
+    for path in paths:
+        if os.path.isfile(path):
+            total += os.path.getsize(path)
+    return total
+
+
+class RunReport(object):
+    """
+    һδб
+
+    Parameters
+    ----------
+    path:str,optional
+        ı·չΪ.csvʱΪCSVļļϸ<name>_stages.csv򱣴ΪJSON
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.files = []
+        self.stages = []
+        self.start = time.time()
+
+    def add_file(self, stage, label, status, wall=0.0, cpu=0.0, peak_rss=None, bytes_read=0, bytes_written=0):
+        """
+        ¼һstatusΪcompletedskippederrored
+        """
+        self.files.append({"stage": stage, "label": label, "status": status, "wall": wall, "cpu": cpu,
+                           "peak_rss": peak_rss, "bytes_read": bytes_read, "bytes_written": bytes_written})
+
+    def add_stage(self, stage, wall):
+        """
+        ¼һܺʱCPUʱ䡢ֽڱʱɸòļ
+        """
+        self.stages.append({"stage": stage, "wall": wall})
+
+    def stage_summary(self):
+        summary = []
+        for entry in self.stages:
+            files = [f for f in self.files if f["stage"] == entry["stage"]]
+            peaks = [f["peak_rss"] for f in files if f["peak_rss"] is not None]
+            row = dict(entry)
+            row.update({"cpu": sum(f["cpu"] for f in files), "files": len(files),
+                        "completed": sum(1 for f in files if f["status"] == "completed"),
+                        "skipped": sum(1 for f in files if f["status"] == "skipped"),
+                        "errored": sum(1 for f in files if f["status"] == "errored"),
+                        "peak_rss": max(peaks) if peaks else None,
+                        "bytes_read": sum(f["bytes_read"] for f in files),
+                        "bytes_written": sum(f["bytes_written"] for f in files)})
+            summary.append(row)
+        return summary
+
+    def save(self, path=None):
+        path = path or self.path
+        if path.lower().endswith(".csv"):
+            _write_csv(path, FILE_FIELDS, self.files)
+            _write_csv(os.path.splitext(path)[0] + "_stages.csv", STAGE_FIELDS, self.stage_summary())
+        else:
+            with open(path, "w") as f:
+                json.dump({"wall": time.time() - self.start, "stages": self.stage_summary(), "files": self.files},
+                          f, indent=2)
+
+
+def _write_csv(path, fields, rows):
+    with open(path, "w") as f:
+        writer = csv.DictWriter(f, fields, lineterminator="\n")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+
+
+def open_report(report):
+    """
+    reportΪ·ʱRunReportΪRunReportʱֱӷأΪNoneʱ¼
+    """
+    if report is None or isinstance(report, RunReport):
+        return report
+    return RunReport(report)
+
+
+def instrumented(func):
+    """
+    Ϊreportprofileؼֲ
+
+    reportΪ·RunReport󣬺󱣴汨棻
+    profileΪcProfileı·ֻǰ̣workers1ʱӽеļ㲻
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        report = open_report(kwargs.get("report"))
+        own = report is not None and report is not kwargs.get("report")
+        kwargs["report"] = report
+        profile = kwargs.pop("profile", None)
+        profiler = cProfile.Profile() if profile else None
+        if profiler is not None:
+            profiler.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(profile)
+            if own:
+                report.save()
+
+    return wrapper
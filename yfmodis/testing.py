@@ -0,0 +1,272 @@
+# -- coding:cp936 C
+"""
+Ԫԣtestsԣbenchmarksõģݣвʹ
+
+NumpyBackendġhdf͡tifNumPy.npzļԭչҪarcpyGDAL
+make_fixturesͶӰģƬļMOD13Q1.A2004001.h26v05.006.2015.hdf;γȱ߽硣
+"""
+import itertools
+import math
+import os
+import struct
+
+import numpy as np
+
+from yfmodis.backend import RasterBackend, default_nodata
+from yfmodis.blocks import FLOAT_NODATA, is_unit_scale, setnull_func, setnull_times_func, times_func
+from yfmodis.composite import reduce_blocks
+from yfmodis.condition import compile_condition
+from yfmodis.mosaic import PIXEL_DTYPES, grid_offsets, mosaic_arrays
+from yfmodis.qa import qa_invalid
+from yfmodis.tiles import SPHERE_RADIUS, TILE_SIZE, read_shp_bbox, tile_bounds
+
+WGS84 = ('GEOGCS["GCS_WGS_1984",DATUM["D_WGS_1984",SPHEROID["WGS_1984",6378137.0,298.257223563]],'
+         'PRIMEM["Greenwich",0.0],UNIT["Degree",0.0174532925199433]]')
+
+# ģƷݼ͡ЧֵΧֵƷԤӦ
+PRODUCTS = {
+    "MOD13Q1": {"dtype": "int16", "valid": (-2000, 10001), "fill": -3000, "nodata": -3000,
+                "sds": ["NDVI", "EVI", "QA"]},
+    "MOD16A2": {"dtype": "uint16", "valid": (0, 3001), "fill": 65535, "nodata": None,
+                "sds": ["ET", "LE", "PET"]},
+}
+
+
+class NumpyBackend(RasterBackend):
+    """
+    NumPy棬դΪdatax_miny_maxcellnodata.npzļ
+
+    ǶΪպʹgdalͬyfmodisͶӰΪͶӰγȵڽ
+    üֻ߽νȡ
+    """
+    name = "numpy"
+
+    def extract_sds(self, hdf, out_tif, sds_index):
+        self.extract_sds_multi(hdf, [out_tif], [sds_index])
+
+    def extract_sds_multi(self, hdf, out_tifs, sds_indexes):
+        src = np.load(hdf)
+        for out_tif, sds_index in zip(out_tifs, sds_indexes):
+            write_raster(out_tif, src["sds_%d" % sds_index], src["x_min"], src["y_max"], src["cell"],
+                         src["nodata_%d" % sds_index])
+
+    def mosaic(self, rasters, out_raster, pixel_type, mosaic_method, colormap_mode):
+        srcs = [read_raster(raster) for raster in rasters]
+        cell = srcs[0]["cell"]
+        offsets, shape, origin = grid_offsets([(s["x_min"], s["y_max"], s["data"].shape[1], s["data"].shape[0])
+                                               for s in srcs], (cell, cell))
+        nodatas = [s["nodata"] for s in srcs]
+        array = mosaic_arrays([s["data"] for s in srcs], offsets, shape, mosaic_method, nodatas,
+                              PIXEL_DTYPES[pixel_type], nodatas[0])
+        write_raster(out_raster, array, origin[0], origin[1], cell, nodatas[0])
+
+    def project_raster(self, raster, out_raster, out_coor_system, resampling_type, cell_size):
+        # ͶӰ x = R * lon * cos(lat), y = R * latԪСȡԪڳӦľγ
+        src = read_raster(raster)
+        data = src["data"]
+        rows, cols = data.shape
+        cell = src["cell"]
+        out_cell = math.degrees(cell / SPHERE_RADIUS)
+        y_min = src["y_max"] - rows * cell
+        lat_max = math.degrees(src["y_max"] / SPHERE_RADIUS)
+        lat_min = math.degrees(y_min / SPHERE_RADIUS)
+        cos_min = min(math.cos(math.radians(lat_min)), math.cos(math.radians(lat_max)))
+        lon_min = math.degrees(min(src["x_min"] / SPHERE_RADIUS / cos_min, src["x_min"] / SPHERE_RADIUS))
+        x_max = src["x_min"] + cols * cell
+        lon_max = math.degrees(max(x_max / SPHERE_RADIUS / cos_min, x_max / SPHERE_RADIUS))
+        out_rows = int(math.ceil((lat_max - lat_min) / out_cell))
+        out_cols = int(math.ceil((lon_max - lon_min) / out_cell))
+        lats = np.radians(lat_max - (np.arange(out_rows) + 0.5) * out_cell)
+        lons = np.radians(lon_min + (np.arange(out_cols) + 0.5) * out_cell)
+        src_rows = ((src["y_max"] - SPHERE_RADIUS * lats) / cell).astype("int64")
+        src_cols = ((SPHERE_RADIUS * np.outer(np.cos(lats), lons) - src["x_min"]) / cell).astype("int64")
+        inside = (src_cols >= 0) & (src_cols < cols) & (src_rows[:, None] >= 0) & (src_rows[:, None] < rows)
+        nodata = src["nodata"]
+        if nodata is None:
+            nodata = default_nodata(data.dtype)
+        out = np.full((out_rows, out_cols), nodata, dtype=data.dtype)
+        row_index = np.broadcast_to(src_rows[:, None], inside.shape)
+        out[inside] = data[row_index[inside], src_cols[inside]]
+        write_raster(out_raster, out, lon_min, lat_max, out_cell, nodata)
+
+    def clip_raster(self, raster, out_raster, mask):
+        src = read_raster(raster)
+        cell = src["cell"]
+        lon_min, lat_min, lon_max, lat_max = read_shp_bbox(mask)
+        rows, cols = src["data"].shape
+        if (lon_max <= src["x_min"] or lon_min >= src["x_min"] + cols * cell or
+                lat_min >= src["y_max"] or lat_max <= src["y_max"] - rows * cell):
+            raise ValueError("mask %s does not overlap raster %s" % (mask, raster))
+        col0 = min(max(int((lon_min - src["x_min"]) / cell), 0), cols - 1)
+        col1 = min(max(int(math.ceil((lon_max - src["x_min"]) / cell)), col0 + 1), cols)
+        row0 = min(max(int((src["y_max"] - lat_max) / cell), 0), rows - 1)
+        row1 = min(max(int(math.ceil((src["y_max"] - lat_min) / cell)), row0 + 1), rows)
+        write_raster(out_raster, src["data"][row0:row1, col0:col1].copy(), src["x_min"] + col0 * cell,
+                     src["y_max"] - row0 * cell, cell, src["nodata"])
+
+    def times(self, raster, out_raster, scale_factor):
+        self._apply(raster, out_raster, times_func(scale_factor))
+
+    def setnull(self, raster, out_raster, condition):
+        src = read_raster(raster)
+        nodata = src["nodata"]
+        if nodata is None:
+            nodata = default_nodata(src["data"].dtype)
+        out = setnull_func(compile_condition(condition), nodata)(src["data"], src["nodata"])
+        write_raster(out_raster, out, src["x_min"], src["y_max"], src["cell"], nodata)
+
+    def setnull_times(self, raster, out_raster, condition, scale_factor):
+        self._apply(raster, out_raster, setnull_times_func(compile_condition(condition), scale_factor))
+
+    def qa_setnull_times(self, raster, out_raster, qa_raster, qa_rule, condition=None, scale_factor=None):
+        src = read_raster(raster)
+        qa = read_raster(qa_raster)
+        mask_func = compile_condition(condition) if condition else None
+        if is_unit_scale(scale_factor):
+            nodata = src["nodata"]
+            if nodata is None:
+                nodata = default_nodata(src["data"].dtype)
+            out = setnull_func(mask_func, nodata)(src["data"], nodata) if mask_func else src["data"].copy()
+        else:
+            nodata = FLOAT_NODATA
+            func = setnull_times_func(mask_func, scale_factor) if mask_func else times_func(scale_factor)
+            out = func(src["data"], src["nodata"])
+        out[qa_invalid(qa["data"], qa_rule, qa["nodata"])] = nodata
+        write_raster(out_raster, out, src["x_min"], src["y_max"], src["cell"], nodata)
+
+    def composite(self, rasters, out_raster, reducer, condition=None):
+        # ڶȡͬʱȫ飨MEDIAN⣩
+        first = read_raster(rasters[0])
+        srcs = itertools.chain([first], (read_raster(raster) for raster in rasters[1:]))
+        out = reduce_blocks(((src["data"], src["nodata"]) for src in srcs), reducer,
+                            compile_condition(condition) if condition else None)
+        write_raster(out_raster, out, first["x_min"], first["y_max"], first["cell"],
+                     None if reducer == "COUNT" else FLOAT_NODATA)
+
+    def to_numpy(self, raster):
+        src = read_raster(raster)
+        geotransform = (src["x_min"], src["cell"], 0.0, src["y_max"], 0.0, -src["cell"])
+        return src["data"], geotransform, WGS84, src["nodata"]
+
+    def mask_windows(self, raster, masks):
+        # clip_raster߽ͬ簴δ
+        src = read_raster(raster)
+        cell = src["cell"]
+        rows, cols = src["data"].shape
+        windows = []
+        for mask in masks:
+            lon_min, lat_min, lon_max, lat_max = read_shp_bbox(mask)
+            col0 = max(int((lon_min - src["x_min"]) / cell), 0)
+            col1 = min(int(math.ceil((lon_max - src["x_min"]) / cell)), cols)
+            row0 = max(int((src["y_max"] - lat_max) / cell), 0)
+            row1 = min(int(math.ceil((src["y_max"] - lat_min) / cell)), rows)
+            if col1 <= col0 or row1 <= row0:
+                windows.append((None, None))
+                continue
+            windows.append(((col0, row0, col1 - col0, row1 - row0), np.ones((row1 - row0, col1 - col0), dtype=bool)))
+        return windows
+
+    def _apply(self, raster, out_raster, func):
+        # ŵΪfloat32NoDataΪFLOAT_NODATA
+        src = read_raster(raster)
+        write_raster(out_raster, func(src["data"], src["nodata"]), src["x_min"], src["y_max"], src["cell"],
+                     FLOAT_NODATA)
+
+
+def write_raster(path, data, x_min, y_max, cell, nodata):
+    # дļnp.savez.tif׷.npz
+    with open(path, "wb") as f:
+        np.savez(f, data=data, x_min=float(x_min), y_max=float(y_max), cell=float(cell),
+                 nodata=np.nan if nodata is None else float(nodata))
+
+
+def read_raster(path):
+    src = np.load(path)
+    nodata = float(src["nodata"])
+    return {"data": src["data"], "x_min": float(src["x_min"]), "y_max": float(src["y_max"]),
+            "cell": float(src["cell"]), "nodata": None if np.isnan(nodata) else nodata}
+
+
+def write_hdf(path, product, h, v, size, seed):
+    """
+    дһģhdfÿݼΪsize*size飬Լ10%Ϊֵ
+    """
+    info = PRODUCTS[product]
+    rng = np.random.RandomState(seed)
+    x_min, y_min, x_max, y_max = tile_bounds(h, v)
+    arrays = {"x_min": x_min, "y_max": y_max, "cell": TILE_SIZE / size}
+    for i, name in enumerate(info["sds"]):
+        array = rng.randint(info["valid"][0], info["valid"][1], size=(size, size)).astype(info["dtype"])
+        array[rng.rand(size, size) < 0.1] = info["fill"]
+        arrays["sds_%d" % i] = array
+        arrays["nodata_%d" % i] = np.nan if info["nodata"] is None else info["nodata"]
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+
+
+def write_mask(path, bbox, record_id=1):
+    """
+    дֻһεshapefile.shp/.shx/.dbf/.prjΪγ
+    """
+    x_min, y_min, x_max, y_max = bbox
+    ring = [(x_min, y_min), (x_min, y_max), (x_max, y_max), (x_max, y_min), (x_min, y_min)]
+    content = struct.pack("<i4dii", 5, x_min, y_min, x_max, y_max, 1, len(ring)) + struct.pack("<i", 0)
+    for x, y in ring:
+        content += struct.pack("<2d", x, y)
+    record = struct.pack(">2i", 1, len(content) // 2) + content
+
+    def header(length):
+        return (struct.pack(">7i", 9994, 0, 0, 0, 0, 0, length // 2) + struct.pack("<2i", 1000, 5)
+                + struct.pack("<8d", x_min, y_min, x_max, y_max, 0, 0, 0, 0))
+
+    base = os.path.splitext(path)[0]
+    with open(base + ".shp", "wb") as f:
+        f.write(header(100 + len(record)) + record)
+    with open(base + ".shx", "wb") as f:
+        f.write(header(108) + struct.pack(">2i", 50, len(content) // 2))
+    with open(base + ".dbf", "wb") as f:
+        f.write(struct.pack("<4BIHH20x", 3, 126, 1, 1, 1, 65, 11))
+        f.write(b"ID".ljust(11, b"\x00") + b"N" + b"\x00" * 4 + struct.pack("<BB", 10, 0) + b"\x00" * 14 + b"\r")
+        f.write(b" " + ("%10d" % record_id).encode("ascii") + b"\x1a")
+    with open(base + ".prj", "w") as f:
+        f.write(WGS84)
+
+
+def make_fixtures(root, product, tiles, dates, size, masks, seed=0):
+    """
+    roothdfͱ߽磬(hdfs, masks)
+
+    Ƭh26v05ʼΪtiles=(, )߽ΪƬľγȷΧڵ
+    """
+    hdf_dir = os.path.join(root, "hdf")
+    mask_dir = os.path.join(root, "masks")
+    for d in (hdf_dir, mask_dir):
+        os.mkdir(d)
+    hdfs = []
+    n = 0
+    for d in range(dates):
+        date = "A2004%03d" % (1 + 8 * d)
+        for h in range(26, 26 + tiles[0]):
+            for v in range(5, 5 + tiles[1]):
+                path = os.path.join(hdf_dir, "%s.%s.h%02dv%02d.006.2015.hdf" % (product, date, h, v))
+                write_hdf(path, product, h, v, size, seed + n)
+                hdfs.append(path)
+                n += 1
+    # ƬϵγȷΧԼмγϵľȷΧ
+    x_min, y_min = tile_bounds(26, 5 + tiles[1] - 1)[:2]
+    x_max, y_max = tile_bounds(26 + tiles[0] - 1, 5)[2:]
+    lat_min, lat_max = math.degrees(y_min / SPHERE_RADIUS), math.degrees(y_max / SPHERE_RADIUS)
+    cos_mid = math.cos(math.radians((lat_min + lat_max) / 2))
+    lon_min = math.degrees(x_min / SPHERE_RADIUS / cos_mid)
+    lon_max = math.degrees(x_max / SPHERE_RADIUS / cos_mid)
+    rng = np.random.RandomState(seed)
+    mask_paths = []
+    for i in range(masks):
+        width = (lon_max - lon_min) * rng.uniform(0.1, 0.4)
+        height = (lat_max - lat_min) * rng.uniform(0.1, 0.4)
+        left = rng.uniform(lon_min, lon_max - width)
+        bottom = rng.uniform(lat_min, lat_max - height)
+        path = os.path.join(mask_dir, "mask%d.shp" % i)
+        write_mask(path, (left, bottom, left + width, bottom + height), i + 1)
+        mask_paths.append(path)
+    return hdfs, mask_paths
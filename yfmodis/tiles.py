@@ -0,0 +1,162 @@
+# -- coding:cp936 C
+"""
+MODISͶӰƬĿռɸѡ
+
+ļеhXXvYYƬͶӰеķΧü߽αȽϣ
+ȡݼ֮ǰȥб߽綼ཻhdf
+ֱ߽Ӵ.shpļͷȡϵ.prjжϣϵҪGDALarcpy
+"""
+import math
+import os
+import re
+import struct
+
+try:
+    from osgeo import osr
+except ImportError:
+    osr = None
+
+try:
+    import arcpy
+except ImportError:
+    arcpy = None
+
+# MODISͶӰ뾶Ƭ߳ףȫ36Уh18Уv
+SPHERE_RADIUS = 6371007.181
+TILE_SIZE = 1111950.5197665233
+H_TILES = 36
+V_TILES = 18
+GRID_X_MIN = -SPHERE_RADIUS * math.pi
+GRID_Y_MAX = SPHERE_RADIUS * math.pi / 2
+
+# ߽չľγȣ߽ǡƬԵʱɾ
+MARGIN = 0.01
+
+_TILE = re.compile(r"\.h(\d{2})v(\d{2})\.")
+
+
+def parse_tile(fname):
+    """
+    ļнƬţ"MOD13Q1.A2004001.h26v05.006.hdf"(26, 5)ûбʱNone
+    """
+    match = _TILE.search(os.path.basename(fname))
+    if match is None:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+def tile_bounds(h, v):
+    """
+    ƬͶӰеķΧ(x_min, y_min, x_max, y_max)
+    """
+    x_min = GRID_X_MIN + h * TILE_SIZE
+    y_max = GRID_Y_MAX - v * TILE_SIZE
+    return x_min, y_max - TILE_SIZE, x_min + TILE_SIZE, y_max
+
+
+def read_shp_bbox(shp):
+    # .shpļͷ36~68ֽΪСx_min, y_min, x_max, y_max
+    with open(shp, "rb") as f:
+        header = f.read(100)
+    return struct.unpack("<4d", header[36:68])
+
+
+def mask_lonlat_bbox(mask):
+    """
+    ر߽ľγ(lon_min, lat_min, lon_max, lat_max)޷ȷϵʱNone
+    """
+    prj = os.path.splitext(mask)[0] + ".prj"
+    if not mask.lower().endswith(".shp") or not os.path.exists(prj):
+        return None
+    bbox = read_shp_bbox(mask)
+    with open(prj) as f:
+        wkt = f.read()
+    if wkt.lstrip().upper().startswith("GEOGCS"):
+        return bbox
+    if osr is not None:
+        return _project_bbox_osr(bbox, wkt)
+    if arcpy is not None:
+        extent = arcpy.Describe(mask).extent.projectAs(arcpy.SpatialReference(4326))
+        return extent.XMin, extent.YMin, extent.XMax, extent.YMax
+    return None
+
+
+def _project_bbox_osr(bbox, wkt, steps=20):
+    # ͶӰϵ߼ܺתΪγȣȡת
+    src = osr.SpatialReference()
+    src.ImportFromWkt(wkt)
+    dst = osr.SpatialReference()
+    dst.ImportFromEPSG(4326)
+    for srs in (src, dst):
+        if hasattr(srs, "SetAxisMappingStrategy"):
+            srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+    transform = osr.CoordinateTransformation(src, dst)
+    x_min, y_min, x_max, y_max = bbox
+    points = []
+    for i in range(steps + 1):
+        x = x_min + (x_max - x_min) * i / steps
+        y = y_min + (y_max - y_min) * i / steps
+        points.extend([(x, y_min), (x, y_max), (x_min, y), (x_max, y)])
+    lonlat = [transform.TransformPoint(x, y)[:2] for x, y in points]
+    lons = [p[0] for p in lonlat]
+    lats = [p[1] for p in lonlat]
+    return min(lons), min(lats), max(lons), max(lats)
+
+
+def intersects(tile, bbox):
+    """
+    жƬ뾭γǷཻ
+
+    γصķΧڣͶӰеxΧ x = R * lon * cos(lat) ļֵȷ
+    """
+    x_min, y_min, x_max, y_max = tile_bounds(*tile)
+    lon_min, lat_min, lon_max, lat_max = (bbox[0] - MARGIN, bbox[1] - MARGIN, bbox[2] + MARGIN, bbox[3] + MARGIN)
+    lat_low = max(math.radians(lat_min), y_min / SPHERE_RADIUS)
+    lat_high = min(math.radians(lat_max), y_max / SPHERE_RADIUS)
+    if lat_low > lat_high:
+        return False
+    cos_max = 1.0 if lat_low <= 0 <= lat_high else max(math.cos(lat_low), math.cos(lat_high))
+    cos_min = min(math.cos(lat_low), math.cos(lat_high))
+    lon_min, lon_max = math.radians(lon_min), math.radians(lon_max)
+    left = SPHERE_RADIUS * lon_min * (cos_max if lon_min < 0 else cos_min)
+    right = SPHERE_RADIUS * lon_max * (cos_max if lon_max > 0 else cos_min)
+    return left <= x_max and right >= x_min
+
+
+def tile_index(masks):
+    """
+    һཻ߽Ƭϣб߽޷ȷΧʱNoneɸѡ
+    """
+    tiles = set()
+    for mask in masks:
+        bbox = mask_lonlat_bbox(mask)
+        if bbox is None:
+            return None
+        for h in range(H_TILES):
+            for v in range(V_TILES):
+                if intersects((h, v), bbox):
+                    tiles.add((h, v))
+    return tiles
+
+
+def filter_hdfs(hdfs, masks):
+    """
+    ȥвü߽綼ཻhdf
+
+    ļûƬŵhdfȫƷǱ
+
+    Returns
+    -------
+    (kept, skipped)ȥhdfб
+    """
+    tiles = tile_index(masks)
+    if tiles is None:
+        return list(hdfs), []
+    kept, skipped = [], []
+    for hdf in hdfs:
+        tile = parse_tile(hdf)
+        if tile is None or tile in tiles:
+            kept.append(hdf)
+        else:
+            skipped.append(hdf)
+    return kept, skipped
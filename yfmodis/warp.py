@@ -0,0 +1,148 @@
+# -- coding:cp936 C
+"""
+ͶӰƻ
+
+ͬһδиڵǶͬһͶӰĿϵԪС
+ڽزʱÿԪȡĸԪȫͬ
+һͶӰʱһӦϵԪͼΪ.npyļ֮դڴӳ䷽ʽȡͼ
+һȡֵͶӰgdal.Warp
+"""
+import hashlib
+import json
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from osgeo import gdal
+except ImportError:
+    gdal = None
+
+from yfmodis.blocks import gdal_options
+from yfmodis.cache import prune_dir, replace_file, touch_file
+
+# ͼбʾԪ뷶Χ֮
+OUTSIDE = -1
+
+
+def plan_key(ds, dst_wkt, res, resampling):
+    """
+    СϵĿϵԪСزƻļ
+    """
+    params = (ds.RasterXSize, ds.RasterYSize, tuple(ds.GetGeoTransform()), ds.GetProjection(),
+              dst_wkt, res, resampling)
+    return hashlib.sha1(repr(params).encode("utf-8")).hexdigest()
+
+
+def build_plan(ds, dst_wkt, res):
+    """
+    ڽزԪͼ
+
+    ԪһάΪԪֵդgdal.WarpڽͶӰ
+    õÿԪֵȡԪֱͶӰĽԪһ
+
+    Returns
+    -------
+    (index, geotransform)indexΪint32int64飬뷶Χ֮ΪOUTSIDE
+    """
+    xsize, ysize = ds.RasterXSize, ds.RasterYSize
+    # int32ΧĸʹFloat642**53ڿԾȷʾ
+    large = xsize * ysize >= 2 ** 31
+    src = gdal.GetDriverByName("MEM").Create("", xsize, ysize, 1, gdal.GDT_Float64 if large else gdal.GDT_Int32)
+    src.SetGeoTransform(ds.GetGeoTransform())
+    src.SetProjection(ds.GetProjection())
+    src.GetRasterBand(1).WriteArray(np.arange(xsize * ysize, dtype="float64" if large else "int32")
+                                    .reshape(ysize, xsize))
+    # gdal.WarpֱͶӰͬķʽȷ
+    kwargs = {"format": "MEM", "dstSRS": dst_wkt, "resampleAlg": "near", "dstNodata": OUTSIDE}
+    if res is not None:
+        kwargs["xRes"], kwargs["yRes"] = res
+    dst = gdal.Warp("", src, **kwargs)
+    gt = dst.GetGeoTransform()
+    index = dst.GetRasterBand(1).ReadAsArray().astype("int64" if large else "int32")
+    src = None
+    dst = None
+    return index, gt
+
+
+def load_plan(plan_dir, ds, dst_wkt, res, max_bytes=None):
+    """
+    ȡļƻʱ㲢棬ļгmax_bytesֽڣʱɾδʹõļƻ
+
+    Returns
+    -------
+    (index, meta)indexΪڴӳͼmetageotransform
+    """
+    key = plan_key(ds, dst_wkt, res, "NEAREST")
+    index_path = os.path.join(plan_dir, key + ".npy")
+    meta_path = os.path.join(plan_dir, key + ".json")
+    if not (os.path.exists(index_path) and os.path.exists(meta_path)):
+        if not os.path.exists(plan_dir):
+            try:
+                os.makedirs(plan_dir)
+            except OSError:
+                # Ѿ
+                pass
+        index, gt = build_plan(ds, dst_wkt, res)
+        # ̿ͬʱͬһƻдʱļ滻ͬ
+        tmp = "%s.%d" % (key, os.getpid())
+        with open(os.path.join(plan_dir, tmp + ".npy"), "wb") as f:
+            np.save(f, index)
+        with open(os.path.join(plan_dir, tmp + ".json"), "w") as f:
+            json.dump({"geotransform": list(gt)}, f)
+        replace_file(os.path.join(plan_dir, tmp + ".npy"), index_path)
+        replace_file(os.path.join(plan_dir, tmp + ".json"), meta_path)
+        prune_dir(plan_dir, max_bytes, keep=(key,))
+    else:
+        touch_file(meta_path)
+    with open(meta_path) as f:
+        meta = json.load(f)
+    return np.load(index_path, mmap_mode="r"), meta
+
+
+def reproject_nearest(raster, out_raster, dst_wkt, res, plan_dir, block_size=512, creation_options=None,
+                      max_bytes=None):
+    """
+    ûͼڽزͶӰ
+
+    Parameters
+    ----------
+    dst_wkt:str
+        ĿϵWKTַ
+    res:tuple,optional
+        ԪС(x, y)ΪNoneʱGDALԶ
+    plan_dir:str
+        ͼڵļ
+    block_size:int
+        ÿд
+    max_bytes:int,optional
+        ͼļеĴСޣֽڣΪNoneʱ
+    """
+    ds = gdal.Open(raster)
+    index, meta = load_plan(plan_dir, ds, dst_wkt, res, max_bytes)
+    band = ds.GetRasterBand(1)
+    nodata = band.GetNoDataValue()
+    flat = band.ReadAsArray().ravel()
+    # gdal.Warpһ£NoDataʱΧΪNoDataΪ0
+    fill = 0 if nodata is None else nodata
+    out_ysize, out_xsize = index.shape
+    driver = gdal.GetDriverByName("GTiff")
+    out = driver.Create(out_raster, out_xsize, out_ysize, 1, band.DataType,
+                        gdal_options(creation_options, band.DataType))
+    out.SetGeoTransform(meta["geotransform"])
+    out.SetProjection(dst_wkt)
+    out_band = out.GetRasterBand(1)
+    if nodata is not None:
+        out_band.SetNoDataValue(nodata)
+    for yoff in range(0, out_ysize, block_size):
+        rows = np.asarray(index[yoff:yoff + block_size])
+        block = np.full(rows.shape, fill, dtype=flat.dtype)
+        inside = rows != OUTSIDE
+        block[inside] = flat[rows[inside]]
+        out_band.WriteArray(block, 0, yoff)
+    out.FlushCache()
+    out = None
+    ds = None
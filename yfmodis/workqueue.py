@@ -0,0 +1,403 @@
+# -- coding:cp936 C
+"""
+ڵ㹤
+
+ǹļϵͳϵһSQLiteݿ⣬ڵÿڷдУ
+ڵϵĹִУִڼɺ̶̨߳⣨
+̱ڵϿ⣬Լڵ±Ϊãԣ
+ԴΪʧܡķֵʹϢдضУɷڵ㰴ύ˳ܡ
+
+ڵҲworkersع̣ڵм룺
+
+    python -m yfmodis --worker /share/modis/queue.sqlite --workers 8
+
+SQLiteļϵͳֽڷΧNFSҪʹnolockأSMBֱͨʹá
+(func, args)лڵҪװͬ汾yfmodisargsе·ڸڵͬ
+"""
+import hashlib
+import multiprocessing
+import os
+import pickle
+import signal
+import socket
+import sqlite3
+import threading
+import time
+
+from yfmodis.parallel import _set_python_executable, call_task, cpu_count
+
+# ĬϵԼʱ룩Ϊ֮һ
+LEASE_SECONDS = 300
+
+# ԼڵĴֵʱΪʧܣ⵼½̱
+MAX_ATTEMPTS = 3
+
+# ȴʱѯеļ룩
+POLL_SECONDS = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY, task BLOB, status TEXT, owner TEXT, lease_until REAL, attempts INTEGER,
+    result BLOB, error TEXT, updated REAL
+);
+CREATE INDEX IF NOT EXISTS items_status ON items (status, lease_until);
+"""
+
+
+def worker_name():
+    # ͽ̺ţʶԼĽ
+    return "%s:%d" % (socket.gethostname(), os.getpid())
+
+
+def task_id(task):
+    """
+    ıţл㣬ͬһظʱµĿ
+    """
+    return hashlib.sha1(pickle.dumps(task, 2)).hexdigest()
+
+
+class WorkQueue(object):
+    """
+    ļϵͳϵ
+
+    Ϊ(func, args)Ŀ״̬Ϊpendingȴãleasedã
+    doneִУerrorΪձʾ׳쳣failedԼڴmax_attempts
+
+    Parameters
+    ----------
+    path:str
+        SQLiteݿļڵʹͬһ·
+    lease_seconds:float
+        Լʱ룩ִڼÿlease_seconds/3һ
+    max_attempts:int
+        ÿ౻õĴ
+    """
+
+    def __init__(self, path, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # йʱBEGIN IMMEDIATE֤ͬһֻһ⵽
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _transaction(self, func, *args):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = func(*args)
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+        return result
+
+    def publish(self, tasks):
+        """
+        񣬷ذύ˳еı
+
+        Ѵڵ±ΪpendingִԼδڵ񱣳ֲ
+        """
+        ids = [task_id(task) for task in tasks]
+
+        def insert():
+            now = time.time()
+            for item_id, task in zip(ids, tasks):
+                row = self.conn.execute("SELECT status, lease_until FROM items WHERE id = ?", (item_id,)).fetchone()
+                if row is not None and row[0] == "leased" and row[1] > now:
+                    continue
+                self.conn.execute("INSERT OR REPLACE INTO items VALUES (?, ?, 'pending', NULL, 0, 0, NULL, NULL, ?)",
+                                  (item_id, sqlite3.Binary(pickle.dumps(task, 2)), now))
+
+        self._transaction(insert)
+        return ids
+
+    def _fail_expired(self, now):
+        # ԼѴﵽԴΪʧ
+        cursor = self.conn.execute("UPDATE items SET status = 'failed', error = 'lease expired ' || attempts || "
+                                   "' times, last held by ' || owner, updated = ? WHERE status = 'leased' "
+                                   "AND lease_until < ? AND attempts >= ?", (now, now, self.max_attempts))
+        return cursor.rowcount
+
+    def expire(self):
+        """
+        ԼѴﵽԴΪʧܣؼΪʧܵ
+
+        lease()ÿǰִУڵȴʱҲãȫʱܽ
+        """
+        return self._transaction(self._fail_expired, time.time())
+
+    def lease(self, owner):
+        """
+        һȴлԼѵڵ񣬷(, )ûпõʱNone
+        """
+
+        def take():
+            now = time.time()
+            self._fail_expired(now)
+            row = self.conn.execute("SELECT id, task FROM items WHERE status = 'pending' OR "
+                                    "(status = 'leased' AND lease_until < ?) ORDER BY updated LIMIT 1",
+                                    (now,)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE items SET status = 'leased', owner = ?, lease_until = ?, "
+                              "attempts = attempts + 1, updated = ? WHERE id = ?",
+                              (owner, now + self.lease_seconds, now, row[0]))
+            return row[0], pickle.loads(bytes(row[1]))
+
+        return self._transaction(take)
+
+    def heartbeat(self, item_id, owner):
+        """
+        ⣬Լѱ̽ӹʱFalse
+        """
+        now = time.time()
+        cursor = self.conn.execute("UPDATE items SET lease_until = ?, updated = ? WHERE id = ? AND owner = ? "
+                                   "AND status = 'leased'", (now + self.lease_seconds, now, item_id, owner))
+        return cursor.rowcount > 0
+
+    def complete(self, item_id, owner, result, err=None):
+        """
+        дķֵerrΪ׳쳣Ϣ
+        """
+        self.conn.execute("UPDATE items SET status = 'done', lease_until = 0, result = ?, error = ?, updated = ? "
+                          "WHERE id = ? AND owner = ?",
+                          (sqlite3.Binary(pickle.dumps(result, 2)), err, time.time(), item_id, owner))
+
+    def release(self, item_id, owner):
+        """
+        ԼΪã볢Դ
+        """
+        self.conn.execute("UPDATE items SET status = 'pending', owner = NULL, lease_until = 0, "
+                          "attempts = attempts - 1 WHERE id = ? AND owner = ? AND status = 'leased'",
+                          (item_id, owner))
+
+    def result(self, item_id):
+        """
+        ѽdonefailed񷵻(ֵ, Ϣ)δʱNone
+        """
+        row = self.conn.execute("SELECT result, error FROM items WHERE id = ? AND status IN ('done', 'failed')",
+                                (item_id,)).fetchone()
+        if row is None:
+            return None
+        return (pickle.loads(bytes(row[0])) if row[0] is not None else None), row[1]
+
+    def unfinished(self):
+        """
+        ȴкõ
+        """
+        return self.conn.execute("SELECT COUNT(*) FROM items WHERE status IN ('pending', 'leased')").fetchone()[0]
+
+    def counts(self):
+        """
+        ״̬{"done": 120, "leased": 8}
+        """
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM items GROUP BY status").fetchall())
+
+
+class _Heartbeat(threading.Thread):
+    # ִڼ䶨⣬ʹöݿ
+    def __init__(self, path, item_id, owner, lease_seconds):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.path = path
+        self.item_id = item_id
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+        self.stopped = threading.Event()
+
+    def run(self):
+        queue = WorkQueue(self.path, self.lease_seconds)
+        try:
+            while not self.stopped.wait(self.lease_seconds / 3.0):
+                if not queue.heartbeat(self.item_id, self.owner):
+                    break
+        finally:
+            queue.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def exit_on_sigterm():
+    """
+    յSIGTERMʱ׳SystemExitʹfinallyеԼӽִ̣
+    """
+    if hasattr(signal, "SIGTERM") and threading.current_thread().name == "MainThread":
+        signal.signal(signal.SIGTERM, _raise_exit)
+
+
+def _raise_exit(signum, frame):
+    raise SystemExit(128 + signum)
+
+
+def work(path, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS, wait=False, poll=POLL_SECONDS):
+    """
+    ̵ѭִвдؽ
+
+    Parameters
+    ----------
+    path:str
+        ݿ
+    wait:bool
+        ΪFalseʱûеȴкõ˳ΪTrueʱһֱȴ
+    poll:float
+        ûпõʱĵȴ룩
+
+    Returns
+    -------
+    ִе
+    """
+    exit_on_sigterm()
+    queue = WorkQueue(path, lease_seconds, max_attempts)
+    owner = worker_name()
+    done = 0
+    try:
+        while True:
+            item = queue.lease(owner)
+            if item is None:
+                # ̳еԼҪԣȫ˳
+                if not wait and queue.unfinished() == 0:
+                    break
+                time.sleep(poll)
+                continue
+            item_id, (func, args) = item
+            heartbeat = _Heartbeat(path, item_id, owner, lease_seconds)
+            heartbeat.start()
+            result, err = None, None
+            try:
+                result = func(*args)
+            except Exception as e:
+                err = "%s" % e
+            except BaseException:
+                # KeyboardInterruptȣԼԱ
+                heartbeat.stop()
+                queue.release(item_id, owner)
+                raise
+            heartbeat.stop()
+            queue.complete(item_id, owner, result, err)
+            done += 1
+    finally:
+        queue.close()
+    return done
+
+
+def work_processes(path, workers=1, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS, wait=False):
+    """
+    workersع̣multiprocessing.Processɵб
+    """
+    if not workers:
+        workers = cpu_count()
+    _set_python_executable()
+    processes = [multiprocessing.Process(target=work, args=(path, lease_seconds, max_attempts, wait))
+                 for _ in range(int(workers))]
+    for process in processes:
+        process.start()
+    return processes
+
+
+class QueueExecutor(object):
+    """
+    ͨзִַΪrun_batchexecutor
+
+    map񷢲вع̣ύ˳򷵻ظĽ
+    ڵϵĹ̿ͬʱ룻ĸڵִжԵ÷͸
+    ȴڼ䷢ڵԼԼڴΪʧܣ˳ıع̡
+    funcΪparallel.call_taskʱʧܻʱ񷵻شϢĽfunc׳RuntimeError
+
+    Parameters
+    ----------
+    path:str
+        ݿ⣬λڸڵ㶼ܷʵĹļϵͳ
+    workers:int
+        عΪ0NoneʱʹȫCPU
+    lease_seconds:float
+        Լʱ룩
+    max_attempts:int
+        ÿ౻õĴ
+    poll:float
+        ȴʱѯеļ룩
+    timeout:float,optional
+        ÿmapȴʱ䣨룩ʱع̣еԼ
+        δ񰴳أΪNoneʱһֱȴ
+    """
+
+    def __init__(self, path, workers=1, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS, poll=POLL_SECONDS,
+                 timeout=None):
+        self.path = path
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll = poll
+        self.timeout = timeout
+        self.processes = []
+
+    def map(self, func, iterable):
+        tasks = [(func, (item,)) for item in iterable]
+        if not tasks:
+            return
+        queue = WorkQueue(self.path, self.lease_seconds, self.max_attempts)
+        ids = queue.publish(tasks)
+        # ȹرٴӽ̣ӽ̲̳д򿪵ݿ
+        queue.close()
+        self.processes.extend(work_processes(self.path, self.workers, self.lease_seconds, self.max_attempts))
+        queue = WorkQueue(self.path, self.lease_seconds, self.max_attempts)
+        deadline = None if self.timeout is None else time.time() + self.timeout
+        timed_out = False
+        try:
+            for item_id in ids:
+                found = queue.result(item_id)
+                while found is None:
+                    if deadline is not None and time.time() > deadline:
+                        timed_out = True
+                        found = None, "no result within %gs" % self.timeout
+                        break
+                    time.sleep(self.poll)
+                    queue.expire()
+                    # ɱڴ治㣩ıع̲⣬ͬḶ̌Լں
+                    dead = self._remove_dead()
+                    if dead and queue.unfinished():
+                        queue.close()
+                        self.processes.extend(work_processes(self.path, dead, self.lease_seconds,
+                                                             self.max_attempts))
+                        queue = WorkQueue(self.path, self.lease_seconds, self.max_attempts)
+                    found = queue.result(item_id)
+                result, err = found
+                if err is None:
+                    yield result
+                elif func is call_task:
+                    yield 0.0, err, 0.0, None
+                else:
+                    raise RuntimeError(err)
+        finally:
+            queue.close()
+            if timed_out:
+                self.terminate()
+
+    def _remove_dead(self):
+        # ȥ쳣˳ıع̣ȥĽ
+        dead = [p for p in self.processes if p.exitcode not in (None, 0)]
+        for process in dead:
+            self.processes.remove(process)
+        return len(dead)
+
+    def terminate(self):
+        """
+        ع̣ǷеԼ˳
+        """
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        self.processes = []
+
+    def close(self):
+        for process in self.processes:
+            process.join()
+        self.processes = []
@@ -0,0 +1,201 @@
+# -- coding:cp936 C
+"""
+ͳ
+
+ֻҪ߽ͳֵʱΪÿ(߽, )дüźդ
+ÿ߽ڸֻդһΣصı߽ϲΪһդ
+Ԫ󣬸ֻһbincount/reduceatɵõȫĸƽֵСֵֵͱ׼
+ӡNoDataΪQAĤͳǰӦáÿдһСCSVϲΪһű
+"""
+import csv
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pa_parquet
+except ImportError:
+    pa_csv = None
+    pa_parquet = None
+
+from yfmodis.composite import valid_pixels
+from yfmodis.condition import compile_condition
+from yfmodis.cube import parse_date
+from yfmodis.qa import qa_invalid
+
+STATISTICS = ("count", "mean", "min", "max", "std")
+
+FIELDS = ("zone", "date", "layer") + STATISTICS
+
+# ʹõķͬһ̴ͬһĶʱ
+_INDEX_CACHE = {}
+
+
+class ZoneIndex(object):
+    """
+    ߽ڸеԪ
+
+    Parameters
+    ----------
+    shape:tuple
+        (, )
+    windows:List[tuple]
+        ÿ߽(window, inside)clipmask.mask_windowཻı߽Ϊ(None, None)
+    """
+
+    def __init__(self, shape, windows):
+        self.count = len(windows)
+        self.layers = []
+        grids = []
+        for zone, (window, inside) in enumerate(windows, 1):
+            if window is None:
+                continue
+            xoff, yoff, xcount, ycount = window
+            # һ֮صķդʡ߽Ȼصıֻ߽Ҫһ
+            for grid, zones in grids:
+                if not grid[yoff:yoff + ycount, xoff:xoff + xcount][inside].any():
+                    break
+            else:
+                grid, zones = np.zeros(shape, dtype="int32"), []
+                grids.append((grid, zones))
+            grid[yoff:yoff + ycount, xoff:xoff + xcount][inside] = zone
+            zones.append(zone)
+        for grid, zones in grids:
+            flat = grid.ravel()
+            pixels = np.flatnonzero(flat)
+            # ཻ߽ûԪʱդΪգЩ߽countΪ0
+            if not pixels.size:
+                continue
+            ids = flat[pixels]
+            order = np.argsort(ids, kind="mergesort")
+            pixels, ids = pixels[order], ids[order]
+            starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+            self.layers.append((pixels, ids, starts, ids[starts]))
+
+    def reduce(self, array, valid, scale_factor=1.0):
+        """
+        ͳÿ߽ЧԪĸƽֵСֵֵͱ׼׼
+
+        Returns
+        -------
+        windowsһһӦֵбûЧԪıֻ߽countΪ0ͳֵΪNone
+        """
+        results = [dict.fromkeys(STATISTICS) for _ in range(self.count)]
+        for result in results:
+            result["count"] = 0
+        size = self.count + 1
+        values_all = array.ravel()
+        valid_all = valid.ravel()
+        for pixels, ids, starts, zones in self.layers:
+            values = values_all[pixels].astype("float64")
+            if scale_factor != 1:
+                values *= scale_factor
+            ok = valid_all[pixels]
+            count = np.bincount(ids, weights=ok, minlength=size)
+            total = np.bincount(ids, weights=np.where(ok, values, 0.0), minlength=size)
+            mean = np.divide(total, count, out=np.zeros(size), where=count > 0)
+            # 㷽ƽľʧ
+            deviation = np.where(ok, values - mean[ids], 0.0)
+            variance = np.divide(np.bincount(ids, weights=deviation * deviation, minlength=size), count,
+                                 out=np.zeros(size), where=count > 0)
+            minimum = np.minimum.reduceat(np.where(ok, values, np.inf), starts)
+            maximum = np.maximum.reduceat(np.where(ok, values, -np.inf), starts)
+            for zone, low, high in zip(zones, minimum, maximum):
+                n = int(count[zone])
+                result = results[zone - 1]
+                result["count"] = n
+                if n:
+                    result.update({"mean": float(mean[zone]), "min": float(low), "max": float(high),
+                                   "std": float(np.sqrt(variance[zone]))})
+        return results
+
+
+def zone_index(shape, masks, windows):
+    """
+    ظͱ߽ӦZoneIndexֻһ
+    """
+    key = (tuple(shape), tuple(masks), tuple(w for w, i in windows))
+    if key not in _INDEX_CACHE:
+        _INDEX_CACHE.clear()
+        _INDEX_CACHE[key] = ZoneIndex(shape, windows)
+    return _INDEX_CACHE[key]
+
+
+def zone_name(mask):
+    # Ϊ߽ļ"henan"
+    return os.path.splitext(os.path.basename(mask))[0]
+
+
+def zonal_stats(backend, raster, out_csv, masks, scale_factor=1.0, condition=None, qa_raster=None, qa_rule=None):
+    """
+    ͳһդڸ߽ڵֵдCSVÿ߽һ
+
+    Parameters
+    ----------
+    backend:RasterBackend
+        ṩto_numpymask_windows
+    raster:str
+        ͶӰ󣨻Ƕ󣩵դļаںݼ"pr_MOD13Q1.A2004001.NDVI.tif"
+    out_csv:str
+        CSV
+    masks:List[str]
+        ߽
+    scale_factor:float
+        ӣͳǰ˵ЧԪ
+    condition:str,optional
+        ΪյԪͳ
+    qa_raster:str,optional
+        դͬQA㣬qa_ruleԪͳƣqa.qa_invalid
+    """
+    backend.setup()
+    array, geotransform, wkt, nodata = backend.to_numpy(raster)
+    windows = backend.mask_windows(raster, masks)
+    index = zone_index(array.shape, masks, windows)
+    valid = valid_pixels(array, nodata, compile_condition(condition) if condition else None)
+    if qa_raster is not None:
+        qa, qa_geotransform, qa_wkt, qa_nodata = backend.to_numpy(qa_raster)
+        if qa.shape != array.shape:
+            raise ValueError("%s and %s are not on the same grid" % (qa_raster, raster))
+        valid &= ~qa_invalid(qa, qa_rule, qa_nodata)
+    date = parse_date(raster)
+    layer = os.path.basename(raster).split(".")[-2]
+    rows = []
+    for mask, result in zip(masks, index.reduce(array, valid, scale_factor)):
+        row = {"zone": zone_name(mask), "date": date.isoformat() if date else "", "layer": layer}
+        row.update(result)
+        rows.append(row)
+    tmp = out_csv + ".tmp"
+    with open(tmp, "w") as f:
+        writer = csv.DictWriter(f, FIELDS, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    if os.path.exists(out_csv):
+        os.remove(out_csv)
+    os.rename(tmp, out_csv)
+
+
+def merge_tables(parts, out_path):
+    """
+    ڵCSV(zone, layer, date)ϲΪһűչΪ.parquetʱдParquetҪpyarrow
+    """
+    rows = []
+    for part in parts:
+        with open(part) as f:
+            rows.extend(csv.DictReader(f))
+    rows.sort(key=lambda row: (row["zone"], row["layer"], row["date"]))
+    parquet = out_path.lower().endswith(".parquet")
+    if parquet and pa_parquet is None:
+        raise RuntimeError("pyarrow is required to write %s" % out_path)
+    csv_path = out_path + ".csv" if parquet else out_path
+    with open(csv_path, "w") as f:
+        writer = csv.DictWriter(f, FIELDS, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    if parquet:
+        pa_parquet.write_table(pa_csv.read_csv(csv_path), out_path)
+        os.remove(csv_path)
+    return len(rows)